@@ -1,7 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Tuple
-from world import Pos, Palacio
+from typing import Optional
+from world import Pos, Palacio, Percepto
+from historial import HistorialPerceptos
 
 
 @dataclass
@@ -14,13 +15,13 @@ class AgentState:
 
 
 class Agente:
-    def __init__(self) -> None:
+    def __init__(self, n: int = 6, capacidad_historial: Optional[int] = None) -> None:
         self.state = AgentState()
-        self.history: List[Tuple[Pos, List[bool]]] = []  # (pos, percepts)
+        self.history = HistorialPerceptos(n, capacidad=capacidad_historial)
 
-    def perceive(self, palacio: Palacio) -> List[bool]:
-        percepts = palacio.get_percepts(self.state.pos, grito=self.state.ult_grito)
-        self.history.append((self.state.pos, percepts))
+    def perceive(self, palacio: Palacio) -> Percepto:
+        percepts = palacio.get_percepts_bits(self.state.pos, grito=self.state.ult_grito)
+        self.history.append(self.state.pos, percepts)
         self.state.ult_grito = False
         return percepts
 
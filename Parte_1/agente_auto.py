@@ -0,0 +1,238 @@
+from __future__ import annotations
+from collections import deque
+from typing import Dict, List, Optional, Set
+import argparse
+import os
+import sys
+import time
+
+if __name__ == "__main__":
+    # Ejecutado como script: la raiz del repo (paquete comun) no esta en sys.path.
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from world import Palacio, Pos, Percepto, BIT_RESPLANDOR, render_ascii
+from agent import Agente
+from conocimiento import BaseConocimiento
+from inferencia import Inferencia, MotorInferencia
+from search_agent import path_to_actions
+
+
+class AgenteAutonomo(Agente):
+    """
+    Agente autonomo de la Parte 1 que decide solo a partir de sus perceptos.
+
+    - Explora hacia la celda segura no visitada mas cercana (BFS sobre celdas
+      seguras) y mantiene el plan mientras el nuevo conocimiento no lo invalide.
+    - Si el soldado queda localizado y tiene granada, se coloca al lado y la lanza.
+    - Con Kurtz, busca la salida entre las celdas compatibles con el resplandor.
+    - Si no queda ninguna celda segura por explorar, arriesga con la de menor riesgo.
+    """
+
+    def __init__(self, n: int = 6, n_precipicios: int = 3, inicio: Pos = (1, 1), capacidad_historial: Optional[int] = None) -> None:
+        super().__init__(n, capacidad_historial=capacidad_historial)
+        self.inicio = inicio
+        self.kb = BaseConocimiento(n)
+        self.motor = MotorInferencia(n, n_precipicios=n_precipicios)
+        self.plan: List[Pos] = []
+        self._objetivo: Optional[Pos] = None
+        self._modo: Optional[str] = None
+        self.dir_granada: Optional[str] = None
+        self.salidas_descartadas: Set[Pos] = set()
+
+    def perceive(self, palacio: Palacio) -> Percepto:
+        percepts = super().perceive(palacio)
+        self.kb.ingest(self.state.pos, percepts)
+        return percepts
+
+    def salida_fallida(self) -> None:
+        """
+        Se ha intentado salir desde la celda actual y no era la salida.
+        """
+        self.salidas_descartadas.add(self.state.pos)
+
+    def candidatas_salida(self, inf: Inferencia) -> Set[Pos]:
+        """
+        Celdas compatibles con los resplandores observados.
+        """
+        cand: Optional[Set[Pos]] = None
+        excluidas = set(self.salidas_descartadas) | {self.inicio}
+        for pos, per in self.kb.observaciones.items():
+            zona = set(self.kb.vecinos[pos]) | {pos}
+            if per & BIT_RESPLANDOR:
+                cand = zona if cand is None else cand & zona
+            else:
+                excluidas |= zona
+        if cand is None:
+            cand = set(self.kb.vecinos)
+        return {p for p in cand - excluidas if inf.p_pozo[p] < 1.0}
+
+    def _soldado_localizado(self, inf: Inferencia) -> Optional[Pos]:
+        if self.kb.soldado_muerto:
+            return None
+        for p, v in inf.p_soldado.items():
+            if v == 1.0:
+                return p
+        return None
+
+    def _bfs(self, objetivos: Set[Pos], transitables: Set[Pos]) -> Optional[List[Pos]]:
+        """
+        Camino minimo desde la posicion actual hasta el objetivo mas cercano,
+        pasando solo por celdas transitables (el objetivo puede no serlo).
+        """
+        inicio = self.state.pos
+        if inicio in objetivos:
+            return [inicio]
+        padre: Dict[Pos, Optional[Pos]] = {inicio: None}
+        q = deque([inicio])
+        while q:
+            actual = q.popleft()
+            for sig in self.kb.vecinos[actual]:
+                if sig in padre:
+                    continue
+                padre[sig] = actual
+                if sig in objetivos:
+                    path = [sig]
+                    while padre[path[-1]] is not None:
+                        path.append(padre[path[-1]])
+                    path.reverse()
+                    return path
+                if sig in transitables:
+                    q.append(sig)
+        return None
+
+    def _plan_vigente(self, modo: str, objetivos: Set[Pos]) -> bool:
+        return bool(self.plan) and self._modo == modo and self._objetivo in objetivos
+
+    def _planificar(self, modo: str, objetivos: Set[Pos], transitables: Set[Pos]) -> bool:
+        """
+        Replanifica solo si el plan actual ya no sirve para el modo y objetivos actuales.
+        """
+        if self._plan_vigente(modo, objetivos):
+            return True
+        path = self._bfs(objetivos, transitables) if objetivos else None
+        if path is None:
+            self.plan = []
+            return False
+        self.plan = path[1:]
+        self._objetivo = path[-1]
+        self._modo = modo
+        return True
+
+    def choose_action_auto(self) -> str:
+        """
+        Decide la siguiente accion (UP/DOWN/LEFT/RIGHT, EXIT o GRANADA).
+        Para GRANADA la direccion queda en self.dir_granada. Devuelve NOOP si
+        no queda ninguna celda alcanzable.
+        """
+        inf = self.motor.inferir(self.kb)
+        pos = self.state.pos
+        seguras = self.kb.visitadas | inf.seguras()
+
+        salidas = self.candidatas_salida(inf) if self.state.has_kurtz else set()
+        if pos in salidas:
+            return "EXIT"
+
+        soldado = self._soldado_localizado(inf)
+        if soldado is not None and self.state.has_grenade and soldado in self.kb.vecinos[pos]:
+            self.dir_granada = path_to_actions([pos, soldado])[0]
+            return "GRANADA"
+
+        frontera = seguras - self.kb.visitadas
+        ok = False
+        if salidas & seguras:
+            ok = self._planificar("salida", salidas & seguras, seguras)
+        if not ok:
+            ok = self._planificar("explorar", frontera, seguras)
+        if not ok and soldado is not None and self.state.has_grenade:
+            junto = set(self.kb.vecinos[soldado]) & seguras
+            ok = self._planificar("granada", junto, seguras)
+        if not ok:
+            # Sin opciones seguras: arriesgar con la celda no visitada de menor riesgo.
+            self.plan = []
+            borde = {q for p in seguras for q in self.kb.vecinos[p]} - self.kb.visitadas
+            riesgo = {p: inf.riesgo(p) for p in borde}
+            riesgo = {p: r for p, r in riesgo.items() if r < 1.0}
+            if not riesgo:
+                return "NOOP"
+            minimo = min(riesgo.values())
+            ok = self._planificar("arriesgar", {p for p, r in riesgo.items() if r == minimo}, seguras)
+
+        if not ok or not self.plan:
+            return "NOOP"
+        sig = self.plan.pop(0)
+        return path_to_actions([pos, sig])[0]
+
+
+def jugar_partida(seed: Optional[int], n: int = 6, n_precipicios: int = 3, solucionable: bool = False, max_turnos: int = 500, render: bool = False) -> Dict:
+    """
+    Juega una partida con el agente autonomo, sin pausas. Con render se
+    imprime el tablero en cada turno.
+    """
+    palacio = Palacio(n=n, seed=seed, n_precipicios=n_precipicios, solucionable=solucionable)
+    agente = AgenteAutonomo(n=n, n_precipicios=palacio.n_precipicios)
+    resultado = "limite"
+
+    turno = 0
+    while turno < max_turnos:
+        turno += 1
+        agente.perceive(palacio)
+        if render:
+            render_ascii(palacio, agent_pos=agente.state.pos, visitado=list(agente.kb.visitadas), reveal=True, kurtz=agente.state.has_kurtz,
+                         posibles_peligros=agente.kb.posibles_peligros, seguros_peligros=agente.kb.seguros_peligros)
+        action = agente.choose_action_auto()
+
+        if action in ("UP", "DOWN", "LEFT", "RIGHT"):
+            new_pos = palacio.step_move(agente.state.pos, action)
+            agente.state.pos = new_pos
+            if new_pos in palacio.precipicios or (palacio.soldado_vivo and new_pos == palacio.soldado):
+                agente.state.vivo = False
+                resultado = "muerte"
+                break
+            if new_pos == palacio.kurtz:
+                agente.state.has_kurtz = True
+        elif action == "EXIT":
+            if palacio.salida == agente.state.pos and agente.state.has_kurtz:
+                resultado = "victoria"
+                break
+            agente.salida_fallida()
+        elif action == "GRANADA":
+            killed = palacio.throw_grenade(agente.state.pos, agente.dir_granada)
+            agente.state.has_grenade = False
+            agente.state.ult_grito = killed
+        else:
+            resultado = "atascado"
+            break
+
+    return {
+        "seed": seed,
+        "resultado": resultado,
+        "turnos": turno,
+        "kurtz": agente.state.has_kurtz,
+        "granada": not agente.state.has_grenade,
+        "soldado_muerto": not palacio.soldado_vivo,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Partidas sin renderizado del agente autonomo de la Parte 1.")
+    parser.add_argument("--partidas", type=int, default=1000)
+    parser.add_argument("--seed0", type=int, default=0)
+    parser.add_argument("--n", type=int, default=6)
+    parser.add_argument("--precipicios", type=int, default=3)
+    parser.add_argument("--solucionable", action="store_true", help="Solo palacios con camino seguro inicio -> Kurtz -> salida.")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    res = [jugar_partida(s, n=args.n, n_precipicios=args.precipicios, solucionable=args.solucionable) for s in range(args.seed0, args.seed0 + args.partidas)]
+    dt = time.perf_counter() - t0
+
+    total = len(res)
+    for clave in ("victoria", "muerte", "atascado", "limite"):
+        print(f"{clave}: {sum(1 for r in res if r['resultado'] == clave) / total:.1%}")
+    print(f"Turnos medio: {sum(r['turnos'] for r in res) / total:.1f}")
+    print(f"Granadas usadas: {sum(1 for r in res if r['granada']) / total:.1%}")
+    print(f"{total} partidas en {dt:.2f}s ({total / dt:.0f} partidas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+from typing import Dict, Set, Tuple
+
+from world import Pos, rejilla, BIT_BRISA, BIT_RONQUIDO, BIT_GRITO
+
+
+class _Peligro:
+    """
+    Conocimiento incremental sobre un tipo de peligro (precipicio o soldado)
+    que se detecta en las celdas vecinas (brisa / ronquido).
+
+    - seguras: celdas donde seguro que no esta el peligro.
+    - candidatas: celdas vecinas de algun percepto positivo que aun no son seguras.
+    - ciertas: celdas que son la unica candidata de algun percepto positivo.
+
+    Para cada celda con percepto positivo se guarda cuantas vecinas candidatas le
+    quedan, de modo que cada actualizacion solo toca los vecinos afectados.
+    """
+
+    def __init__(self, vecinos: Dict[Pos, Tuple[Pos, ...]]) -> None:
+        self._vecinos = vecinos
+        self.seguras: Set[Pos] = set()
+        self.candidatas: Set[Pos] = set()
+        self.ciertas: Set[Pos] = set()
+        self._positivas: Set[Pos] = set()
+        self._n_cand: Dict[Pos, int] = {}
+
+    def marcar_segura(self, pos: Pos) -> None:
+        """
+        Anade una celda a las seguras y actualiza los contadores de sus vecinas.
+        """
+        if pos in self.seguras:
+            return
+        self.seguras.add(pos)
+        self.candidatas.discard(pos)
+        for p in self._vecinos[pos]:
+            if p in self._positivas:
+                self._n_cand[p] -= 1
+                if self._n_cand[p] == 1:
+                    self._fijar_unica(p)
+
+    def observar(self, pos: Pos, percibido: bool) -> None:
+        """
+        Incorpora el percepto (brisa/ronquido) observado en pos.
+        """
+        if not percibido:
+            for p in self._vecinos[pos]:
+                self.marcar_segura(p)
+            return
+
+        if pos in self._positivas:
+            return
+        self._positivas.add(pos)
+        cand = [p for p in self._vecinos[pos] if p not in self.seguras]
+        self.candidatas.update(cand)
+        self._n_cand[pos] = len(cand)
+        if len(cand) == 1:
+            self.ciertas.add(cand[0])
+
+    def _fijar_unica(self, pos: Pos) -> None:
+        for p in self._vecinos[pos]:
+            if p not in self.seguras:
+                self.ciertas.add(p)
+                return
+
+    def olvidar(self) -> None:
+        """
+        Descarta el peligro (p. ej. el soldado ha muerto): ya no hay candidatas.
+        """
+        self.candidatas.clear()
+        self.ciertas.clear()
+        self._positivas.clear()
+        self._n_cand.clear()
+
+
+class BaseConocimiento:
+    """
+    Base de conocimiento incremental del agente logico de la Parte 1.
+
+    Ingiere un percepto por turno y mantiene los conjuntos de celdas seguras,
+    candidatas y ciertas para precipicios y soldado. Las celdas visitadas
+    (donde el agente sigue vivo) tambien se consideran seguras.
+    """
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.vecinos: Dict[Pos, Tuple[Pos, ...]] = rejilla(n).vecinos_pos
+
+        self.pozos = _Peligro(self.vecinos)
+        self.soldado = _Peligro(self.vecinos)
+        self.soldado_muerto = False
+        self.visitadas: Set[Pos] = set()
+        self.observaciones: Dict[Pos, int] = {}
+        self.version = 0
+
+    def ingest(self, pos: Pos, percepto: int) -> None:
+        """
+        Incorpora el percepto recibido en pos. Si la celda ya se habia observado
+        con el mismo percepto no se hace nada.
+        """
+        if self.observaciones.get(pos) == percepto:
+            return
+        self.observaciones[pos] = percepto
+        self.version += 1
+
+        if pos not in self.visitadas:
+            self.visitadas.add(pos)
+            self.pozos.marcar_segura(pos)
+            self.soldado.marcar_segura(pos)
+
+        self.pozos.observar(pos, bool(percepto & BIT_BRISA))
+
+        if percepto & BIT_GRITO:
+            self.soldado_muerto = True
+            self.soldado.olvidar()
+        if not self.soldado_muerto:
+            self.soldado.observar(pos, bool(percepto & BIT_RONQUIDO))
+
+    def es_segura(self, pos: Pos) -> bool:
+        """
+        Indica si una celda esta demostrada libre de precipicio y de soldado.
+        """
+        return pos in self.pozos.seguras and (self.soldado_muerto or pos in self.soldado.seguras)
+
+    @property
+    def posibles_peligros(self) -> Set[Pos]:
+        return (self.pozos.candidatas | self.soldado.candidatas) - self.visitadas
+
+    @property
+    def seguros_peligros(self) -> Set[Pos]:
+        return (self.pozos.ciertas | self.soldado.ciertas) - self.visitadas
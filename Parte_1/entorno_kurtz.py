@@ -0,0 +1,95 @@
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
+
+from world import Palacio, BIT_GRITO
+from comun.entorno import Entorno, Paso
+from comun.grid import ACTION_IDX
+
+
+def codificar_obs(idx: int, bits: int, kurtz: bool) -> int:
+    """
+    Observacion entera: bits 0-7 percepto, bit 8 Kurtz encontrado, resto indice de celda.
+    """
+    return bits | (int(kurtz) << 8) | (idx << 9)
+
+
+def decodificar_obs(obs: int) -> Tuple[int, int, bool]:
+    """
+    Inversa de codificar_obs: (indice de celda, bits del percepto, Kurtz encontrado).
+    """
+    return obs >> 9, obs & 0xFF, bool(obs & 0x100)
+
+
+class EntornoKurtz(Entorno):
+    """
+    Palacio de la Parte 1 con interfaz reset(seed)/step(accion).
+
+    Acciones: 0-3 mover UP/DOWN/LEFT/RIGHT, 4 EXIT, 5-8 lanzar la granada hacia
+    UP/DOWN/LEFT/RIGHT. Recompensa -1 por turno, +100 al salir con Kurtz y -100
+    al morir. El episodio se trunca tras max_pasos turnos.
+    """
+
+    ACCIONES = ("UP", "DOWN", "LEFT", "RIGHT", "EXIT", "GRANADA_UP", "GRANADA_DOWN", "GRANADA_LEFT", "GRANADA_RIGHT")
+    RECOMPENSA_PASO = -1.0
+    RECOMPENSA_VICTORIA = 100.0
+    RECOMPENSA_MUERTE = -100.0
+
+    def __init__(self, n: int = 6, n_precipicios: int = 3, solucionable: bool = False, seed: Optional[int] = None, max_pasos: int = 500) -> None:
+        self.n = n
+        self.n_precipicios = n_precipicios
+        self.solucionable = solucionable
+        self.max_pasos = max_pasos
+        self.palacio = Palacio(n=n, seed=seed, n_precipicios=n_precipicios, solucionable=solucionable)
+        self._mov = [self.palacio.rejilla.mover[ACTION_IDX[a]] for a in self.ACCIONES[:4]]
+        self._celdas = self.palacio.rejilla.celdas
+        self._nuevo = True
+
+    def _obs(self, grito: bool = False) -> int:
+        bits = self.palacio.get_percepts_bits(self._celdas[self.pos])
+        return codificar_obs(self.pos, bits | (BIT_GRITO if grito else 0), self.kurtz)
+
+    def _info(self) -> Dict:
+        return {"pos": self._celdas[self.pos], "granada": self.granada, "pasos": self.pasos}
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[int, Dict]:
+        """
+        Con seed se genera el palacio de esa semilla; sin ella se genera el
+        siguiente de la secuencia actual.
+        """
+        if seed is not None:
+            self.palacio = Palacio(n=self.n, seed=seed, n_precipicios=self.n_precipicios, solucionable=self.solucionable)
+        elif not self._nuevo:
+            self.palacio.reset()
+        self._nuevo = False
+        self.pos = 0
+        self.kurtz = False
+        self.granada = True
+        self.pasos = 0
+        return self._obs(), self._info()
+
+    def step(self, accion: int) -> Paso:
+        self.comprobar_accion(accion)
+        palacio = self.palacio
+        self.pasos += 1
+        recompensa = self.RECOMPENSA_PASO
+        terminado = False
+        grito = False
+
+        if accion < 4:
+            self.pos = self._mov[accion][self.pos]
+            pos = self._celdas[self.pos]
+            if pos in palacio.precipicios or (palacio.soldado_vivo and pos == palacio.soldado):
+                recompensa += self.RECOMPENSA_MUERTE
+                terminado = True
+            elif pos == palacio.kurtz:
+                self.kurtz = True
+        elif accion == 4:
+            if self.kurtz and self._celdas[self.pos] == palacio.salida:
+                recompensa += self.RECOMPENSA_VICTORIA
+                terminado = True
+        elif self.granada:
+            self.granada = False
+            grito = palacio.throw_grenade(self._celdas[self.pos], self.ACCIONES[accion][8:])
+
+        truncado = not terminado and self.pasos >= self.max_pasos
+        return self._obs(grito), recompensa, terminado, truncado, self._info()
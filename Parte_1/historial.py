@@ -0,0 +1,90 @@
+from __future__ import annotations
+from array import array
+from typing import Iterator, List, Optional, Set, Tuple
+
+from world import Pos, Percepto, PERCEPT_BITS, _PERCEPTOS
+
+
+class HistorialPerceptos:
+    """
+    Historial compacto de perceptos del agente (estructura de arrays).
+
+    Cada entrada guarda el indice plano de la posicion y los bits del percepto en
+    arrays tipados. Con capacidad se comporta como un buffer circular y conserva
+    solo las ultimas entradas, de modo que la memoria no crece en sesiones largas.
+    Los indices resumen (celdas vistas con / sin cada percepto) se actualizan en
+    cada append y cubren toda la sesion, por lo que las consultas no recorren el
+    historial.
+    """
+
+    def __init__(self, n: int, capacidad: Optional[int] = None) -> None:
+        self.n = n
+        self.capacidad = capacidad
+        self._pos = array("I")
+        self._bits = array("H")
+        self._inicio = 0
+        self.total = 0
+        self._con: List[Set[Pos]] = [set() for _ in PERCEPT_BITS]
+        self._sin: List[Set[Pos]] = [set() for _ in PERCEPT_BITS]
+        self._bit_idx = {b: k for k, (_, b) in enumerate(PERCEPT_BITS)}
+        self.visitadas: Set[Pos] = set()
+        self._ultimo = {}
+
+    def append(self, pos: Pos, percepto: int) -> None:
+        i = (pos[0] - 1) * self.n + (pos[1] - 1)
+        if self.capacidad is None or len(self._pos) < self.capacidad:
+            self._pos.append(i)
+            self._bits.append(percepto)
+        else:
+            self._pos[self._inicio] = i
+            self._bits[self._inicio] = percepto
+            self._inicio = (self._inicio + 1) % self.capacidad
+        self.total += 1
+
+        self.visitadas.add(pos)
+        if self._ultimo.get(pos) != percepto:
+            self._ultimo[pos] = percepto
+            for k, (_, b) in enumerate(PERCEPT_BITS):
+                (self._con if percepto & b else self._sin)[k].add(pos)
+
+    def _pos_de(self, i: int) -> Pos:
+        fila, col = divmod(i, self.n)
+        return (fila + 1, col + 1)
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    def __getitem__(self, k: int) -> Tuple[Pos, Percepto]:
+        """
+        Entrada k de las conservadas (0 = la mas antigua, -1 = la ultima).
+        """
+        m = len(self._pos)
+        if k < 0:
+            k += m
+        if not 0 <= k < m:
+            raise IndexError(k)
+        j = (self._inicio + k) % m
+        return self._pos_de(self._pos[j]), _PERCEPTOS[self._bits[j]]
+
+    def __iter__(self) -> Iterator[Tuple[Pos, Percepto]]:
+        for k in range(len(self._pos)):
+            yield self[k]
+
+    def celdas_con(self, bit: int) -> Set[Pos]:
+        """
+        Celdas donde alguna vez se ha percibido el bit dado (p. ej. BIT_BRISA).
+        """
+        return self._con[self._bit_idx[bit]]
+
+    def celdas_sin(self, bit: int) -> Set[Pos]:
+        """
+        Celdas donde alguna vez se ha observado la ausencia del bit dado.
+        """
+        return self._sin[self._bit_idx[bit]]
+
+    def ultimo(self, pos: Pos) -> Optional[Percepto]:
+        """
+        Ultimo percepto observado en la celda (o None si no se ha visitado).
+        """
+        bits = self._ultimo.get(pos)
+        return None if bits is None else _PERCEPTOS[bits]
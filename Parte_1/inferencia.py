@@ -0,0 +1,177 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from math import comb
+from typing import Dict, List, Optional, Set, Tuple
+
+from world import Pos, rejilla, BIT_BRISA, BIT_RONQUIDO
+from conocimiento import BaseConocimiento
+from comun.grid import indices_mascara
+
+
+@dataclass
+class Inferencia:
+    """
+    Resultado de la inferencia: probabilidad de precipicio y de soldado por celda.
+    """
+
+    p_pozo: Dict[Pos, float] = field(default_factory=dict)
+    p_soldado: Dict[Pos, float] = field(default_factory=dict)
+
+    def riesgo(self, pos: Pos) -> float:
+        """
+        Probabilidad de morir al entrar en la celda.
+        """
+        return 1.0 - (1.0 - self.p_pozo.get(pos, 0.0)) * (1.0 - self.p_soldado.get(pos, 0.0))
+
+    def seguras(self) -> Set[Pos]:
+        """
+        Celdas sin precipicio ni soldado en todos los mundos consistentes.
+        """
+        return {p for p in self.p_pozo if self.p_pozo[p] == 0.0 and self.p_soldado.get(p, 0.0) == 0.0}
+
+    def peligrosas(self) -> Set[Pos]:
+        """
+        Celdas con precipicio o soldado en todos los mundos consistentes.
+        """
+        return {p for p in self.p_pozo if self.p_pozo[p] == 1.0 or self.p_soldado.get(p, 0.0) == 1.0}
+
+
+def _enumerar(frontera: List[int], restricciones: List[int], k_total: int, m_otras: int) -> Tuple[int, List[int], int]:
+    """
+    Enumera los subconjuntos de la frontera con como mucho k_total elementos que
+    cortan a todas las restricciones (mascaras de celdas). Cada subconjunto de
+    tamano k se pondera por C(m_otras, k_total - k), las formas de colocar el resto
+    fuera de la frontera.
+
+    Devuelve (peso total, peso por celda de la frontera, peso de los elementos
+    colocados fuera de la frontera).
+    """
+    orden = {c: t for t, c in enumerate(frontera)}
+    cierre: List[List[int]] = [[] for _ in frontera]
+    for r in restricciones:
+        cierre[max(orden[c] for c in indices_mascara(r))].append(r)
+
+    total = 0
+    peso_celda = [0] * len(frontera)
+    peso_otras = 0
+    elegidas: List[int] = []
+
+    def hoja(k: int) -> None:
+        nonlocal total, peso_otras
+        w = comb(m_otras, k_total - k)
+        if w == 0:
+            return
+        total += w
+        peso_otras += w * (k_total - k)
+        for t in elegidas:
+            peso_celda[t] += w
+
+    def dfs(t: int, elegido: int, k: int) -> None:
+        if t == len(frontera):
+            hoja(k)
+            return
+
+        e2 = elegido | (1 << frontera[t])
+        if all(r & e2 for r in cierre[t]):
+            elegidas.append(t)
+            if k + 1 == k_total:
+                # Sin presupuesto: el resto de la frontera queda vacio.
+                if all(r & e2 for r in restricciones):
+                    hoja(k + 1)
+            else:
+                dfs(t + 1, e2, k + 1)
+            elegidas.pop()
+
+        if all(r & elegido for r in cierre[t]):
+            dfs(t + 1, elegido, k)
+
+    if k_total == 0:
+        if not restricciones:
+            hoja(0)
+    else:
+        dfs(0, 0, 0)
+    return total, peso_celda, peso_otras
+
+
+class MotorInferencia:
+    """
+    Inferencia exacta por comprobacion de modelos para la Parte 1.
+
+    Los mundos se codifican como bitsets sobre el tablero nxn. Para cada tipo de
+    peligro (los n_precipicios precipicios y el soldado) se enumeran, con poda,
+    las colocaciones en la frontera consistentes con los perceptos; las celdas
+    desconocidas fuera de la frontera se cuentan combinatoriamente. Cada tipo de
+    peligro se trata por separado (no se usa que el soldado no comparte celda con
+    un precipicio).
+    """
+
+    def __init__(self, n: int, n_precipicios: int = 3) -> None:
+        self.n = n
+        self.n_precipicios = n_precipicios
+        self.rejilla = rejilla(n)
+        self._celdas = self.rejilla.celdas
+        self._todas = self.rejilla.full
+        self._cache: Tuple[Tuple[int, int], Optional[Inferencia]] = ((0, -1), None)
+
+    def _mask_vecinos(self, pos: Pos) -> int:
+        return self.rejilla.expandir(1 << self.rejilla.idx(pos))
+
+    def _probabilidades(self, kb: BaseConocimiento, bit: int, k_total: int) -> Dict[Pos, float]:
+        """
+        Probabilidad por celda de un tipo de peligro detectado con el bit dado.
+        """
+        seguras = self.rejilla.mascara(kb.visitadas)
+        positivas = []
+        for pos, per in kb.observaciones.items():
+            if per & bit:
+                positivas.append(self._mask_vecinos(pos))
+            else:
+                seguras |= self._mask_vecinos(pos)
+
+        restricciones = [m & ~seguras for m in positivas]
+        frontera_mask = 0
+        for r in restricciones:
+            frontera_mask |= r
+        otras_mask = self._todas & ~seguras & ~frontera_mask
+        m_otras = bin(otras_mask).count("1")
+
+        out = {p: 0.0 for p in self._celdas}
+        if k_total == 0:
+            return out
+
+        frontera = self.rejilla.indices(frontera_mask)
+        total = 0
+        if all(restricciones):
+            total, peso_celda, peso_otras = _enumerar(frontera, restricciones, k_total, m_otras)
+
+        if total == 0:
+            # Perceptos inconsistentes con el modelo: prior uniforme sobre lo desconocido.
+            libres = self.rejilla.indices(self._todas & ~seguras)
+            for c in libres:
+                out[self._celdas[c]] = min(1.0, k_total / len(libres))
+            return out
+
+        for t, c in enumerate(frontera):
+            out[self._celdas[c]] = peso_celda[t] / total
+        if m_otras:
+            p_otra = peso_otras / (total * m_otras)
+            for c in self.rejilla.indices(otras_mask):
+                out[self._celdas[c]] = p_otra
+        return out
+
+    def inferir(self, kb: BaseConocimiento) -> Inferencia:
+        """
+        Calcula las probabilidades de precipicio y soldado por celda. El resultado
+        se reutiliza mientras la base de conocimiento no cambie.
+        """
+        clave, res = self._cache
+        if res is not None and clave == (id(kb), kb.version):
+            return res
+
+        k_soldado = 0 if kb.soldado_muerto else 1
+        res = Inferencia(
+            p_pozo=self._probabilidades(kb, BIT_BRISA, self.n_precipicios),
+            p_soldado=self._probabilidades(kb, BIT_RONQUIDO, k_soldado),
+        )
+        self._cache = ((id(kb), kb.version), res)
+        return res
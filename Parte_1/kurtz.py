@@ -1,162 +1,147 @@
 from __future__ import annotations
+from typing import Optional
 import os
-import time
+import sys
+
+if __name__ == "__main__":
+    # Ejecutado como script: la raiz del repo (paquete comun) no esta en sys.path.
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from world import Palacio, render_ascii
+from comun.fotogramas import ConsumidorHilo, ConsumidorSincrono
+from comun.terminal import Pantalla
 from agent import Agente
-from search_agent import bfs_path, path_to_actions
-
+from conocimiento import BaseConocimiento
+from inferencia import MotorInferencia
+from agente_auto import AgenteAutonomo
 
-def main() -> None:
-    palacio = Palacio()
-    agente = Agente()
-    visitados = []
-    mostrar = False
-    kurtz = False
-    modo = input("Modo MANUAL o AUTO: ").upper()
-    if modo == "AUTO": 
-        mostrar = True
-        inicio = agente.state.pos
 
-        bloqueado = set(palacio.precipicios)
-        if palacio.soldado_vivo:
-            bloqueado.add(palacio.soldado)
+def _pintor(palacio: Palacio):
+    """
+    Funcion que pinta un fotograma de main (ver comun.fotogramas).
+    """
+    pantalla = Pantalla()
 
-        path1 = bfs_path(palacio.n, inicio, palacio.kurtz, bloqueado)
-        if path1 is None:
-            print("No existe camino seguro hasta Kurtz.")
-            return
+    def pintar(f: dict) -> None:
+        render_ascii(palacio, agent_pos=f["pos"], visitado=f["visitados"], reveal=f["mostrar"], kurtz=f["kurtz"], posibles_peligros=f["posibles"], seguros_peligros=f["seguros"],
+                     pantalla=pantalla, pie=f["pie"])
 
-        path2 = bfs_path(palacio.n, palacio.kurtz, palacio.salida, bloqueado)
-        if path2 is None:
-            print("No existe camino seguro desde Kurtz a la salida.")
-            return
+    return pintar
 
-        full_path = path1 + path2[1:]
-        plan = path_to_actions(full_path)
 
-        plan_idx = 0
-    
-    posibles_peligros = set()
+def main(modo: Optional[str] = None, pausa: float = 1.0) -> None:
+    """
+    Partida en modo MANUAL (se pinta antes de pedir cada accion) o AUTO. En AUTO
+    la simulacion no duerme ni espera al renderizado: los fotogramas se pintan
+    desde otro hilo, uno cada pausa segundos, descartando los que no le de
+    tiempo a pintar, y los mensajes se mantienen en pantalla unos segundos.
+    """
+    visitados = set()
+    mostrar = False
+    kurtz = False
+    if modo is None:
+        modo = input("Modo MANUAL o AUTO: ")
+    modo = modo.upper()
+    palacio = Palacio(solucionable=(modo == "AUTO"))
+    agente = Agente(palacio.n)
+    if modo == "AUTO": 
+        mostrar = True
+        agente = AgenteAutonomo(n=palacio.n, n_precipicios=palacio.n_precipicios)
+        kb = agente.kb
+        motor = agente.motor
+        consumidor = ConsumidorHilo(_pintor(palacio), fps=1.0 / pausa if pausa > 0 else None)
+    else:
+        kb = BaseConocimiento(palacio.n)
+        motor = MotorInferencia(palacio.n, n_precipicios=palacio.n_precipicios)
+        consumidor = ConsumidorSincrono(_pintor(palacio))
+
+    percepts = None
     seguros_peligros = set()
 
-    while agente.state.vivo:
-        os.system("cls")
-        visitados.append(agente.state.pos)
-        percepts = agente.perceive(palacio)
-
-        visitados_set = set(visitados)
-
-        def vecinos(p):
-            return palacio.neighbors(p)
-
-        no_pit = set()
-        brisa_pos = []
-        for pos, per in agente.history:
-            if not per.get("brisa", False):
-                no_pit.update(vecinos(pos))
+    def fotograma(*mensajes: str, espera: float = 0.0) -> None:
+        consumidor.enviar({
+            "pos": agente.state.pos,
+            "visitados": frozenset(visitados),
+            "mostrar": mostrar,
+            "kurtz": kurtz,
+            "posibles": kb.posibles_peligros,
+            "seguros": seguros_peligros,
+            "pie": [f"percept(s) = {percepts}", *mensajes],
+        }, espera)
+
+    with consumidor:
+        while agente.state.vivo:
+            visitados.add(agente.state.pos)
+            percepts = agente.perceive(palacio)
+            kb.ingest(agente.state.pos, percepts)
+            inferencia = motor.inferir(kb)
+            seguros_peligros = kb.seguros_peligros | (inferencia.peligrosas() - kb.visitadas)
+            fotograma()
+
+            if modo == "AUTO":
+                action = agente.choose_action_auto()
+                if action == "NOOP":
+                    fotograma("No quedan celdas alcanzables.")
+                    break
             else:
-                brisa_pos.append(pos)
-
-        cand_pit = set()
-        sure_pit = set()
-        for pos in brisa_pos:
-            cand = set(vecinos(pos)) - no_pit
-            cand_pit.update(cand)
-            if len(cand) == 1:
-                sure_pit.update(cand)
-
-        no_sold = set()
-        ronq_pos = []
-        for pos, per in agente.history:
-            if not per.get("ronquido", False):
-                no_sold.update(vecinos(pos))
-            else:
-                ronq_pos.append(pos)
-
-        cand_sold = set()
-        sure_sold = set()
-        for pos in ronq_pos:
-            cand = set(vecinos(pos)) - no_sold
-            cand_sold.update(cand)
-            if len(cand) == 1:
-                sure_sold.update(cand)
-
-        posibles_peligros = set().union(cand_pit, cand_sold) - visitados_set
-        seguros_peligros  = set().union(sure_pit, sure_sold) - visitados_set
-
-
-        render_ascii(palacio, agent_pos=agente.state.pos, visitado=visitados, reveal=mostrar, kurtz=kurtz, posibles_peligros=posibles_peligros, seguros_peligros=seguros_peligros)
-
-        percepts = agente.perceive(palacio)
-        print("percept(s) =", percepts)
-        
-        if modo == "AUTO":
-            time.sleep(1)
-            if plan_idx >= len(plan):
-                action = "EXIT"
-            else:
-                action = plan[plan_idx]
-                plan_idx += 1
-        else:
-            action = agente.choose_action_manual()
-
-        if action in ("UP", "DOWN", "LEFT", "RIGHT"):
-            new_pos = palacio.step_move(agente.state.pos, action)
-            agente.state.pos = new_pos
-
-            if new_pos in palacio.precipicios:
-                agente.state.vivo = False
-                print("Has caído en un precipicio.")
-                break
-
-            if palacio.soldado_vivo and (new_pos == palacio.soldado):
-                agente.state.vivo = False
-                print("El soldado enemigo te ha eliminado.")
-                break
-
-            if new_pos == palacio.kurtz:
-                agente.state.has_kurtz = True
-                kurtz = True
-                print("Has encontrado al Coronel Kurtz. Ahora viajáis juntos.")
-                time.sleep(3)
-
-        elif action == "EXIT":
-            if palacio.salida == agente.state.pos and agente.state.has_kurtz:
-                print("¡Misión completada! Has salido con Kurtz.")
-                return
-            else:
-                print("No puedes salir: necesitas estar en la salida y haber encontrado a Kurtz.")
-                time.sleep(3)
-        elif action == "MAPA":
-            mostrar = not mostrar
-            
-        elif action == "GRANADA":
-            if not agente.state.has_grenade:
-                print("Ya no te quedan granadas.")
-                time.sleep(2)
-            else:
-                d = input("Dirección granada [w/a/s/d]: ").strip().lower()
-                dir_map = {"w": "UP", "s": "DOWN", "a": "LEFT", "d": "RIGHT"}
-
-                if d not in dir_map:
-                    print("Dirección inválida.")
-                    time.sleep(2)
+                action = agente.choose_action_manual()
+
+            if action in ("UP", "DOWN", "LEFT", "RIGHT"):
+                new_pos = palacio.step_move(agente.state.pos, action)
+                agente.state.pos = new_pos
+
+                if new_pos in palacio.precipicios:
+                    agente.state.vivo = False
+                    fotograma("Has caído en un precipicio.")
+                    break
+
+                if palacio.soldado_vivo and (new_pos == palacio.soldado):
+                    agente.state.vivo = False
+                    fotograma("El soldado enemigo te ha eliminado.")
+                    break
+
+                if new_pos == palacio.kurtz:
+                    agente.state.has_kurtz = True
+                    kurtz = True
+                    fotograma("Has encontrado al Coronel Kurtz. Ahora viajáis juntos.", espera=3)
+
+            elif action == "EXIT":
+                if palacio.salida == agente.state.pos and agente.state.has_kurtz:
+                    fotograma("¡Misión completada! Has salido con Kurtz.")
+                    return
                 else:
-                    direction = dir_map[d]
+                    if modo == "AUTO":
+                        agente.salida_fallida()
+                    fotograma("No puedes salir: necesitas estar en la salida y haber encontrado a Kurtz.", espera=3)
+            elif action == "MAPA":
+                mostrar = not mostrar
+
+            elif action == "GRANADA":
+                if not agente.state.has_grenade:
+                    fotograma("Ya no te quedan granadas.", espera=2)
+                else:
+                    dir_map = {"w": "UP", "s": "DOWN", "a": "LEFT", "d": "RIGHT"}
+                    if modo == "AUTO":
+                        d = {v: k for k, v in dir_map.items()}[agente.dir_granada]
+                    else:
+                        d = input("Dirección granada [w/a/s/d]: ").strip().lower()
 
-                    killed = palacio.throw_grenade(agente.state.pos, direction)
+                    if d not in dir_map:
+                        fotograma("Dirección inválida.", espera=2)
+                    else:
+                        direction = dir_map[d]
 
-                    agente.state.has_grenade = False
+                        killed = palacio.throw_grenade(agente.state.pos, direction)
 
-                    if killed:
-                        agente.state.ult_grito = True
-                        print("¡Impacto! Has eliminado al soldado (grito).")
-                    else:
-                        print("La granada no ha tenido efecto.")
+                        agente.state.has_grenade = False
 
-                    time.sleep(2)
-        else:
-            print("Acción no válida.")
+                        if killed:
+                            agente.state.ult_grito = True
+                            fotograma("¡Impacto! Has eliminado al soldado (grito).", espera=2)
+                        else:
+                            fotograma("La granada no ha tenido efecto.", espera=2)
+            else:
+                fotograma("Acción no válida.")
 
     print("Fin del juego.")
 
@@ -1,14 +1,12 @@
 from __future__ import annotations
+from array import array
 from collections import deque
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Iterable, List, Optional, Set, Tuple
+import heapq
 
-Pos = Tuple[int, int]
+from comun import perfil
+from comun.grid import DIRS, Pos, rejilla
 
-DIRS = {"UP": (-1, 0),
-    "DOWN": (1, 0),
-    "LEFT": (0, -1),
-    "RIGHT": (0, 1),
-}
 
 def add(pos: Pos, d: Tuple[int, int]) -> Pos:
     """
@@ -22,6 +20,7 @@ def en_limite(pos: Pos, n: int) -> bool:
     """
     return 1 <= pos[0] <= n and 1 <= pos[1] <= n
 
+@perfil.medido("bfs_path")
 def bfs_path(n: int, start: Pos, meta: Pos, bloqueado: Set[Pos]) -> Optional[List[Pos]]:
     """
     Camino mínimo (lista de posiciones) evitando bloqueado. Devuelve None si no hay camino.
@@ -30,31 +29,225 @@ def bfs_path(n: int, start: Pos, meta: Pos, bloqueado: Set[Pos]) -> Optional[Lis
     if start == meta:
         return [start]
 
-    q = deque([start])
-    padre: Dict[Pos, Optional[Pos]] = {start: None}
+    vec = rejilla(n).vecinos
+    bloq = _mascara_bloqueo(n, bloqueado)
+    s = (start[0] - 1) * n + (start[1] - 1)
+    m = (meta[0] - 1) * n + (meta[1] - 1)
+    padre = array("i", [-1]) * (n * n)
+    padre[s] = s
+    q = deque([s])
 
     while q:
         actual = q.popleft()
-        for d in DIRS.values():
-            sig = add(actual, d)
-            if not en_limite(sig, n):
-                continue
-            if sig in bloqueado:
-                continue
-            if sig in padre:
+        for sig in vec[actual]:
+            if bloq[sig] or padre[sig] != -1:
                 continue
             padre[sig] = actual
-            if sig == meta:
-                path = [sig]
-                while path[-1] is not None:
-                    path.append(padre[path[-1]])
-                path.pop()
+            if sig == m:
+                path = []
+                while sig != s:
+                    fila, col = divmod(sig, n)
+                    path.append((fila + 1, col + 1))
+                    sig = padre[sig]
+                path.append(start)
                 path.reverse()
                 return path
             q.append(sig)
 
     return None
 
+def _mascara_bloqueo(n: int, bloqueado: Iterable[Pos]) -> bytearray:
+    bloq = bytearray(n * n)
+    for fila, col in bloqueado:
+        if 1 <= fila <= n and 1 <= col <= n:
+            bloq[(fila - 1) * n + (col - 1)] = 1
+    return bloq
+
+
+def astar_path(n: int, start: Pos, meta: Pos, bloqueado: Set[Pos]) -> Optional[List[Pos]]:
+    """
+    Camino minimo con A* y heuristica manhattan sobre un grid plano.
+    Mismo contrato que bfs_path: lista de posiciones o None si no hay camino.
+    """
+    if start == meta:
+        return [start]
+
+    bloq = _mascara_bloqueo(n, bloqueado)
+    s = (start[0] - 1) * n + (start[1] - 1)
+    m = (meta[0] - 1) * n + (meta[1] - 1)
+    if bloq[m]:
+        return None
+    mf, mc = divmod(m, n)
+    vec = rejilla(n).vecinos
+
+    g = array("i", [-1]) * (n * n)
+    padre = array("i", [-1]) * (n * n)
+    g[s] = 0
+    # (f, -g, celda): a igualdad de f se expande primero la mas profunda.
+    abiertos = [(abs(start[0] - meta[0]) + abs(start[1] - meta[1]), 0, s)]
+
+    while abiertos:
+        _, menos_g, actual = heapq.heappop(abiertos)
+        ga = -menos_g
+        if ga != g[actual]:
+            continue
+        if actual == m:
+            path = []
+            while actual != -1:
+                fila, col = divmod(actual, n)
+                path.append((fila + 1, col + 1))
+                actual = padre[actual]
+            path.reverse()
+            return path
+        for sig in vec[actual]:
+            if bloq[sig]:
+                continue
+            gs = ga + 1
+            if g[sig] == -1 or gs < g[sig]:
+                g[sig] = gs
+                padre[sig] = actual
+                fila, col = divmod(sig, n)
+                heapq.heappush(abiertos, (gs + abs(fila - mf) + abs(col - mc), -gs, sig))
+
+    return None
+
+
+class CampoDistancias:
+    """
+    Campo de distancias BFS multi-origen sobre el grid nxn (indices planos).
+
+    Se calcula una vez y responde muchas consultas: distancia de cualquier celda
+    al origen mas cercano (Kurtz, salida, frontera...) y el camino descendiendo
+    por el campo. Cuando cambia una celda bloqueada (p. ej. muere el soldado)
+    solo se recalcula la zona afectada.
+    """
+
+    INF = -1
+
+    def __init__(self, n: int, fuentes: Iterable[Pos], bloqueado: Iterable[Pos] = ()) -> None:
+        self.n = n
+        self._vec = rejilla(n).vecinos
+        self.bloq = _mascara_bloqueo(n, bloqueado)
+        self.fuentes = {(f - 1) * n + (c - 1) for f, c in fuentes}
+        self.dist = array("i", [self.INF]) * (n * n)
+        self._recalcular()
+
+    def _recalcular(self) -> None:
+        dist = self.dist
+        q = deque()
+        for s in self.fuentes:
+            if not self.bloq[s]:
+                dist[s] = 0
+                q.append(s)
+        self._propagar(q)
+
+    def _propagar(self, q: deque) -> None:
+        """
+        BFS desde las celdas de la cola, bajando distancias donde mejoren.
+        """
+        dist, bloq, n = self.dist, self.bloq, self.n
+        while q:
+            actual = q.popleft()
+            d = dist[actual] + 1
+            for sig in self._vec[actual]:
+                if bloq[sig]:
+                    continue
+                if dist[sig] == -1 or d < dist[sig]:
+                    dist[sig] = d
+                    q.append(sig)
+
+    def distancia(self, pos: Pos) -> Optional[int]:
+        d = self.dist[(pos[0] - 1) * self.n + (pos[1] - 1)]
+        return None if d == self.INF else d
+
+    def camino(self, pos: Pos) -> Optional[List[Pos]]:
+        """
+        Camino minimo desde pos hasta el origen mas cercano siguiendo el gradiente.
+        """
+        n, dist = self.n, self.dist
+        actual = (pos[0] - 1) * n + (pos[1] - 1)
+        if dist[actual] == self.INF:
+            return None
+        path = [pos]
+        while dist[actual] > 0:
+            for sig in self._vec[actual]:
+                if dist[sig] == dist[actual] - 1:
+                    actual = sig
+                    break
+            fila, col = divmod(actual, n)
+            path.append((fila + 1, col + 1))
+        return path
+
+    def desbloquear(self, pos: Pos) -> None:
+        """
+        La celda deja de estar bloqueada: las distancias solo pueden bajar.
+        """
+        n, dist = self.n, self.dist
+        i = (pos[0] - 1) * n + (pos[1] - 1)
+        if not self.bloq[i]:
+            return
+        self.bloq[i] = 0
+        if i in self.fuentes:
+            dist[i] = 0
+        else:
+            vec = [dist[j] for j in self._vec[i] if dist[j] != self.INF]
+            if not vec:
+                return
+            dist[i] = min(vec) + 1
+        self._propagar(deque([i]))
+
+    def bloquear(self, pos: Pos) -> None:
+        """
+        La celda pasa a estar bloqueada: se invalidan solo las celdas cuyo camino
+        minimo dependia de ella y se recalculan desde el borde de esa zona.
+        """
+        n, dist, bloq = self.n, self.dist, self.bloq
+        i = (pos[0] - 1) * n + (pos[1] - 1)
+        if bloq[i]:
+            return
+        bloq[i] = 1
+        if dist[i] == self.INF:
+            return
+
+        # Las celdas afectadas se recorren por niveles: al tratar el nivel d ya
+        # estan marcadas todas las afectadas de ese nivel.
+        afectadas = {i}
+        q = deque([i])
+        while q:
+            actual = q.popleft()
+            d = dist[actual]
+            for sig in self._vec[actual]:
+                if sig in afectadas or bloq[sig] or dist[sig] != d + 1 or sig in self.fuentes:
+                    continue
+                apoyo = any(
+                    dist[w] == d and w not in afectadas and not bloq[w]
+                    for w in self._vec[sig]
+                )
+                if not apoyo:
+                    afectadas.add(sig)
+                    q.append(sig)
+
+        for c in afectadas:
+            dist[c] = self.INF
+        afectadas.discard(i)
+
+        # Reinsercion desde el borde de la zona invalidada (Dijkstra de coste unitario).
+        heap = []
+        for c in afectadas:
+            vec = [dist[w] for w in self._vec[c] if dist[w] != self.INF and not bloq[w]]
+            if vec:
+                heap.append((min(vec) + 1, c))
+        heapq.heapify(heap)
+        while heap:
+            d, c = heapq.heappop(heap)
+            if dist[c] != self.INF and dist[c] <= d:
+                continue
+            dist[c] = d
+            for w in self._vec[c]:
+                if w in afectadas and (dist[w] == self.INF or dist[w] > d + 1):
+                    heapq.heappush(heap, (d + 1, w))
+
+
 def path_to_actions(path: List[Pos]) -> List[str]:
     """
     Convierte el path a una lista de acciones ["UP"/"DOWN"/...].
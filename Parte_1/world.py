@@ -1,30 +1,84 @@
 from __future__ import annotations
-from typing import Set, Tuple, List
+from collections import deque
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
 import random
-import shutil
 
-Pos = Tuple[int, int]
+from comun import perfil
+from comun.perceptos import decodificar, tipo_percepto
+from comun.grid import Pos, move, rejilla
+from comun.terminal import Pantalla, imprimir, margen_centrado, ventana, ventana_terminal
 
-def move(pos: Pos, accion: str) -> Pos:
+# Bits de los perceptos cuando se codifican como entero.
+BIT_BRISA = 1 << 0
+BIT_RONQUIDO = 1 << 1
+BIT_RESPLANDOR = 1 << 2
+BIT_PARED_UP = 1 << 3
+BIT_PARED_DOWN = 1 << 4
+BIT_PARED_LEFT = 1 << 5
+BIT_PARED_RIGHT = 1 << 6
+BIT_GRITO = 1 << 7
+
+PERCEPT_BITS = (
+    ("brisa", BIT_BRISA), ("ronquido", BIT_RONQUIDO), ("resplandor", BIT_RESPLANDOR),
+    ("pared_up", BIT_PARED_UP), ("pared_down", BIT_PARED_DOWN),
+    ("pared_left", BIT_PARED_LEFT), ("pared_right", BIT_PARED_RIGHT),
+    ("grito", BIT_GRITO),
+)
+
+
+def decode_percepts(bits: int) -> dict:
     """
-    Funcion que recibe una posicion y una accion y devuelve
-    la posicion obtenida tras la accion.
+    Convierte un percepto codificado como entero al formato diccionario.
     """
-    fila, col = pos
-    if accion == "UP":
-        return (fila - 1, col)
-    if accion == "DOWN":
-        return (fila + 1, col)
-    if accion == "LEFT":
-        return (fila, col - 1)
-    if accion == "RIGHT":
-        return (fila, col + 1)
-    return pos
+    return decodificar(PERCEPT_BITS, bits)
+
+
+# Percepto como entero con acceso por nombre: p.brisa, p["brisa"], p.get("brisa").
+Percepto = tipo_percepto("Percepto", PERCEPT_BITS, __name__)
 
 
+# Una instancia compartida por cada valor posible: las tablas no crean objetos.
+_PERCEPTOS = [Percepto(b) for b in range(1 << len(PERCEPT_BITS))]
+
+
+@lru_cache(maxsize=None)
+def _paredes(n: int) -> Tuple[int, ...]:
+    """
+    Bits de pared de cada celda (indice plano) de un tablero nxn.
+    """
+    out = []
+    for fila in range(1, n + 1):
+        for col in range(1, n + 1):
+            bits = 0
+            if fila == 1:
+                bits |= BIT_PARED_UP
+            if fila == n:
+                bits |= BIT_PARED_DOWN
+            if col == 1:
+                bits |= BIT_PARED_LEFT
+            if col == n:
+                bits |= BIT_PARED_RIGHT
+            out.append(bits)
+    return tuple(out)
+
+
+def encode_percepts(obs) -> Percepto:
+    """
+    Convierte un percepto en formato diccionario (o ya codificado) a Percepto.
+    """
+    return Percepto.codificar(obs)
+
 class Palacio:
-    def __init__(self, n: int = 6) -> None:
+    def __init__(self, n: int = 6, seed: Optional[int] = None, n_precipicios: int = 3, solucionable: bool = False) -> None:
+        if n * n - 1 < n_precipicios + 3:
+            raise ValueError(f"Tablero {n}x{n} demasiado pequeño para {n_precipicios} precipicios.")
         self.n = n
+        self.rejilla = rejilla(n)
+        self.seed = seed
+        self.n_precipicios = n_precipicios
+        self.solucionable = solucionable
+        self._rng = random.Random(seed)
         self.precipicios: Set[Pos] = set()
         self.soldado: Pos | None = None
         self.soldado_vivo: bool = True
@@ -32,31 +86,66 @@ class Palacio:
         self.salida: Pos | None = None
         self.reset()
 
-    def reset(self) -> None:
+    def reset(self, solucionable: Optional[bool] = None, max_intentos: int = 1000) -> None:
         """
-        Reinicia la configuracion del palacio.
+        Reinicia la configuracion del palacio. En modo solucionable solo acepta
+        configuraciones con camino inicio -> Kurtz -> salida que evite precipicios
+        y soldado.
         """
+        if solucionable is None:
+            solucionable = self.solucionable
         inicio = (1, 1)
         cells: List[Pos] = [(fila, col) for fila in range(1, self.n + 1) for col in range(1, self.n + 1)]
         cells.remove(inicio)
-        random.shuffle(cells)
+        k = self.n_precipicios
+
+        for _ in range(max_intentos):
+            elegidas = self._rng.sample(cells, k + 3)
 
-        self.precipicios = set(cells[:3])
-        restantes = cells[3:]
+            self.precipicios = set(elegidas[:k])
+            self.soldado = elegidas[k]
+            self.salida = elegidas[k + 1]
+            self.kurtz = elegidas[k + 2]
+            self.soldado_vivo = True
 
-        self.soldado = restantes[0]
-        self.salida = restantes[1]
-        self.kurtz = restantes[2]
-        self.soldado_vivo = True
+            if not solucionable or self.es_solucionable():
+                self._validate()
+                self._build_percept_table()
+                return
+
+        raise RuntimeError("No se pudo generar un palacio solucionable (prueba otra seed o menos precipicios).")
+
+    def es_solucionable(self) -> bool:
+        """
+        Indica si Kurtz y la salida son alcanzables desde el inicio sin pisar
+        precipicios ni el soldado (BFS sobre indices planos).
+        """
+        r = self.rejilla
+        bloq = bytearray(r.size)
+        for p in self.precipicios:
+            bloq[r.idx(p)] = 1
+        bloq[r.idx(self.soldado)] = 1
 
-        self._validate()
+        objetivos = {r.idx(self.kurtz), r.idx(self.salida)}
+        bloq[0] = 1
+        q = deque([0])
+        while q:
+            actual = q.popleft()
+            objetivos.discard(actual)
+            if not objetivos:
+                return True
+            for sig in r.vecinos[actual]:
+                if not bloq[sig]:
+                    bloq[sig] = 1
+                    q.append(sig)
+        return False
 
     def _validate(self) -> None:
         """
         Valida la configuracion generada.
         """
         inicio = (1, 1)
-        assert len(self.precipicios) == 3
+        assert len(self.precipicios) == self.n_precipicios
         assert inicio not in self.precipicios
         assert self.soldado not in self.precipicios
         assert self.kurtz not in self.precipicios
@@ -64,6 +153,39 @@ class Palacio:
         posiciones = list(self.precipicios) + [self.soldado, self.kurtz, self.salida]
         assert len(set(posiciones)) == len(posiciones)
 
+    def _build_percept_table(self) -> None:
+        """
+        Precalcula los perceptos de cada celda como enteros (sin el grito).
+        Solo el ronquido puede cambiar (si muere el soldado), por eso se guardan
+        las celdas donde se oye para poder quitar ese bit.
+        """
+        n = self.n
+        idx = lambda p: (p[0] - 1) * n + (p[1] - 1)
+        tabla = list(_paredes(n))
+
+        # Cada peligro marca sus vecinos: O(n^2 + peligros) en vez de mirar
+        # los vecinos de todas las celdas.
+        for p in self.precipicios:
+            for q in self.neighbors(p):
+                tabla[idx(q)] |= BIT_BRISA
+        self._celdas_ronquido: List[int] = [idx(q) for q in self.neighbors(self.soldado)]
+        for i in self._celdas_ronquido:
+            tabla[i] |= BIT_RONQUIDO
+        for q in self.rejilla.entorno_pos[self.salida]:
+            tabla[idx(q)] |= BIT_RESPLANDOR
+
+        self._tabla_perceptos: List[Percepto] = [_PERCEPTOS[b] for b in tabla]
+
+        if not self.soldado_vivo:
+            self._clear_soldier_bit()
+
+    def _clear_soldier_bit(self) -> None:
+        """
+        Quita el bit de ronquido de la tabla de perceptos (el soldado ha muerto).
+        """
+        for i in self._celdas_ronquido:
+            self._tabla_perceptos[i] = _PERCEPTOS[self._tabla_perceptos[i] & ~BIT_RONQUIDO]
+
     def limites(self, pos: Pos) -> bool:
         """
         Indica si una celda esta dentro de los limites del tablero.
@@ -71,31 +193,25 @@ class Palacio:
         fila, col = pos
         return 1 <= fila <= self.n and 1 <= col <= self.n
 
-    def neighbors(self, pos: Pos) -> List[Pos]:
+    def neighbors(self, pos: Pos) -> Tuple[Pos, ...]:
         """
         Indica los vecinos en distancia manhattan que tiene la celda actual.
         """
-        fila, col = pos
-        cand = [(fila - 1, col), (fila + 1, col), (fila, col - 1), (fila, col + 1)]
-        return [p for p in cand if self.limites(p)]
+        return self.rejilla.vecinos_pos[pos]
 
-    def get_percepts(self, agent_pos: Pos, grito: bool = False) -> List[bool]:
+    def get_percepts_bits(self, agent_pos: Pos, grito: bool = False) -> Percepto:
         """
-        Funcion que determina los preceptos observables desde la posicion actual.
+        Devuelve los perceptos de la posicion codificados como entero (ver BIT_*),
+        leidos de la tabla precalculada en reset().
         """
-        fila, col = agent_pos
-        pared_up = (fila == 1)
-        pared_down = (fila == self.n)
-        pared_left = (col == 1)
-        pared_right = (col == self.n)
-
-        ady = self.neighbors(agent_pos)
+        bits = self._tabla_perceptos[(agent_pos[0] - 1) * self.n + (agent_pos[1] - 1)]
+        return _PERCEPTOS[bits | BIT_GRITO] if grito else bits
 
-        brisa = any(p in self.precipicios for p in ady)
-        ronquido = self.soldado_vivo and (self.soldado in ady)
-        resplandor = (agent_pos == self.salida) or (self.salida in ady)
-
-        return {"brisa": brisa, "ronquido": ronquido, "resplandor": resplandor, "pared_up": pared_up, "pared_down": pared_down, "pared_left": pared_left, "pared_right": pared_right, "grito": grito,}    
+    def get_percepts(self, agent_pos: Pos, grito: bool = False) -> dict:
+        """
+        Funcion que determina los preceptos observables desde la posicion actual.
+        """
+        return decode_percepts(self.get_percepts_bits(agent_pos, grito))
 
     def step_move(self, agent_pos: Pos, accion: str) -> Pos:
         """
@@ -117,16 +233,23 @@ class Palacio:
 
         if self.soldado_vivo and (objetivo == self.soldado):
             self.soldado_vivo = False
+            self._clear_soldier_bit()
             return True
 
         return False
 
 
 
-def render_ascii(palacio: Palacio, agent_pos: Pos, visitado:list, reveal: bool = True, kurtz: bool = False,posibles_peligros: Set[Pos] | None = None,seguros_peligros: Set[Pos] | None = None) -> None:
+@perfil.medido("render.ascii")
+def render_ascii(palacio: Palacio, agent_pos: Pos, visitado: Iterable[Pos], reveal: bool = True, kurtz: bool = False,posibles_peligros: Set[Pos] | None = None,seguros_peligros: Set[Pos] | None = None,
+                 pantalla: Optional[Pantalla] = None, cabecera: Sequence[str] = (), pie: Sequence[str] = (), tam_ventana: Optional[Tuple[int, int]] = None) -> None:
     """
     Representa el entorno del palacio en formato ASCII, se puede elegir si mostrar todo el mapa
     o solo las celdas visitadas.
+
+    Con pantalla se dibuja de forma incremental (solo las celdas que cambian) en
+    una ventana centrada en el agente que cabe en el terminal; tam_ventana
+    (alto, ancho) fija su tamano. Sin pantalla se imprime el tablero.
     """
     RESET = "\033[0m"
     ORANGE = "\033[38;5;208m"
@@ -138,8 +261,10 @@ def render_ascii(palacio: Palacio, agent_pos: Pos, visitado:list, reveal: bool =
 
     posibles_peligros = posibles_peligros or set()
     seguros_peligros = seguros_peligros or set()
+    if not isinstance(visitado, (set, frozenset)):
+        visitado = set(visitado)
 
-    def cell_symbol(pos: Pos, visitado: list, kurtz: bool) -> str:
+    def cell_symbol(pos: Pos) -> str:
         if pos == agent_pos:
             return f"{ORANGE}CW{RESET}"
         if not reveal:
@@ -161,13 +286,17 @@ def render_ascii(palacio: Palacio, agent_pos: Pos, visitado:list, reveal: bool =
             return f"{GREEN} E{RESET}"
         return f"{GRAY} .{RESET}"
 
-    ancho_terminal = shutil.get_terminal_size((80, 20)).columns
-
-    ancho_mapa = palacio.n * 3 + (palacio.n - 1)
-    margen = max(0, (ancho_terminal - ancho_mapa) // 2)
-    prefijo = " " * margen
+    if pantalla is not None and tam_ventana is None:
+        tam_ventana = ventana_terminal(reservadas=len(cabecera) + len(pie) + 2)
+    f0, c0, f1, c1 = ventana(palacio.n, palacio.n, agent_pos, tam_ventana)
+    celdas = [[cell_symbol((fila, col)) for col in range(c0, c1 + 1)] for fila in range(f0, f1 + 1)]
+    margen = margen_centrado(c1 - c0 + 1)
 
-    for fila in range(1, palacio.n + 1):
-        row = [cell_symbol((fila, col), visitado, kurtz) for col in range(1, palacio.n + 1)]
-        print(prefijo + " ".join(row))
-    print()
\ No newline at end of file
+    if pantalla is not None:
+        pantalla.dibujar(celdas, cabecera, pie, margen)
+        return
+    for linea in cabecera:
+        print(linea)
+    imprimir(celdas, margen)
+    for linea in pie:
+        print(linea)
\ No newline at end of file
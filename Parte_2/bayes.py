@@ -1,21 +1,122 @@
 from __future__ import annotations
+from array import array
+from collections.abc import MutableMapping
 from dataclasses import dataclass, field
-from typing import Dict, Tuple, List
+from typing import Dict, Iterable, Iterator, Mapping, Tuple, List, Union
+
+from comun import perfil
+from comun.grid import Pos, rejilla
+from palacio_world import ESPECIFICACION_BASE, EspecificacionPalacio, encode_percepts
 
-Pos = Tuple[int, int]
 Tau = str
 
 
-def neighbors_4(pos: Pos, n: int) -> List[Pos]:
+class Distribucion(MutableMapping):
     """
-    Funcion que recibe una pociscion, el numero de filas y el numero
-    de columnas (nxn) y devuelve una lista con todas las celdas vecinas (ortogonalmente)
-    que esten dentro de los limites del tablero.
+    Creencia sobre las celdas de un tablero nxn, con la interfaz de un dict
+    {celda: valor} que se recorre por filas.
+
+    Se guarda como valor(p) = pesos[p] * escala, con solo las celdas de peso
+    no nulo y su suma (masa). Asi, conservar o anular el entorno del agente y
+    renormalizar cuesta lo que el entorno (5 celdas), no el tablero.
     """
 
-    fila, col = pos
-    cand = [(fila - 1, col), (fila + 1, col), (fila, col - 1), (fila, col + 1)]
-    return [(f_vecino, c_vecino) for (f_vecino, c_vecino) in cand if 1 <= f_vecino <= n and 1 <= c_vecino <= n]
+    __slots__ = ("n", "pesos", "masa", "escala")
+
+    def __init__(self, n: int, pesos: Dict[Pos, float], escala: float = 1.0) -> None:
+        self.n = n
+        self.pesos = pesos
+        self.masa = sum(pesos.values())
+        self.escala = escala
+
+    @classmethod
+    def desde(cls, n: int, valores: Mapping[Pos, float]) -> "Distribucion":
+        return cls(n, {p: v for p, v in valores.items() if v > 0})
+
+    def __getitem__(self, pos: Pos) -> float:
+        w = self.pesos.get(pos)
+        if w is not None:
+            return w * self.escala
+        fila, col = pos
+        if 1 <= fila <= self.n and 1 <= col <= self.n:
+            return 0.0
+        raise KeyError(pos)
+
+    def __setitem__(self, pos: Pos, valor: float) -> None:
+        self[pos]
+        w = valor / self.escala
+        self.masa -= self.pesos.pop(pos, 0.0)
+        if w > 0:
+            self.pesos[pos] = w
+            self.masa += w
+
+    def __delitem__(self, pos: Pos) -> None:
+        self[pos] = 0.0
+
+    def __iter__(self) -> Iterator[Pos]:
+        return iter(rejilla(self.n).celdas)
+
+    def __len__(self) -> int:
+        return self.n * self.n
+
+    def values(self) -> List[float]:
+        pesos, e = self.pesos, self.escala
+        return [pesos.get(p, 0.0) * e for p in rejilla(self.n).celdas]
+
+    def items(self) -> List[Tuple[Pos, float]]:
+        return list(zip(rejilla(self.n).celdas, self.values()))
+
+    def copy(self) -> "Distribucion":
+        d = Distribucion.__new__(Distribucion)
+        d.n, d.pesos, d.masa, d.escala = self.n, dict(self.pesos), self.masa, self.escala
+        return d
+
+    def conservar(self, celdas: Iterable[Pos]) -> None:
+        """
+        Anula todas las celdas salvo las dadas.
+        """
+        pesos = self.pesos
+        self.pesos = {p: pesos[p] for p in celdas if p in pesos}
+        self.masa = sum(self.pesos.values())
+
+    def anular(self, celdas: Iterable[Pos]) -> None:
+        """
+        Anula las celdas dadas. La masa se descuenta y solo se vuelve a sumar
+        si se quita mas de la que queda, para no acumular error de redondeo.
+        """
+        quitado = 0.0
+        for p in celdas:
+            quitado += self.pesos.pop(p, 0.0)
+        self.masa -= quitado
+        if self.masa <= quitado:
+            self.masa = sum(self.pesos.values())
+
+    def reiniciar(self, celdas: Iterable[Pos]) -> None:
+        """
+        Mismo peso en las celdas dadas y 0 en las demas.
+        """
+        self.pesos = dict.fromkeys(celdas, 1.0)
+        self.masa = float(len(self.pesos))
+        self.escala = 1.0
+
+    def escalar(self, factor: float) -> None:
+        """
+        Multiplica todos los valores por factor (> 0) sin recorrer las celdas.
+        """
+        self.escala *= factor
+        if self.escala < 1e-150:
+            self.pesos = {p: w * self.escala for p, w in self.pesos.items()}
+            self.masa = sum(self.pesos.values())
+            self.escala = 1.0
+
+    def normalizar(self, total: float = 1.0) -> bool:
+        """
+        Reescala para que los valores sumen total. False si todo es 0.
+        """
+        if not self.pesos:
+            return False
+        self.escala = total / self.masa
+        return True
 
 
 @dataclass
@@ -28,12 +129,28 @@ class BeliefState:
     real del elemento.
 
     Las creencias se actualizan a partir de los perceptos observados.
+
+    Si hay varios elementos de un tipo (cantidades), belief[tau][p] es el
+    numero esperado de ellos en p y cada distribucion suma esa cantidad.
     """
 
     n: int = 6
     inicio: Pos = (1, 1)
     taus: Tuple[Tau, ...] = ("F", "P", "D", "M", "S", "CK")
-    belief: Dict[Tau, Dict[Pos, float]] = field(default_factory=dict)
+    belief: Dict[Tau, MutableMapping] = field(default_factory=dict)
+    tipos_trampa: Tuple[Tau, ...] = ("F", "P", "D")
+    bits: Dict[Tau, int] = field(default_factory=lambda: dict(ESPECIFICACION_BASE.bits))
+    cantidades: Dict[Tau, int] = field(default_factory=dict)
+
+    @classmethod
+    def desde_especificacion(cls, spec: EspecificacionPalacio, inicio: Pos = (1, 1)) -> "BeliefState":
+        """
+        Creencias para un palacio generado con spec (ya inicializadas).
+        """
+        b = cls(n=spec.n, inicio=inicio, taus=spec.taus, tipos_trampa=spec.tipos_trampa, bits=spec.bits,
+                cantidades={t: c for t, c in spec.cantidades.items() if c != 1})
+        b.init_uniform()
+        return b
 
     def init_uniform(self) -> None:
         """
@@ -46,7 +163,8 @@ class BeliefState:
 
         self.belief = {}
         for tau in self.taus:
-            self.belief[tau] = {p: (0.0 if p == self.inicio else p0) for p in celdas}
+            pt = p0 * self.cantidades[tau] if tau in self.cantidades else p0
+            self.belief[tau] = Distribucion(self.n, dict.fromkeys(otras, pt))
 
     def _normalize(self, tau: Tau) -> bool:
         """
@@ -54,6 +172,9 @@ class BeliefState:
         """
         
         dist = self.belief[tau]
+        if isinstance(dist, Distribucion):
+            dist.masa = sum(dist.pesos.values())
+            return dist.normalizar()
         suma = sum(dist.values())
         if suma <= 0:
             return False
@@ -68,41 +189,98 @@ class BeliefState:
         P(e_tau(agent_pos) | tau_pos)=1 si tau_pos en adj(agent_pos) U {agent_pos}; si no 0.
         Para ausencia => 1 - anterior.
         """
-        adj_self = set(neighbors_4(agent_pos, self.n)) | {agent_pos}
+        adj_self = rejilla(self.n).entorno_pos[agent_pos]
         cerca = 1.0 if tau_pos in adj_self else 0.0
         return cerca if visto else (1.0 - cerca)
 
-    def update(self, agent_pos: Pos, obs: dict) -> None:
+    @perfil.medido("belief.update")
+    def update(self, agent_pos: Pos, obs: Union[int, dict]) -> None:
         """
-        Actualiza las creencias a partir de un nuevo precepto.
+        Actualiza las creencias a partir de un nuevo precepto (entero codificado o diccionario).
         Para cada elemento se aplica la formula de Bayes para calcular el posterior.
+
+        Como la verosimilitud vale 0 o 1, el posterior sin normalizar es el
+        prior dentro del entorno del agente (visto) o fuera de el (no visto).
+        Con las creencias guardadas como Distribucion, conservar o anular el
+        entorno y normalizar no recorre el tablero: el coste por turno no
+        depende de n.
         """
 
-        mapping = {"F": "eF", "P": "eP", "D": "eD", "M": "eM", "S": "eS"}
+        bits = encode_percepts(obs, self.bits)
+        entorno = rejilla(self.n).entorno_pos[agent_pos]
 
-        for tau, k in mapping.items():
-            visto = bool(obs[k])
-            prior = self.belief[tau]
-            post = {}
+        for tau, b in self.bits.items():
+            visto = bool(bits & b)
+            dist = self._distribucion(tau)
+            if tau in self.cantidades:
+                self._update_varios(dist, self.cantidades[tau], entorno, visto)
+                continue
 
-            for pos, p_prior in prior.items():
-                post[pos] = p_prior * self._likelihood(pos, agent_pos, visto)
+            if visto:
+                dist.conservar(entorno)
+            else:
+                dist.anular(entorno)
+            if dist.normalizar():
+                continue
 
-            self.belief[tau] = post
-            ok = self._normalize(tau)
+            # Percepto incompatible con el prior: se parte solo de la verosimilitud.
+            dist.reiniciar(p for p in dist if (p in entorno) == visto)
+            if not dist.normalizar():
+                dist.reiniciar(p for p in dist if p != self.inicio)
+                dist.normalizar()
+                perfil.contar("belief.reinicios")
 
-            if not ok:
-                post2 = {}
-                for pos in prior.keys():
-                    post2[pos] = self._likelihood(pos, agent_pos, visto)
-                self.belief[tau] = post2
-                ok2 = self._normalize(tau)
-                if not ok2:
-                    celdas = list(prior.keys())
-                    p0 = 1.0 / (len(celdas) - 1)
-                    self.belief[tau] = {p: (0.0 if p == self.inicio else p0) for p in celdas}
+    def _distribucion(self, tau: Tau) -> Distribucion:
+        """
+        belief[tau] como Distribucion (las asignadas desde fuera pueden ser dicts).
+        """
+        dist = self.belief[tau]
+        if not isinstance(dist, Distribucion):
+            dist = self.belief[tau] = Distribucion.desde(self.n, dist)
+        return dist
+
+    def _update_varios(self, dist: Distribucion, c: int, entorno, visto: bool) -> None:
+        """
+        Actualizacion aproximada con c > 1 elementos de un tipo (numero esperado
+        por celda). Sin percepto, el entorno queda vacio y la masa c se reparte
+        entre las demas celdas. Con percepto hay al menos uno en el entorno: si
+        su masa era menor que 1 se lleva a 1 y el resto a c - 1.
+        """
+        if visto:
+            dentro = sum(dist[p] for p in entorno)
+            if dentro >= 1.0:
+                return
+            fuera = c - dentro
+            if dentro <= 0:
+                for p in entorno:
+                    dist[p] = 1.0 / len(entorno) if p != self.inicio else 0.0
+                dentro = sum(dist[p] for p in entorno)
+            nuevos = {p: dist[p] / dentro for p in entorno}
+            dist.escalar((c - 1) / fuera)
+            for p, v in nuevos.items():
+                dist[p] = v
+        else:
+            dist.anular(entorno)
+            if not dist.pesos:
+                dist.reiniciar(p for p in dist if p not in entorno and p != self.inicio)
+                perfil.contar("belief.reinicios")
+            dist.normalizar(c)
+
+    def copy(self) -> "BeliefState":
+        """
+        Copia independiente de las creencias (p. ej. para pintarla en otro hilo).
+        """
+        return BeliefState(n=self.n, inicio=self.inicio, taus=self.taus, belief={t: d.copy() for t, d in self.belief.items()},
+                           tipos_trampa=self.tipos_trampa, bits=self.bits, cantidades=self.cantidades)
+
+    def volcar(self, destino: array) -> None:
+        """
+        Anade a destino (array('f')) las creencias de cada tau, en el orden de
+        taus y por filas (tensor taus x n x n).
+        """
+        for tau in self.taus:
+            destino.extend(self.belief[tau].values())
 
-        
     def to_matrix(self, tau: str) -> List[List[float]]:
         """
         Convierte belief[tau] a una matriz nxn.
@@ -117,7 +295,7 @@ class BeliefState:
         Devuelve una matriz de riesgo agregado de las trampas.
         """
         mat = [[0.0 for _ in range(self.n)] for _ in range(self.n)]
-        for t in ("F", "P", "D"):
+        for t in self.tipos_trampa:
             tm = self.to_matrix(t)
             for fila in range(self.n):
                 for col in range(self.n):
@@ -131,11 +309,12 @@ class BeliefState:
         """
         celdas = [(fila, col) for fila in range(1, self.n + 1) for col in range(1, self.n + 1)]
         out = {p: 0.0 for p in celdas}
-        for t in ("F", "P", "D"):
+        for t in self.tipos_trampa:
             for p, v in self.belief[t].items():
                 out[p] += v
         return out
 
+    @perfil.medido("belief.risk_death")
     def risk_death(self) -> Dict[Pos, float]:
         """
         Devuelve un maapa de riesgo de muerte por cada celda.
@@ -144,3 +323,12 @@ class BeliefState:
         for p, v in self.belief["M"].items():
             out[p] += v
         return out
+
+    def riesgo_muerte_en(self, pos: Pos) -> float:
+        """
+        Riesgo de muerte de una sola celda (mismo valor que risk_death()[pos]).
+        """
+        r = 0.0
+        for t in self.tipos_trampa:
+            r += self.belief[t][pos]
+        return r + self.belief["M"][pos]
@@ -0,0 +1,170 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+import random
+
+from palacio_world import EspecificacionPalacio, Palacio
+from palacio_compacto import PalacioCompacto
+from river_mdp import RiverWorld
+from comun.entorno import Entorno, Paso
+from comun.grid import ACTIONS, rejilla
+
+
+def codificar_obs(idx: int, bits: int, kurtz: bool, ancho: int = 10) -> int:
+    """
+    Observacion entera: bits 0-9 percepto, bit 10 Kurtz rescatado, resto indice de celda.
+    Con mas tipos de trampa el percepto ocupa ancho bits (ver
+    EspecificacionPalacio.ancho_percepto) y lo demas se desplaza.
+    """
+    return bits | (int(kurtz) << ancho) | (idx << (ancho + 1))
+
+
+def decodificar_obs(obs: int, ancho: int = 10) -> Tuple[int, int, bool]:
+    """
+    Inversa de codificar_obs: (indice de celda, bits del percepto, Kurtz rescatado).
+    """
+    return obs >> (ancho + 1), obs & ((1 << ancho) - 1), bool((obs >> ancho) & 1)
+
+
+class EntornoPalacio(Entorno):
+    """
+    Palacio de la Parte 2 con interfaz reset(seed)/step(accion), simulado sobre
+    PalacioCompacto.
+
+    Acciones: 0-4 UP/DOWN/LEFT/RIGHT/STAY, 5-8 lanzar la granada hacia
+    UP/DOWN/LEFT/RIGHT. Recompensa -1 por turno, +100 al llegar a la salida con
+    Kurtz y -100 al morir. El episodio se trunca tras max_pasos turnos.
+    Con spec se generan esas trampas y soldados (y su n).
+    """
+
+    ACCIONES = ("UP", "DOWN", "LEFT", "RIGHT", "STAY", "GRANADA_UP", "GRANADA_DOWN", "GRANADA_LEFT", "GRANADA_RIGHT")
+    RECOMPENSA_PASO = -1.0
+    RECOMPENSA_VICTORIA = 100.0
+    RECOMPENSA_MUERTE = -100.0
+
+    def __init__(self, n: int = 6, seed: Optional[int] = None, max_pasos: int = 200, spec: Optional[EspecificacionPalacio] = None) -> None:
+        self.palacio = Palacio(n=n, seed=seed, spec=spec)
+        self.spec = self.palacio.spec
+        self.n = self.spec.n
+        self.ancho = self.spec.ancho_percepto
+        self.max_pasos = max_pasos
+        self._nuevo = True
+
+    def _obs(self, grito: bool = False) -> int:
+        return codificar_obs(self.pos, self.compacto.get_percepts_bits(self.pos, grito), self.kurtz, self.ancho)
+
+    def _info(self) -> Dict:
+        return {"pos": self.compacto.to_pos(self.pos), "granada": self.granada, "pasos": self.pasos}
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[int, Dict]:
+        """
+        Con seed se genera el palacio de esa semilla; sin ella se genera el
+        siguiente de la secuencia actual.
+        """
+        if seed is not None:
+            self.palacio = Palacio(n=self.n, seed=seed, spec=self.spec)
+        elif not self._nuevo:
+            self.palacio.reset()
+        self._nuevo = False
+        self.compacto = PalacioCompacto.desde_palacio(self.palacio)
+        self.pos = self.compacto.inicio
+        self.kurtz = False
+        self.granada = True
+        self.pasos = 0
+        return self._obs(), self._info()
+
+    def step(self, accion: int) -> Paso:
+        self.comprobar_accion(accion)
+        c = self.compacto
+        self.pasos += 1
+        recompensa = self.RECOMPENSA_PASO
+        terminado = False
+        grito = False
+
+        if accion < 5:
+            self.pos = c.step_move(self.pos, accion)
+            if c.is_lethal(self.pos):
+                recompensa += self.RECOMPENSA_MUERTE
+                terminado = True
+            else:
+                if self.pos == c.kurtz:
+                    self.kurtz = True
+                if self.kurtz and self.pos == c.salida:
+                    recompensa += self.RECOMPENSA_VICTORIA
+                    terminado = True
+        elif self.granada:
+            self.granada = False
+            grito = c.throw_grenade(self.pos, accion - 5)
+
+        truncado = not terminado and self.pasos >= self.max_pasos
+        return self._obs(grito), recompensa, terminado, truncado, self._info()
+
+
+class EntornoRio(Entorno):
+    """
+    MDP del rio con interfaz reset(seed)/step(accion). La observacion es el
+    indice plano de la celda y las acciones siguen el orden de ACTIONS.
+
+    Las transiciones de cada (estado, accion) se calculan una vez por rio y se
+    guardan como distribuciones acumuladas. Con regenerar=True cada reset crea
+    un rio nuevo; si no, el rio se mantiene y solo se reinicia el episodio.
+    """
+
+    ACCIONES = ACTIONS
+
+    def __init__(self, filas: int = 7, cols: int = 6, nislas: int = 2, seed: Optional[int] = 0, max_pasos: int = 200, regenerar: bool = False) -> None:
+        self.filas = filas
+        self.cols = cols
+        self.nislas = nislas
+        self.max_pasos = max_pasos
+        self.regenerar = regenerar
+        self.rejilla = rejilla(filas, cols)
+        self._rng = random.Random(seed)
+        self._nuevo = True
+        self._crear_rio(seed)
+
+    def _crear_rio(self, seed: Optional[int]) -> None:
+        self.rio = RiverWorld(filas=self.filas, cols=self.cols, nislas=self.nislas, seed=seed)
+        self.rio.reset()
+        self._recompensa = [self.rio.reward(p) for p in self.rejilla.celdas]
+        self._terminal = [self.rio.is_terminal(p) for p in self.rejilla.celdas]
+        self._trans: Dict[Tuple[int, int], Tuple[List[int], List[float]]] = {}
+
+    def _transicion(self, s: int, a: int) -> Tuple[List[int], List[float]]:
+        t = self._trans.get((s, a))
+        if t is None:
+            destinos: List[int] = []
+            acumulada: List[float] = []
+            total = 0.0
+            for sp, p in self.rio.transitions(self.rejilla.celdas[s], ACTIONS[a]).items():
+                total += p
+                destinos.append(self.rejilla.idx(sp))
+                acumulada.append(total)
+            t = self._trans[(s, a)] = (destinos, acumulada)
+        return t
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[int, Dict]:
+        if seed is not None:
+            self._rng = random.Random(seed)
+            if self.regenerar:
+                self._crear_rio(seed)
+        elif self.regenerar and not self._nuevo:
+            self._crear_rio(self._rng.randrange(2 ** 32))
+        self._nuevo = False
+        self.pos = self.rejilla.idx(self.rio.inicio)
+        self.pasos = 0
+        return self.pos, {"pos": self.rio.inicio}
+
+    def step(self, accion: int) -> Paso:
+        self.comprobar_accion(accion)
+        destinos, acumulada = self._transicion(self.pos, accion)
+        x = self._rng.random()
+        sig = destinos[-1]
+        for d, p in zip(destinos, acumulada):
+            if x <= p:
+                sig = d
+                break
+        self.pos = sig
+        self.pasos += 1
+        terminado = self._terminal[sig]
+        truncado = not terminado and self.pasos >= self.max_pasos
+        return sig, self._recompensa[sig], terminado, truncado, {"pos": self.rejilla.celdas[sig]}
@@ -0,0 +1,256 @@
+from __future__ import annotations
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+if __name__ == "__main__":
+    # Ejecutado como script: la raiz del repo (paquete comun) no esta en sys.path.
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from palacio_world import EspecificacionPalacio, Palacio, Pos, render_ascii
+from bayes import BeliefState
+from palacio import choose_action_greedy, decide_grenade
+from comun import perfil
+from comun.fotogramas import NULO, ConsumidorNulo
+from comun.trazas import EscritorTraza
+from trazas_episodio import RegistroPalacio
+from historial_creencias import RegistroCreencias
+
+
+def run_episode(seed: Optional[int], n: int = 6, p_lim: float = 0.2, max_turnos: int = 200, dir_perfil: Optional[str] = None, render: bool = False, consumidor: ConsumidorNulo = NULO,
+                trazar: bool = False, trazar_creencias: bool = False, historial: bool = False, spec: Optional[EspecificacionPalacio] = None) -> Dict:
+    """
+    Juega una partida completa del agente bayesiano sin pausas (con render se
+    imprime el tablero en cada turno). Reproduce la logica de palacio.main y
+    devuelve un resumen de la partida.
+    Si consumidor esta activo recibe en cada turno un fotograma con el turno,
+    la posicion y una copia de las creencias.
+    Con dir_perfil se activa la instrumentacion y se guarda el perfil de la
+    partida en dir_perfil/episodio_<seed>.json.
+    Con trazar el resultado incluye "traza": el episodio codificado para
+    comun.trazas (con trazar_creencias, tambien las creencias de cada turno).
+    Con historial incluye "creencias": los tensores float32 de cada turno, para
+    historial_creencias.RegistroCreencias.agregar_episodio.
+    Con spec el palacio se genera con esas trampas y soldados (y su n).
+    """
+    if dir_perfil is not None:
+        perfil.activar()
+        perfil.reiniciar()
+    t_ep = time.perf_counter()
+
+    palacio = Palacio(n=n, seed=seed, spec=spec)
+    belief = BeliefState.desde_especificacion(palacio.spec, palacio.inicio)
+    registro = RegistroPalacio(palacio, creencias=trazar_creencias) if trazar else None
+    tensores = array("f") if historial else None
+
+    agent_pos: Pos = palacio.inicio
+    visitado: List[Pos] = [agent_pos]
+
+    granada = True
+    granadas_usadas = 0
+    kurtz_rescatado = False
+    latencias: List[float] = []
+
+    obs = palacio.get_percepts_bits(agent_pos, grito=False)
+    belief.update(agent_pos, obs)
+
+    resultado = "limite"
+    turno = 0
+    while turno < max_turnos:
+        turno += 1
+        if render:
+            render_ascii(palacio, agent_pos, visitado, reveal=True, kurtz_rescatado=kurtz_rescatado)
+        if consumidor.activo:
+            consumidor.enviar({"turno": turno, "pos": agent_pos, "creencias": belief.copy()})
+        if registro is not None:
+            registro.turno(agent_pos, obs, granada, kurtz_rescatado, belief)
+        if tensores is not None:
+            belief.volcar(tensores)
+
+        if kurtz_rescatado and agent_pos == palacio.salida:
+            resultado = "victoria"
+            break
+
+        if palacio.is_lethal(agent_pos):
+            resultado = "muerte"
+            break
+
+        t0 = time.perf_counter()
+        gdir = decide_grenade(palacio, belief, agent_pos, obs, granada)
+        if gdir is None:
+            action = choose_action_greedy(palacio=palacio, belief=belief, agent_pos=agent_pos, visitado=visitado, kurtz_rescatado=kurtz_rescatado, p_lim=p_lim)
+        latencias.append(time.perf_counter() - t0)
+
+        if gdir is not None:
+            if registro is not None:
+                registro.granada(gdir)
+            killed = palacio.throw_grenade(agent_pos, gdir)
+            granada = False
+            granadas_usadas += 1
+            obs = palacio.get_percepts_bits(agent_pos, grito=killed)
+            belief.update(agent_pos, obs)
+            continue
+
+        if registro is not None:
+            registro.mover(action)
+        agent_pos = palacio.step_move(agent_pos, action)
+        if agent_pos not in visitado:
+            visitado.append(agent_pos)
+
+        if palacio.is_lethal(agent_pos):
+            resultado = "muerte"
+            if registro is not None:
+                registro.turno(agent_pos, palacio.get_percepts_bits(agent_pos), granada, kurtz_rescatado, belief)
+            break
+
+        if (not kurtz_rescatado) and (agent_pos == palacio.kurtz):
+            if palacio.kurtz not in palacio.soldados_en_pie():
+                kurtz_rescatado = True
+
+        obs = palacio.get_percepts_bits(agent_pos, grito=False)
+        belief.update(agent_pos, obs)
+
+    res = {
+        "seed": seed,
+        "resultado": resultado,
+        "turnos": turno,
+        "granadas": granadas_usadas,
+        "soldado_muerto": not palacio.soldado_vivo,
+        "kurtz": kurtz_rescatado,
+        "latencias": latencias,
+    }
+    if registro is not None:
+        res["traza"] = registro.codificar(resultado)
+    if tensores is not None:
+        res["creencias"] = tensores.tobytes()
+    if dir_perfil is not None:
+        perfil.contar("turnos", turno)
+        meta = {k: v for k, v in res.items() if k != "latencias"}
+        meta["duracion_ms"] = 1000.0 * (time.perf_counter() - t_ep)
+        perfil.volcar_json(os.path.join(dir_perfil, f"episodio_{seed}.json"), **meta)
+        perfil.desactivar()
+    return res
+
+
+def _run_seed(args: tuple) -> Dict:
+    seed, n, p_lim, max_turnos, dir_perfil, trazar, trazar_creencias, historial, spec = args
+    return run_episode(seed, n=n, p_lim=p_lim, max_turnos=max_turnos, dir_perfil=dir_perfil, trazar=trazar, trazar_creencias=trazar_creencias, historial=historial,
+                       spec=spec)
+
+
+def run_batch(seeds: Iterable[int], workers: int = 1, n: int = 6, p_lim: float = 0.2, max_turnos: int = 200, dir_perfil: Optional[str] = None,
+              traza: Optional[str] = None, traza_creencias: bool = False, historial: Optional[str] = None,
+              spec: Optional[EspecificacionPalacio] = None) -> List[Dict]:
+    """
+    Ejecuta una partida por semilla. Con workers > 1 las reparte en un pool de procesos.
+    Con traza, cada episodio se anade a ese fichero (comun.trazas) segun llega;
+    con historial, sus creencias turno a turno a ese directorio (historial_creencias).
+    """
+    tareas = [(s, n, p_lim, max_turnos, dir_perfil, traza is not None, traza_creencias, historial is not None, spec) for s in seeds]
+    if traza is None and historial is None:
+        return list(_mapear(tareas, workers))
+    resultados = []
+    with contextlib.ExitStack() as pila:
+        escritor = pila.enter_context(EscritorTraza(traza)) if traza is not None else None
+        forma = (spec.n, spec.taus) if spec is not None else (n, BeliefState.taus)
+        registro = pila.enter_context(RegistroCreencias(historial, *forma)) if historial is not None else None
+        for r in _mapear(tareas, workers):
+            if escritor is not None:
+                escritor.escribir(r.pop("traza"))
+            if registro is not None:
+                registro.agregar_episodio(r["seed"], r.pop("creencias"))
+            resultados.append(r)
+    return resultados
+
+
+def _mapear(tareas: List[tuple], workers: int) -> Iterator[Dict]:
+    if workers <= 1:
+        yield from map(_run_seed, tareas)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunk = max(1, len(tareas) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_run_seed, tareas, chunksize=chunk)
+
+
+def summarize(resultados: List[Dict]) -> Dict:
+    """
+    Agrega los resultados de un lote: tasas de victoria/muerte, turnos,
+    uso de granadas y percentiles de latencia por decision (en ms).
+    """
+    total = len(resultados)
+    if total == 0:
+        return {"episodios": 0}
+
+    turnos = [r["turnos"] for r in resultados]
+    latencias = sorted(l for r in resultados for l in r["latencias"])
+
+    def tasa(clave: str) -> float:
+        return sum(1 for r in resultados if r["resultado"] == clave) / total
+
+    return {
+        "episodios": total,
+        "victorias": tasa("victoria"),
+        "muertes": tasa("muerte"),
+        "limite": tasa("limite"),
+        "turnos_medio": sum(turnos) / total,
+        "turnos_max": max(turnos),
+        "granadas_medio": sum(r["granadas"] for r in resultados) / total,
+        "soldado_muerto": sum(1 for r in resultados if r["soldado_muerto"]) / total,
+        "latencia_ms": {
+            "p50": 1000.0 * perfil.percentile(latencias, 50),
+            "p90": 1000.0 * perfil.percentile(latencias, 90),
+            "p99": 1000.0 * perfil.percentile(latencias, 99),
+            "max": 1000.0 * (latencias[-1] if latencias else 0.0),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Evaluacion por lotes del agente bayesiano del palacio.")
+    parser.add_argument("--episodios", type=int, default=1000)
+    parser.add_argument("--seed0", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--n", type=int, default=6)
+    parser.add_argument("--p-lim", type=float, default=0.2)
+    parser.add_argument("--max-turnos", type=int, default=200)
+    parser.add_argument("--perfil", default=None, help="Directorio donde guardar un perfil JSON por episodio.")
+    parser.add_argument("--cprofile", default=None, help="Fichero pstats con el perfil cProfile del lote (solo el proceso principal).")
+    parser.add_argument("--traza", default=None, help="Fichero de traza binaria donde anadir los episodios (ver repeticion.py).")
+    parser.add_argument("--traza-creencias", action="store_true", help="Incluye en la traza las creencias de cada turno.")
+    parser.add_argument("--historial", default=None, help="Directorio donde anadir las creencias de cada turno (float32 mapeado en memoria).")
+    parser.add_argument("--trampas", default=None, help='Tipos de trampa y cantidades, p. ej. "F:3,P:2,D:2,X:10" (por defecto una F, una P y una D).')
+    parser.add_argument("--soldados", type=int, default=1)
+    args = parser.parse_args()
+
+    spec = None
+    if args.trampas is not None or args.soldados != 1:
+        spec = EspecificacionPalacio.desde_texto(args.trampas or "F,P,D", n=args.n, soldados=args.soldados)
+
+    if args.perfil:
+        os.makedirs(args.perfil, exist_ok=True)
+
+    seeds = range(args.seed0, args.seed0 + args.episodios)
+    t0 = time.perf_counter()
+    with perfil.cprofile(args.cprofile):
+        resultados = run_batch(seeds, workers=args.workers, n=args.n, p_lim=args.p_lim, max_turnos=args.max_turnos, dir_perfil=args.perfil,
+                               traza=args.traza, traza_creencias=args.traza_creencias, historial=args.historial, spec=spec)
+    dt = time.perf_counter() - t0
+
+    resumen = summarize(resultados)
+    lat = resumen["latencia_ms"]
+    print(f"Episodios: {resumen['episodios']} en {dt:.2f}s ({resumen['episodios'] / dt:.0f} ep/s)")
+    print(f"Victorias: {resumen['victorias']:.1%} | Muertes: {resumen['muertes']:.1%} | Limite: {resumen['limite']:.1%}")
+    print(f"Turnos medio: {resumen['turnos_medio']:.1f} (max {resumen['turnos_max']})")
+    print(f"Granadas por partida: {resumen['granadas_medio']:.2f} | Soldado eliminado: {resumen['soldado_muerto']:.1%}")
+    print(f"Latencia decision (ms): p50={lat['p50']:.3f} p90={lat['p90']:.3f} p99={lat['p99']:.3f} max={lat['max']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
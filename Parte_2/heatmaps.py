@@ -0,0 +1,177 @@
+from __future__ import annotations
+from typing import List, Optional, Sequence, Tuple
+import argparse
+import os
+import sys
+
+if __name__ == "__main__":
+    # Ejecutado como script: la raiz del repo (paquete comun) no esta en sys.path.
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matplotlib.figure import Figure
+
+from palacio_world import ESPECIFICACION_BASE, Pos
+from bayes import BeliefState
+
+
+def titulo_trampas(tipos_trampa: Sequence[str]) -> str:
+    return "P(trampa en celda) = " + "+".join(tipos_trampa)
+
+
+PANELES = (
+    (titulo_trampas(ESPECIFICACION_BASE.tipos_trampa), "traps"),
+    ("P(soldado en celda)", "M"),
+    ("P(salida en celda)", "S"),
+)
+
+
+def matrices(belief: BeliefState) -> Tuple[List[List[float]], List[List[float]], List[List[float]]]:
+    """
+    Las tres matrices que se dibujan: trampas (suma de los tipos), soldado y salida.
+    """
+    return belief.traps_any_matrix(), belief.to_matrix("M"), belief.to_matrix("S")
+
+
+class VistaCreencias:
+    """
+    Mapas de calor de las creencias con la figura construida una sola vez.
+
+    Cada actualizacion solo cambia los datos de las imagenes (set_data), sus
+    limites de color, el texto de las anotaciones y la posicion del agente.
+    Con figura=None se crea una Figure con lienzo Agg, sin pyplot ni ventana
+    (modo fuera de pantalla); para la vista en vivo se pasa una figura de pyplot.
+    El titulo del panel de trampas se ajusta a los tipos de trampa de las
+    creencias recibidas.
+    """
+
+    def __init__(self, n: int, figura: Optional[Figure] = None) -> None:
+        self.n = n
+        if figura is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            figura = Figure(figsize=(14, 4))
+            FigureCanvasAgg(figura)
+        self.figura = figura
+        axes = figura.subplots(1, 3)
+        self._eje_trampas = axes[0]
+        self._tipos_trampa = ESPECIFICACION_BASE.tipos_trampa
+
+        cero = [[0.0] * n for _ in range(n)]
+        self.imagenes = []
+        self.textos = []
+        self.agentes = []
+        for ax, (titulo, _) in zip(axes, PANELES):
+            im = ax.imshow(cero, origin="upper", vmin=0.0, vmax=1.0)
+            ax.set_title(titulo)
+            ax.set_xlabel("col")
+            ax.set_ylabel("row")
+            figura.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+            self.imagenes.append(im)
+            self.agentes.append(ax.scatter([0], [0], marker="o", s=80, c="red"))
+            self.textos.append([[ax.text(j, i, "", ha="center", va="center", fontsize=8) for j in range(n)] for i in range(n)])
+        figura.tight_layout()
+
+    def actualizar(self, belief: BeliefState, agent_pos: Pos) -> None:
+        ar, ac = agent_pos
+        if belief.tipos_trampa != self._tipos_trampa:
+            self._tipos_trampa = belief.tipos_trampa
+            self._eje_trampas.set_title(titulo_trampas(belief.tipos_trampa))
+        for im, textos, agente, data in zip(self.imagenes, self.textos, self.agentes, matrices(belief)):
+            im.set_data(data)
+            minimo = min(min(fila) for fila in data)
+            maximo = max(max(fila) for fila in data)
+            im.set_clim(minimo, maximo if maximo > minimo else minimo + 1e-9)
+            agente.set_offsets([[ac - 1, ar - 1]])
+            for i, fila in enumerate(data):
+                for j, value in enumerate(fila):
+                    t = textos[i][j]
+                    if value == 0:
+                        if t.get_text():
+                            t.set_text("")
+                        continue
+                    t.set_text(f"{value:.2f}")
+                    t.set_color("white" if value > 0.15 else "black")
+
+    def dibujar(self) -> None:
+        self.figura.canvas.draw()
+
+    def guardar(self, ruta: str) -> None:
+        self.figura.savefig(ruta)
+
+
+class VistaEnVivo:
+    """
+    Ventana de pyplot que se actualiza en cada turno sin bloquear.
+    """
+
+    def __init__(self, n: int) -> None:
+        import matplotlib.pyplot as plt
+
+        self._plt = plt
+        plt.ion()
+        self.vista = VistaCreencias(n, plt.figure(figsize=(14, 4)))
+        plt.show(block=False)
+
+    def __call__(self, belief: BeliefState, agent_pos: Pos) -> None:
+        self.vista.actualizar(belief, agent_pos)
+        self.vista.figura.canvas.draw_idle()
+        self._plt.pause(0.001)
+
+
+class Grabador:
+    """
+    Escribe la evolucion de las creencias fuera de pantalla (Agg): una
+    secuencia PNG si la ruta es un directorio, o una animacion si termina en
+    .gif (Pillow) o .mp4 (ffmpeg).
+    """
+
+    def __init__(self, n: int, ruta: str, fps: float = 4.0, dpi: int = 80) -> None:
+        self.ruta = ruta
+        self.dpi = dpi
+        self.vista = VistaCreencias(n)
+        self.fotogramas = 0
+        ext = os.path.splitext(ruta)[1].lower()
+        self._writer = None
+        if ext in (".gif", ".mp4"):
+            from matplotlib import animation
+
+            self._writer = animation.PillowWriter(fps=fps) if ext == ".gif" else animation.FFMpegWriter(fps=fps)
+            self._writer.setup(self.vista.figura, ruta, dpi=dpi)
+        else:
+            os.makedirs(ruta, exist_ok=True)
+
+    def __call__(self, belief: BeliefState, agent_pos: Pos) -> None:
+        self.vista.actualizar(belief, agent_pos)
+        if self._writer is not None:
+            self._writer.grab_frame()
+        else:
+            self.vista.figura.savefig(os.path.join(self.ruta, f"creencias_{self.fotogramas:04d}.png"), dpi=self.dpi)
+        self.fotogramas += 1
+
+    def cerrar(self) -> None:
+        if self._writer is not None:
+            self._writer.finish()
+            self._writer = None
+
+
+def main() -> None:
+    from comun.fotogramas import ConsumidorSincrono
+    from evaluacion import run_episode
+
+    parser = argparse.ArgumentParser(description="Mapas de calor de las creencias de una partida del agente bayesiano.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--n", type=int, default=6)
+    parser.add_argument("--salida", default=None, help="Directorio (PNG), .gif o .mp4. Sin salida se muestra en vivo.")
+    parser.add_argument("--fps", type=float, default=4.0)
+    args = parser.parse_args()
+
+    pintar = Grabador(args.n, args.salida, fps=args.fps) if args.salida else VistaEnVivo(args.n)
+    consumidor = ConsumidorSincrono(lambda f: pintar(f["creencias"], f["pos"]))
+    res = run_episode(args.seed, n=args.n, consumidor=consumidor)
+    if isinstance(pintar, Grabador):
+        pintar.cerrar()
+        print(f"{pintar.fotogramas} fotogramas en {args.salida}")
+    print(f"Resultado: {res['resultado']} en {res['turnos']} turnos")
+
+
+if __name__ == "__main__":
+    main()
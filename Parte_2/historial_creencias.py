@@ -0,0 +1,216 @@
+"""
+Historial de creencias en disco para analisis posterior.
+
+Cada ejecucion escribe en un directorio:
+
+- creencias.f32: un tensor float32 (taus x n x n) por turno, fila tras fila,
+  en un fichero preasignado y mapeado en memoria que crece al doble al llenarse;
+- indice.bin: una entrada EPISODIO (semilla, primera fila, turnos) por episodio;
+- meta.json: n y taus.
+
+El indice es lo ultimo que se escribe de cada episodio, de modo que un lector
+solo ve episodios completos aunque la ejecucion se interrumpa. Las lecturas
+acceden a las filas pedidas a traves del mmap, sin cargar el resto.
+"""
+from __future__ import annotations
+from array import array
+from typing import Iterator, List, Optional, Sequence, Tuple
+import json
+import mmap
+import os
+import struct
+
+from palacio_world import Pos
+from bayes import BeliefState
+
+EPISODIO = struct.Struct("<qQI")
+SIN_SEMILLA = -(1 << 63)
+FLOAT = 4
+
+
+class RegistroCreencias:
+    """
+    Escritor del historial. anotar() anade el tensor del turno actual y
+    fin_episodio() cierra el episodio en el indice; agregar_episodio() hace lo
+    mismo con los turnos ya volcados (p. ej. desde un proceso trabajador).
+    """
+
+    def __init__(self, ruta: str, n: int, taus: Sequence[str] = BeliefState.taus, capacidad: int = 1 << 14) -> None:
+        os.makedirs(ruta, exist_ok=True)
+        self.ruta = ruta
+        self.n = n
+        self.taus = tuple(taus)
+        self.tam_fila = len(self.taus) * n * n
+        meta = os.path.join(ruta, "meta.json")
+        if os.path.exists(meta):
+            with open(meta, encoding="utf-8") as f:
+                previo = json.load(f)
+            if previo["n"] != n or tuple(previo["taus"]) != self.taus:
+                raise ValueError(f"{ruta} ya contiene un historial con otra forma")
+        else:
+            with open(meta, "w", encoding="utf-8") as f:
+                json.dump({"n": n, "taus": list(self.taus)}, f)
+
+        self._indice = open(os.path.join(ruta, "indice.bin"), "ab")
+        self.filas = _filas_indexadas(ruta)
+        self._inicio_episodio = self.filas
+        self._seed: Optional[int] = None
+        self._f = open(os.path.join(ruta, "creencias.f32"), "a+b")
+        self._capacidad = 0
+        self._mapear(max(capacidad, self.filas))
+
+    def _mapear(self, capacidad: int) -> None:
+        if self._capacidad:
+            self._datos.release()
+            self._mmap.close()
+        tam = capacidad * self.tam_fila * FLOAT
+        if os.fstat(self._f.fileno()).st_size < tam:
+            self._f.truncate(tam)
+        self._mmap = mmap.mmap(self._f.fileno(), tam)
+        self._datos = memoryview(self._mmap).cast("f")
+        self._capacidad = capacidad
+
+    def _reservar(self, filas: int) -> None:
+        if self.filas + filas > self._capacidad:
+            capacidad = self._capacidad
+            while self.filas + filas > capacidad:
+                capacidad *= 2
+            self._mapear(capacidad)
+
+    def episodio(self, seed: Optional[int]) -> None:
+        self._seed = seed
+        self._inicio_episodio = self.filas
+
+    def anotar(self, belief: BeliefState) -> None:
+        fila = array("f")
+        belief.volcar(fila)
+        self._reservar(1)
+        base = self.filas * self.tam_fila
+        self._datos[base:base + self.tam_fila] = fila
+        self.filas += 1
+
+    def fin_episodio(self) -> None:
+        self._indice.write(EPISODIO.pack(SIN_SEMILLA if self._seed is None else self._seed, self._inicio_episodio, self.filas - self._inicio_episodio))
+        self._indice.flush()
+        self._inicio_episodio = self.filas
+
+    def agregar_episodio(self, seed: Optional[int], datos: bytes) -> None:
+        """
+        Anade un episodio completo a partir de sus tensores float32 ya volcados.
+        """
+        valores = array("f")
+        valores.frombytes(datos)
+        turnos = len(valores) // self.tam_fila
+        self.episodio(seed)
+        self._reservar(turnos)
+        base = self.filas * self.tam_fila
+        self._datos[base:base + len(valores)] = valores
+        self.filas += turnos
+        self.fin_episodio()
+
+    def cerrar(self) -> None:
+        self._mmap.flush()
+        self._datos.release()
+        self._mmap.close()
+        self._f.close()
+        self._indice.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+
+def _leer_indice(ruta: str) -> List[Tuple[Optional[int], int, int]]:
+    ruta_indice = os.path.join(ruta, "indice.bin")
+    if not os.path.exists(ruta_indice):
+        return []
+    with open(ruta_indice, "rb") as f:
+        datos = f.read()
+    datos = datos[: len(datos) - len(datos) % EPISODIO.size]
+    return [(None if s == SIN_SEMILLA else s, fila, turnos) for s, fila, turnos in EPISODIO.iter_unpack(datos)]
+
+
+def _filas_indexadas(ruta: str) -> int:
+    indice = _leer_indice(ruta)
+    return indice[-1][1] + indice[-1][2] if indice else 0
+
+
+class HistorialCreencias:
+    """
+    Lector del historial. Las filas son turnos globales; episodio(k) da la
+    semilla, la primera fila y el numero de turnos del episodio k.
+    """
+
+    def __init__(self, ruta: str) -> None:
+        self.ruta = ruta
+        with open(os.path.join(ruta, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.n = meta["n"]
+        self.taus = tuple(meta["taus"])
+        self.tam_fila = len(self.taus) * self.n * self.n
+        self.indice = _leer_indice(ruta)
+        self.filas = self.indice[-1][1] + self.indice[-1][2] if self.indice else 0
+        self._f = open(os.path.join(ruta, "creencias.f32"), "rb")
+        self._mmap = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._datos = memoryview(self._mmap).cast("f")
+
+    def __len__(self) -> int:
+        return len(self.indice)
+
+    def episodio(self, k: int) -> Tuple[Optional[int], int, int]:
+        return self.indice[k]
+
+    def buscar_seed(self, seed: int) -> List[int]:
+        return [k for k, (s, _, _) in enumerate(self.indice) if s == seed]
+
+    def fila(self, episodio: int, turno: int) -> int:
+        _, fila0, turnos = self.indice[episodio]
+        if turno < 0:
+            turno += turnos
+        if not 0 <= turno < turnos:
+            raise IndexError(turno)
+        return fila0 + turno
+
+    def bloque(self, fila0: int, fila1: int) -> memoryview:
+        """
+        Vista plana float32 (sin copia) de las filas [fila0, fila1).
+        """
+        fila1 = min(fila1, self.filas)
+        return self._datos[fila0 * self.tam_fila:fila1 * self.tam_fila]
+
+    def turno(self, episodio: int, turno: int) -> List[List[List[float]]]:
+        """
+        Creencias de un turno como taus matrices n x n.
+        """
+        valores = self.bloque(self.fila(episodio, turno), self.fila(episodio, turno) + 1).tolist()
+        n = self.n
+        return [[valores[k * n * n + f * n:k * n * n + (f + 1) * n] for f in range(n)] for k in range(len(self.taus))]
+
+    def serie(self, episodio: int, tau: str, pos: Pos) -> List[float]:
+        """
+        Evolucion de P(tau en pos) a lo largo del episodio.
+        """
+        _, fila0, turnos = self.indice[episodio]
+        desp = self.taus.index(tau) * self.n * self.n + (pos[0] - 1) * self.n + (pos[1] - 1)
+        base = fila0 * self.tam_fila + desp
+        return self._datos[base:base + turnos * self.tam_fila:self.tam_fila].tolist()
+
+    def episodios(self) -> Iterator[Tuple[Optional[int], memoryview]]:
+        """
+        (semilla, vista de sus filas) de cada episodio, en orden.
+        """
+        for seed, fila0, turnos in self.indice:
+            yield seed, self.bloque(fila0, fila0 + turnos)
+
+    def cerrar(self) -> None:
+        self._datos.release()
+        self._mmap.close()
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
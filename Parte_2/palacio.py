@@ -1,12 +1,21 @@
 from __future__ import annotations
-import matplotlib.pyplot as plt
-
-from typing import List, Optional, Tuple
+from typing import Collection, List, Optional, Set, Tuple, Union
 import os
-import time
+import sys
+
+if __name__ == "__main__":
+    # Ejecutado como script: la raiz del repo (paquete comun) no esta en sys.path.
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from palacio_world import Palacio, render_ascii, Pos
+from palacio_world import EspecificacionPalacio, Palacio, render_ascii, Pos, encode_percepts, BIT_EM
 from bayes import BeliefState
+from comun import perfil, renderizadores
+from comun.fotogramas import ConsumidorHilo, ConsumidorSincrono
+
+# Vistas de creencias: se construyen con el tamano del tablero y se llaman con
+# (belief, agent_pos). matplotlib solo se importa al pedir una de ellas.
+renderizadores.registrar("heatmap", "heatmaps:VistaEnVivo")
+renderizadores.registrar("grabacion", "heatmaps:Grabador")
 
 def manhattan(a: Pos, b: Pos) -> int:
     """
@@ -32,7 +41,8 @@ def best_adjacent_direction(pos_ori: Pos, pos_fin: Pos) -> Optional[str]:
     return None
 
 
-def choose_action_greedy(palacio: Palacio, belief: BeliefState, agent_pos: Pos, visitado: List[Pos], kurtz_rescatado: bool, p_lim: float = 0.2) -> str:
+@perfil.medido("choose_action_greedy")
+def choose_action_greedy(palacio: Palacio, belief: BeliefState, agent_pos: Pos, visitado: Collection[Pos], kurtz_rescatado: bool, p_lim: float = 0.2) -> str:
     """
     Selector simple:
     - Minimiza riesgo estimado de muerte.
@@ -40,7 +50,6 @@ def choose_action_greedy(palacio: Palacio, belief: BeliefState, agent_pos: Pos,
     - Tras rescatar, intenta acercarse a la salida real (para demo); si no, explora.
     """
     actions = ["UP", "DOWN", "LEFT", "RIGHT"]
-    risk = belief.risk_death()
 
     if kurtz_rescatado:
         objetivo = max(belief.belief["S"].items(), key=lambda kv: kv[1])[0]
@@ -55,7 +64,7 @@ def choose_action_greedy(palacio: Palacio, belief: BeliefState, agent_pos: Pos,
         if nxt == agent_pos:
             continue
 
-        r = risk[nxt]
+        r = belief.riesgo_muerte_en(nxt)
 
         score = 0.0
 
@@ -76,10 +85,15 @@ def choose_action_greedy(palacio: Palacio, belief: BeliefState, agent_pos: Pos,
 
     return best_a
 
+@perfil.medido("render.heatmaps")
 def show_heatmaps(belief: BeliefState, agent_pos: Pos) -> None:
     """
     Muestra el mapa de calor con las probabilidades de que esste cada peligro/salida en las celdas.
+    Crea una figura nueva en cada llamada; para actualizar en vivo o grabar la
+    partida ver heatmaps.VistaCreencias.
     """
+    import matplotlib.pyplot as plt
+
     traps = belief.traps_any_matrix()
     m = belief.to_matrix("M")
     s = belief.to_matrix("S")
@@ -87,7 +101,7 @@ def show_heatmaps(belief: BeliefState, agent_pos: Pos) -> None:
     fig, axes = plt.subplots(1, 3, figsize=(14, 4))
 
     for ax, data, title in [
-        (axes[0], traps, "P(trampa en celda) = F+P+D"),
+        (axes[0], traps, "P(trampa en celda) = " + "+".join(belief.tipos_trampa)),
         (axes[1], m, "P(soldado en celda)"),
         (axes[2], s, "P(salida en celda)"),
     ]:
@@ -120,13 +134,14 @@ def show_heatmaps(belief: BeliefState, agent_pos: Pos) -> None:
     plt.show()
 
 
-def decide_grenade( palacio: Palacio, belief: BeliefState, agent_pos: Pos, obs: dict, granada: bool) -> Optional[str]:
+@perfil.medido("decide_grenade")
+def decide_grenade( palacio: Palacio, belief: BeliefState, agent_pos: Pos, obs: Union[int, dict], granada: bool) -> Optional[str]:
     """
     Si percibe eM (soldado cerca) y tiene granada:
     - Lanza hacia la celda contigua con mayor probabilidad de M.
     Devuelve dirección o None.
     """
-    if (not granada) or (not obs.get("eM", False)):
+    if (not granada) or (not encode_percepts(obs) & BIT_EM):
         return None
 
     m = belief.belief["M"]
@@ -140,71 +155,131 @@ def decide_grenade( palacio: Palacio, belief: BeliefState, agent_pos: Pos, obs:
     return direction
 
 
-def main(seed: Optional[int] = 0, reveal: bool = True, modo: str = "ascii") -> None:
-    palacio = Palacio(n=6, seed=seed)
-    belief = BeliefState(n=6, inicio=(1, 1))
-    belief.init_uniform()
+def _pintor(palacio: Palacio, modo: str, reveal: bool):
+    """
+    Funcion que pinta un fotograma de main (ver comun.fotogramas).
+    """
+    pantalla = renderizadores.crear("terminal")
+    vista = None
+
+    def pintar(f: dict) -> None:
+        nonlocal vista
+        if modo == "ascii":
+            render_ascii(palacio, f["pos"], f["visitado"], reveal=reveal, kurtz_rescatado=f["kurtz"], pantalla=pantalla, cabecera=f["cabecera"], pie=f["pie"])
+            return
+        pantalla.dibujar([], f["cabecera"], f["pie"])
+        if f["creencias"] is not None:
+            if vista is None:
+                vista = renderizadores.crear(modo, palacio.n)
+            vista(f["creencias"], f["pos"])
+
+    return pintar
+
+
+def main(seed: Optional[int] = 0, reveal: bool = True, modo: str = "ascii", n: int = 6, pausa: float = 0.7, traza: Optional[str] = None,
+         spec: Optional[EspecificacionPalacio] = None) -> None:
+    """
+    Partida del agente bayesiano con visualizacion. La simulacion no espera al
+    renderizado: envia un fotograma por turno a un hilo que los pinta cada pausa
+    segundos (con pausa=0, tan rapido como pueda), descartando los que no le de
+    tiempo a pintar. El modo heatmap actualiza una unica ventana de matplotlib desde
+    el hilo principal (ver heatmaps.VistaEnVivo).
+    Con traza la partida, con sus creencias, se anade a ese fichero para
+    revisarla despues con repeticion.py. spec cambia las trampas y soldados
+    del palacio (ver palacio_world.EspecificacionPalacio).
+    """
+    palacio = Palacio(n=n, seed=seed, spec=spec)
+    belief = BeliefState.desde_especificacion(palacio.spec, palacio.inicio)
 
     agent_pos: Pos = (1, 1)
-    visitado: List[Pos] = [agent_pos]
+    visitado: Set[Pos] = {agent_pos}
 
     granada = True
     kurtz_rescatado = False
+    registro = None
+    if traza is not None:
+        from trazas_episodio import RegistroPalacio
+        registro = RegistroPalacio(palacio, creencias=True)
 
-    obs = palacio.get_percepts(agent_pos, grito=False)
+    obs = palacio.get_percepts_bits(agent_pos, grito=False)
     belief.update(agent_pos, obs)
 
-    turno = 0
-    while True:
-        turno += 1
-        os.system("cls")
-        print(f"Turno: {turno} | Pos: {agent_pos} | Granada: {granada} | Kurtz: {kurtz_rescatado}")
-        if modo == "ascii":
-            render_ascii(palacio, agent_pos, visitado, reveal=reveal, kurtz_rescatado=kurtz_rescatado)
-        elif modo == "heatmap":
-            show_heatmaps(belief, agent_pos)
-
-        print("Percepto:", obs)
+    pintar = _pintor(palacio, modo, reveal)
+    if modo == "heatmap":
+        consumidor = ConsumidorSincrono(pintar)
+    else:
+        consumidor = ConsumidorHilo(pintar, fps=1.0 / pausa if pausa > 0 else None)
 
-        if kurtz_rescatado and agent_pos == palacio.salida:
-            print("\nVICTORIA: salida alcanzada con Kurtz.")
+    def fotograma(cabecera: str, *mensajes: str) -> None:
+        if not consumidor.activo:
             return
-
-        if palacio.is_lethal(agent_pos):
-            print("\nMUERTE.")
+        consumidor.enviar({
+            "pos": agent_pos,
+            "visitado": frozenset(visitado),
+            "kurtz": kurtz_rescatado,
+            "cabecera": [cabecera],
+            "pie": [f"Percepto: {palacio.spec.decodificar(obs)}", *mensajes],
+            "creencias": belief.copy() if modo == "heatmap" else None,
+        })
+
+    def terminar(resultado: str) -> None:
+        if registro is None:
             return
-
-        gdir = decide_grenade(palacio, belief, agent_pos, obs, granada)
-        if gdir is not None:
-            killed = palacio.throw_grenade(agent_pos, gdir)
-            granada = False
-            obs = palacio.get_percepts(agent_pos, grito=killed)
+        from comun.trazas import EscritorTraza
+        with EscritorTraza(traza) as escritor:
+            escritor.escribir(registro.codificar(resultado))
+
+    with consumidor:
+        turno = 0
+        while True:
+            turno += 1
+            cabecera = f"Turno: {turno} | Pos: {agent_pos} | Granada: {granada} | Kurtz: {kurtz_rescatado}"
+            if registro is not None:
+                registro.turno(agent_pos, obs, granada, kurtz_rescatado, belief)
+
+            if kurtz_rescatado and agent_pos == palacio.salida:
+                fotograma(cabecera, "", "VICTORIA: salida alcanzada con Kurtz.")
+                terminar("victoria")
+                return
+
+            if palacio.is_lethal(agent_pos):
+                fotograma(cabecera, "", "MUERTE.")
+                terminar("muerte")
+                return
+
+            fotograma(cabecera)
+
+            gdir = decide_grenade(palacio, belief, agent_pos, obs, granada)
+            if gdir is not None:
+                if registro is not None:
+                    registro.granada(gdir)
+                killed = palacio.throw_grenade(agent_pos, gdir)
+                granada = False
+                obs = palacio.get_percepts_bits(agent_pos, grito=killed)
+                belief.update(agent_pos, obs)
+                continue
+
+            action = choose_action_greedy(palacio=palacio, belief=belief, agent_pos=agent_pos, visitado=visitado, kurtz_rescatado=kurtz_rescatado, p_lim=0.2)
+
+            if registro is not None:
+                registro.mover(action)
+            nueva_pos = palacio.step_move(agent_pos, action)
+            agent_pos = nueva_pos
+            visitado.add(agent_pos)
+
+            if palacio.is_lethal(agent_pos):
+                fotograma(f"Acción: {action} -> Pos: {agent_pos}", "", "MUERTE.")
+                if registro is not None:
+                    registro.turno(agent_pos, palacio.get_percepts_bits(agent_pos), granada, kurtz_rescatado, belief)
+                terminar("muerte")
+                return
+
+            if (not kurtz_rescatado) and (agent_pos == palacio.kurtz):
+                if palacio.kurtz not in palacio.soldados_en_pie():
+                    kurtz_rescatado = True
+
+            obs = palacio.get_percepts_bits(agent_pos, grito=False)
             belief.update(agent_pos, obs)
-            time.sleep(0.2)
-            continue
-
-        action = choose_action_greedy(palacio=palacio, belief=belief, agent_pos=agent_pos, visitado=visitado, kurtz_rescatado=kurtz_rescatado, p_lim=0.2)
-
-        nueva_pos = palacio.step_move(agent_pos, action)
-        agent_pos = nueva_pos
-        if agent_pos not in visitado:
-            visitado.append(agent_pos)
-
-        if palacio.is_lethal(agent_pos):
-            os.system("cls")
-            print(f"Acción: {action} -> Pos: {agent_pos}")
-            render_ascii(palacio, agent_pos, visitado, reveal=reveal, kurtz_rescatado=kurtz_rescatado)
-            print("\nMUERTE.")
-            return
-
-        if (not kurtz_rescatado) and (agent_pos == palacio.kurtz):
-            if (not palacio.soldado_vivo) or (palacio.soldado != palacio.kurtz):
-                kurtz_rescatado = True
-
-        obs = palacio.get_percepts(agent_pos, grito=False)
-        belief.update(agent_pos, obs)
-
-        time.sleep(0.7)
 
 
 if __name__ == "__main__":
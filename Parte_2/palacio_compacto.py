@@ -0,0 +1,168 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import Tuple
+
+from palacio_world import (
+    ESPECIFICACION_BASE, EspecificacionPalacio, Palacio, Pos, rejilla,
+    BIT_EM, BIT_ES,
+    BIT_PARED_UP, BIT_PARED_DOWN, BIT_PARED_LEFT, BIT_PARED_RIGHT, BIT_GRITO,
+)
+from comun.grid import ACTION_IDX
+
+_STAY = ACTION_IDX["STAY"]
+
+
+@lru_cache(maxsize=None)
+def _tablas(n: int) -> Tuple[tuple, tuple, tuple, tuple]:
+    """
+    Tablas precalculadas para un tablero nxn, compartidas por todas las instancias:
+    - vecinos[i]: indices de los vecinos ortogonales de la celda i.
+    - adj_mask[i]: mascara de bits con la celda i y sus vecinos.
+    - mov[a][i]: celda destino al aplicar la accion a desde i (si hay pared, i).
+    - paredes[i]: bits de pared del percepto de la celda i.
+    """
+    r = rejilla(n)
+    adj_mask = []
+    paredes = []
+    for i in range(n * n):
+        fila, col = divmod(i, n)
+        adj_mask.append(r.expandir(1 << i) | (1 << i))
+
+        bits = 0
+        if fila == 0:
+            bits |= BIT_PARED_UP
+        if fila == n - 1:
+            bits |= BIT_PARED_DOWN
+        if col == 0:
+            bits |= BIT_PARED_LEFT
+        if col == n - 1:
+            bits |= BIT_PARED_RIGHT
+        paredes.append(bits)
+
+    return r.vecinos, tuple(adj_mask), r.mover, tuple(paredes)
+
+
+class PalacioCompacto:
+    """
+    Representacion compacta del palacio para simulacion intensiva.
+
+    Las celdas se identifican por un indice plano i = (fila-1)*n + (col-1).
+    Las ocupaciones se guardan como mascaras de bits sobre el tablero, de modo
+    que letalidad, perceptos y movimientos se resuelven en O(1) sin crear objetos.
+    Las tablas de vecinos y movimientos se comparten entre instancias del mismo n.
+
+    trampas guarda un par (bit del percepto, mascara de celdas) por tipo de
+    trampa, de modo que el coste no depende de cuantas trampas haya de cada
+    tipo; soldados es la mascara de los soldados vivos. spec solo se usa para
+    el formato diccionario de los perceptos.
+    """
+
+    __slots__ = ("n", "inicio", "trampas", "soldados", "salida", "kurtz", "spec",
+                 "mask_trampas", "mask_letal", "_vecinos", "_adj", "_mov", "_paredes")
+
+    def __init__(self, n: int, inicio: int, trampas: Tuple[Tuple[int, int], ...], soldados: int, salida: int, kurtz: int,
+                 spec: EspecificacionPalacio = ESPECIFICACION_BASE) -> None:
+        self.n = n
+        self.inicio = inicio
+        self.trampas = trampas
+        self.soldados = soldados
+        self.salida = salida
+        self.kurtz = kurtz
+        self.spec = spec
+        self.mask_trampas = 0
+        for _, mask in trampas:
+            self.mask_trampas |= mask
+        self.mask_letal = self.mask_trampas | soldados
+        self._vecinos, self._adj, self._mov, self._paredes = _tablas(n)
+
+    @classmethod
+    def desde_palacio(cls, palacio: Palacio) -> "PalacioCompacto":
+        """
+        Construye la version compacta a partir de un Palacio ya generado.
+        """
+        idx = lambda p: (p[0] - 1) * palacio.n + (p[1] - 1)
+        bits = palacio.spec.bits
+        trampas = []
+        for t, ps in palacio.trampas_de.items():
+            mask = 0
+            for p in ps:
+                mask |= 1 << idx(p)
+            trampas.append((bits[t], mask))
+        soldados = 0
+        for p in palacio.soldados_en_pie():
+            soldados |= 1 << idx(p)
+        return cls(palacio.n, idx(palacio.inicio), tuple(trampas), soldados, idx(palacio.salida), idx(palacio.kurtz), palacio.spec)
+
+    @property
+    def soldado_vivo(self) -> bool:
+        return self.soldados != 0
+
+    def clone(self) -> "PalacioCompacto":
+        """
+        Copia barata: solo se copian enteros, las tablas se comparten.
+        """
+        c = PalacioCompacto.__new__(PalacioCompacto)
+        for attr in PalacioCompacto.__slots__:
+            setattr(c, attr, getattr(self, attr))
+        return c
+
+    def to_idx(self, pos: Pos) -> int:
+        return (pos[0] - 1) * self.n + (pos[1] - 1)
+
+    def to_pos(self, i: int) -> Pos:
+        fila, col = divmod(i, self.n)
+        return (fila + 1, col + 1)
+
+    def neighbors(self, i: int) -> tuple:
+        """
+        Indices de los vecinos ortogonales (tupla precalculada, no se copia).
+        """
+        return self._vecinos[i]
+
+    def step_move(self, i: int, accion: int) -> int:
+        """
+        Celda destino al aplicar la accion (indice en ACTIONS). Si hay pared, se queda.
+        """
+        return self._mov[accion][i]
+
+    def cell_has_trap(self, i: int) -> bool:
+        return (self.mask_trampas >> i) & 1 == 1
+
+    def is_lethal(self, i: int) -> bool:
+        return (self.mask_letal >> i) & 1 == 1
+
+    def get_percepts_bits(self, i: int, grito: bool = False) -> int:
+        """
+        Perceptos de la celda i codificados como entero (ver BIT_* en palacio_world).
+        """
+        adj = self._adj[i]
+        bits = self._paredes[i]
+        for b, mask in self.trampas:
+            if adj & mask:
+                bits |= b
+        if adj & self.soldados:
+            bits |= BIT_EM
+        if (adj >> self.salida) & 1:
+            bits |= BIT_ES
+        if grito:
+            bits |= BIT_GRITO
+        return bits
+
+    def get_percepts(self, i: int, grito: bool = False) -> dict:
+        """
+        Perceptos en el formato diccionario de Palacio.get_percepts.
+        """
+        return self.spec.decodificar(self.get_percepts_bits(i, grito))
+
+    def throw_grenade(self, origen: int, accion: int) -> bool:
+        """
+        Lanza granada 1 celda. Mata a los soldados de esa celda.
+        """
+        objetivo = self._mov[accion][origen]
+        if objetivo == origen and accion != _STAY:
+            return False
+        if (self.soldados >> objetivo) & 1:
+            self.soldados &= ~(1 << objetivo)
+            self.mask_letal = self.mask_trampas | self.soldados
+            return True
+        return False
@@ -1,50 +1,198 @@
 from __future__ import annotations
-from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
 import random
-import shutil
+import os
+import sys
+
+if __name__ == "__main__":
+    # Ejecutado como script: la raiz del repo (paquete comun) no esta en sys.path.
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comun import perfil
+from comun.perceptos import decodificar, tipo_percepto
+from comun.grid import ACTIONS, Pos, move, rejilla
+from comun.terminal import Pantalla, imprimir, margen_centrado, ventana, ventana_terminal
 
-Pos = Tuple[int, int]
 Tau = str
 
-ACTIONS = ("UP", "DOWN", "LEFT", "RIGHT", "STAY")
+# Bits de los perceptos cuando se codifican como entero.
+BIT_EF = 1 << 0
+BIT_EP = 1 << 1
+BIT_ED = 1 << 2
+BIT_EM = 1 << 3
+BIT_ES = 1 << 4
+BIT_PARED_UP = 1 << 5
+BIT_PARED_DOWN = 1 << 6
+BIT_PARED_LEFT = 1 << 7
+BIT_PARED_RIGHT = 1 << 8
+BIT_GRITO = 1 << 9
+
+PERCEPT_BITS = (
+    ("eF", BIT_EF), ("eP", BIT_EP), ("eD", BIT_ED), ("eM", BIT_EM), ("eS", BIT_ES),
+    ("pared_up", BIT_PARED_UP), ("pared_down", BIT_PARED_DOWN),
+    ("pared_left", BIT_PARED_LEFT), ("pared_right", BIT_PARED_RIGHT),
+    ("grito", BIT_GRITO),
+)
+# Bits que no dependen de la especificacion del palacio.
+_PAREDES_Y_GRITO = PERCEPT_BITS[5:]
+
+
+def decode_percepts(bits: int) -> dict:
+    """
+    Convierte un percepto codificado como entero al formato diccionario.
+    """
+    return decodificar(PERCEPT_BITS, bits)
 
 
-def move(pos: Pos, accion: str) -> Pos:
+# Percepto como entero con acceso por nombre: p.eM, p["eM"], p.get("eM").
+Percepto = tipo_percepto("Percepto", PERCEPT_BITS, __name__)
+
+
+def encode_percepts(obs, bits: Optional[Dict[Tau, int]] = None) -> Percepto:
+    """
+    Convierte un percepto en formato diccionario (o ya codificado) a Percepto.
+    bits es el bit de cada tau percibible (EspecificacionPalacio.bits) para
+    leer las claves e<tipo>; por defecto, las del palacio base.
     """
-    Funcion que recibe una posicion y una accion y devuelve la posicion
-    obtenida tras realizar la accion
+    if bits is None or isinstance(obs, int):
+        return Percepto.codificar(obs)
+    out = 0
+    for k, b in _PAREDES_Y_GRITO:
+        if obs.get(k, False):
+            out |= b
+    for tau, b in bits.items():
+        if obs.get(f"e{tau}", False):
+            out |= b
+    return Percepto(out)
+
+
+# F, P y D conservan siempre sus bits (eF, eP, eD) para que el formato
+# diccionario no cambie de significado; los demas tipos de trampa usan, en
+# orden, los bits a partir del 10, tras paredes y grito.
+_BITS_TRAMPA_CON_NOMBRE = {"F": BIT_EF, "P": BIT_EP, "D": BIT_ED}
+_PRIMER_BIT_EXTRA = 10
+
+
+@dataclass(frozen=True)
+class EspecificacionPalacio:
     """
+    Descripcion del palacio a generar: tamano del tablero, tipos de trampa con
+    cuantas hay de cada uno y numero de soldados. Siempre hay una salida y un
+    Kurtz. La especificacion por defecto es el palacio del enunciado.
+
+    De ella salen los taus de las creencias y los bits de los perceptos:
+    un bit e<tipo> por tipo de trampa, mas eM, eS, paredes y grito.
+    """
+
+    n: int = 6
+    trampas: Tuple[Tuple[Tau, int], ...] = (("F", 1), ("P", 1), ("D", 1))
+    soldados: int = 1
+
+    def __post_init__(self) -> None:
+        tipos = self.tipos_trampa
+        if len(set(tipos)) != len(tipos) or {"M", "S", "CK"} & set(tipos):
+            raise ValueError(f"Tipos de trampa repetidos o reservados: {tipos}")
+        if any(c < 1 for _, c in self.trampas) or self.soldados < 0:
+            raise ValueError("Las cantidades deben ser positivas")
+        if self.n < 2:
+            raise ValueError("El tablero debe ser al menos 2x2")
+
+    @classmethod
+    def desde_texto(cls, trampas: str, n: int = 6, soldados: int = 1) -> "EspecificacionPalacio":
+        """
+        A partir de "F:2,P:1,X:4" (tipo:cantidad; sin cantidad, 1).
+        """
+        pares = []
+        for parte in filter(None, (p.strip() for p in trampas.split(","))):
+            tipo, _, cantidad = parte.partition(":")
+            pares.append((tipo, int(cantidad) if cantidad else 1))
+        return cls(n=n, trampas=tuple(pares), soldados=soldados)
+
+    @property
+    def tipos_trampa(self) -> Tuple[Tau, ...]:
+        return tuple(t for t, _ in self.trampas)
+
+    @property
+    def taus(self) -> Tuple[Tau, ...]:
+        return self.tipos_trampa + ("M", "S", "CK")
+
+    @property
+    def cantidades(self) -> Dict[Tau, int]:
+        """
+        Cuantos elementos hay de cada tau percibible.
+        """
+        return {**dict(self.trampas), "M": self.soldados, "S": 1}
+
+    @property
+    def bits(self) -> Dict[Tau, int]:
+        """
+        Bit del percepto de cada tau percibible (trampas, M y S).
+        """
+        out = {}
+        siguiente = _PRIMER_BIT_EXTRA
+        for tipo in self.tipos_trampa:
+            if tipo in _BITS_TRAMPA_CON_NOMBRE:
+                out[tipo] = _BITS_TRAMPA_CON_NOMBRE[tipo]
+            else:
+                out[tipo] = 1 << siguiente
+                siguiente += 1
+        out["M"] = BIT_EM
+        out["S"] = BIT_ES
+        return out
+
+    @property
+    def ancho_percepto(self) -> int:
+        """
+        Numero de bits que ocupa un percepto codificado.
+        """
+        return max(_PRIMER_BIT_EXTRA, max(self.bits.values()).bit_length())
+
+    def decodificar(self, bits: int) -> Dict[str, bool]:
+        """
+        Percepto en formato diccionario, con una clave e<tipo> por tipo de trampa.
+        """
+        out = {f"e{t}": bool(bits & b) for t, b in self.bits.items()}
+        out.update((k, bool(bits & b)) for k, b in _PAREDES_Y_GRITO)
+        return out
+
+    def codificar(self, obs) -> Percepto:
+        """
+        Inversa de decodificar: percepto en formato diccionario a entero.
+        """
+        return encode_percepts(obs, self.bits)
+
 
-    fila, col = pos
-    if accion == "UP":
-        return (fila - 1, col)
-    if accion == "DOWN":
-        return (fila + 1, col)
-    if accion == "LEFT":
-        return (fila, col - 1)
-    if accion == "RIGHT":
-        return (fila, col + 1)
-    return pos
+ESPECIFICACION_BASE = EspecificacionPalacio()
 
 
 class Palacio:
     """
-    Entorno del palacio:
-    - 3 trampas tipadas: F, P, D (pueden compartir celda entre sí).
-    - M, S, CK están en celda sin trampas, pero pueden compartir celda entre ellos.
-    - Perceptos: eF, eP, eD, eM, eS, paredes, grito.
+    Entorno del palacio, generado segun una EspecificacionPalacio:
+    - trampas tipadas (por defecto una F, una P y una D), que pueden compartir celda.
+    - soldados M, salida S y Kurtz CK en celdas sin trampas, que pueden compartir celda entre ellos.
+    - Perceptos: e<tipo> por tipo de trampa, eM, eS, paredes, grito.
+
+    trampas y soldado dan la primera trampa de cada tipo y el primer soldado
+    (la disposicion completa esta en trampas_de y soldados).
     """
-    def __init__(self, n: int = 6, seed: Optional[int] = None) -> None:
-        self.n = n
+    def __init__(self, n: int = 6, seed: Optional[int] = None, spec: Optional[EspecificacionPalacio] = None) -> None:
+        if spec is None:
+            spec = ESPECIFICACION_BASE if n == ESPECIFICACION_BASE.n else EspecificacionPalacio(n=n)
+        self.spec = spec
+        self.n = n = spec.n
+        self.rejilla = rejilla(n)
         self.seed = seed
         self._rng = random.Random(seed)
 
         self.inicio: Pos = (1, 1)
 
+        self.trampas_de: Dict[Tau, Tuple[Pos, ...]] = {}
         self.trampas: Dict[Tau, Pos] = {}
+        self.celdas_trampa: FrozenSet[Pos] = frozenset()
 
-        self.soldado: Pos | None = None
-        self.soldado_vivo: bool = True
+        self.soldados: Tuple[Pos, ...] = ()
+        self.vivos: List[bool] = []
         self.kurtz: Pos | None = None
         self.salida: Pos | None = None
 
@@ -55,39 +203,105 @@ class Palacio:
         Genera una nueva configuracion del palacio. Colocando las trampas,
         el soldado, la salida y Kurtz y garantiza quqe el inicio este libre de peligro.
         """
-        celdas: List[Pos] = [(fila, col) for fila in range(1, self.n + 1) for col in range(1, self.n + 1)]
+        celdas: List[Pos] = list(self.rejilla.celdas)
         celdas.remove(self.inicio)
 
-        self.trampas = {
-            "F": self._rng.choice(celdas),
-            "P": self._rng.choice(celdas),
-            "D": self._rng.choice(celdas),
-        }
-        celdas_trampa = set(self.trampas.values())
+        choice = self._rng.choice
+        self.trampas_de = {t: tuple(choice(celdas) for _ in range(c)) for t, c in self.spec.trampas}
+        self.trampas = {t: ps[0] for t, ps in self.trampas_de.items()}
+        self.celdas_trampa = frozenset(p for ps in self.trampas_de.values() for p in ps)
 
-        celdas_seguras = [p for p in celdas if p not in celdas_trampa]
+        celdas_seguras = [p for p in celdas if p not in self.celdas_trampa]
         if not celdas_seguras:
             raise RuntimeError("No hay celdas sin trampas para colocar M/S/CK. Cambia seed.")
 
-        self.soldado = self._rng.choice(celdas_seguras)
-        self.salida = self._rng.choice(celdas_seguras)
-        self.kurtz = self._rng.choice(celdas_seguras)
+        self.soldados = tuple(choice(celdas_seguras) for _ in range(self.spec.soldados))
+        self.salida = choice(celdas_seguras)
+        self.kurtz = choice(celdas_seguras)
 
-        self.soldado_vivo = True
+        self.vivos = [True] * len(self.soldados)
         self._validate()
+        self._build_percept_table()
+
+    @property
+    def soldado(self) -> Optional[Pos]:
+        return self.soldados[0] if self.soldados else None
+
+    @property
+    def soldado_vivo(self) -> bool:
+        """
+        True si queda algun soldado vivo.
+        """
+        return any(self.vivos)
+
+    def soldados_en_pie(self) -> FrozenSet[Pos]:
+        return frozenset(p for p, v in zip(self.soldados, self.vivos) if v)
 
     def _validate(self) -> None:
         """
         Comprueba la validezz de la configuracion generada.
         """
-        assert self.inicio != self.trampas["F"]
-        assert self.inicio != self.trampas["P"]
-        assert self.inicio != self.trampas["D"]
+        assert self.inicio not in self.celdas_trampa
 
-        celdas_trampa = set(self.trampas.values())
-        assert self.soldado not in celdas_trampa
-        assert self.salida not in celdas_trampa
-        assert self.kurtz not in celdas_trampa
+        assert not self.celdas_trampa.intersection(self.soldados)
+        assert self.salida not in self.celdas_trampa
+        assert self.kurtz not in self.celdas_trampa
+
+    def _build_percept_table(self) -> None:
+        """
+        Precalcula los perceptos de cada celda como enteros (sin el grito).
+        Cada elemento marca su bit en las celdas de su entorno, asi que el
+        coste es O(n^2 + elementos). El mundo es estatico salvo los soldados,
+        asi que se cuenta cuantos soldados vivos percibe cada celda para poder
+        quitar el bit eM cuando mueren.
+        """
+        n = self.n
+        r = self.rejilla
+        entorno = r.entorno_pos
+        tabla = [0] * (n * n)
+
+        for i, pos in enumerate(r.celdas):
+            fila, col = pos
+            bits = 0
+            if fila == 1:
+                bits |= BIT_PARED_UP
+            if fila == n:
+                bits |= BIT_PARED_DOWN
+            if col == 1:
+                bits |= BIT_PARED_LEFT
+            if col == n:
+                bits |= BIT_PARED_RIGHT
+            tabla[i] = bits
+
+        bits_spec = self.spec.bits
+        for t, ps in self.trampas_de.items():
+            for p in ps:
+                for q in entorno[p]:
+                    tabla[r.idx(q)] |= bits_spec[t]
+        for q in entorno[self.salida]:
+            tabla[r.idx(q)] |= BIT_ES
+
+        self._soldados_cerca = [0] * (n * n)
+        for p, vivo in zip(self.soldados, self.vivos):
+            if vivo:
+                for q in entorno[p]:
+                    self._soldados_cerca[r.idx(q)] += 1
+        for i, c in enumerate(self._soldados_cerca):
+            if c:
+                tabla[i] |= BIT_EM
+
+        self._tabla_perceptos: List[Percepto] = [Percepto(b) for b in tabla]
+
+    def _clear_soldier_bit(self, soldado: Pos) -> None:
+        """
+        Descuenta un soldado muerto y quita el bit eM donde ya no se percibe ninguno.
+        """
+        r = self.rejilla
+        for q in r.entorno_pos[soldado]:
+            i = r.idx(q)
+            self._soldados_cerca[i] -= 1
+            if not self._soldados_cerca[i]:
+                self._tabla_perceptos[i] = Percepto(self._tabla_perceptos[i] & ~BIT_EM)
 
     def limites(self, pos: Pos) -> bool:
         """
@@ -96,40 +310,32 @@ class Palacio:
         fila, col = pos
         return 1 <= fila <= self.n and 1 <= col <= self.n
 
-    def neighbors(self, pos: Pos) -> List[Pos]:
+    def neighbors(self, pos: Pos) -> Tuple[Pos, ...]:
         """
         Devuelve las posiciones vecinas ortogonales de una celda.
         """
-        fila, col = pos
-        cand = [(fila - 1, col), (fila + 1, col), (fila, col - 1), (fila, col + 1)]
-        return [p for p in cand if self.limites(p)]
+        return self.rejilla.vecinos_pos[pos]
 
-    def _adj_self(self, pos: Pos) -> Set[Pos]:
+    def _adj_self(self, pos: Pos) -> FrozenSet[Pos]:
         """
         Devuelve el conjunto de la celda actual + sus vecinos.
         """
-        return set(self.neighbors(pos)) | {pos}
+        return self.rejilla.entorno_pos[pos]
 
-    def get_percepts(self, agent_pos: Pos, grito: bool = False) -> dict:
+    def get_percepts_bits(self, agent_pos: Pos, grito: bool = False) -> Percepto:
         """
-        Devuelve el conjunto de perceptos observables desde una posicion.
+        Devuelve los perceptos de una posicion codificados como entero (ver BIT_*),
+        leidos de la tabla precalculada en reset().
         """
-        fila, col = agent_pos
-        pared_up = (fila == 1)
-        pared_down = (fila == self.n)
-        pared_left = (col == 1)
-        pared_right = (col == self.n)
+        bits = self._tabla_perceptos[(agent_pos[0] - 1) * self.n + (agent_pos[1] - 1)]
+        return Percepto(bits | BIT_GRITO) if grito else bits
 
-        adj_self = self._adj_self(agent_pos)
-
-        eF = self.trampas["F"] in adj_self
-        eP = self.trampas["P"] in adj_self
-        eD = self.trampas["D"] in adj_self
-
-        eM = self.soldado_vivo and (self.soldado in adj_self)
-        eS = (self.salida in adj_self)
-
-        return {"eF": eF, "eP": eP, "eD": eD, "eM": eM, "eS": eS, "pared_up": pared_up, "pared_down": pared_down, "pared_left": pared_left, "pared_right": pared_right, "grito": grito}
+    def get_percepts(self, agent_pos: Pos, grito: bool = False) -> dict:
+        """
+        Devuelve el conjunto de perceptos observables desde una posicion, con
+        una clave e<tipo> por tipo de trampa de la especificacion.
+        """
+        return self.spec.decodificar(self.get_percepts_bits(agent_pos, grito))
     
     def step_move(self, agent_pos: Pos, accion: str) -> Pos:
         """
@@ -144,34 +350,43 @@ class Palacio:
         """
         Determina si una celda contiene una trampa.
         """
-        return pos in set(self.trampas.values())
+        return pos in self.celdas_trampa
 
     def is_lethal(self, pos: Pos) -> bool:
         """Determina si es mortal, si hay trampa o si hay soldado vivo en esa celda."""
-        if self.cell_has_trap(pos):
-            return True
-        if self.soldado_vivo and pos == self.soldado:
+        if pos in self.celdas_trampa:
             return True
+        for p, vivo in zip(self.soldados, self.vivos):
+            if vivo and p == pos:
+                return True
         return False
 
     def throw_grenade(self, origen: Pos, direccion: str) -> bool:
         """
-        Lanza granada 1 celda. Si cae sobre el soldado lo mata.
+        Lanza granada 1 celda. Mata a los soldados vivos de la celda objetivo.
         """
         objetivo = move(origen, direccion)
         if not self.limites(objetivo):
             return False
 
-        if self.soldado_vivo and (objetivo == self.soldado):
-            self.soldado_vivo = False
-            return True
-        return False
+        muerto = False
+        for k, p in enumerate(self.soldados):
+            if self.vivos[k] and p == objetivo:
+                self.vivos[k] = False
+                self._clear_soldier_bit(p)
+                muerto = True
+        return muerto
 
 
-def render_ascii(palacio: Palacio, agent_pos: Pos, visitado: list, reveal: bool = True, kurtz_rescatado: bool = False) -> None:
+@perfil.medido("render.ascii")
+def render_ascii(palacio: Palacio, agent_pos: Pos, visitado: Iterable[Pos], reveal: bool = True, kurtz_rescatado: bool = False,
+                 pantalla: Optional[Pantalla] = None, cabecera: Sequence[str] = (), pie: Sequence[str] = (), tam_ventana: Optional[Tuple[int, int]] = None) -> None:
     """
     Representa visualmente el entorno del palacio con formato ASCII.
-    Se puede elegir si revelar el mapa completo o solo lo observado."""
+    Se puede elegir si revelar el mapa completo o solo lo observado.
+
+    Con pantalla se dibuja de forma incremental en una ventana centrada en el
+    agente (ver Parte_1/world.render_ascii); sin ella se imprime el tablero."""
     
     RESET = "\033[0m"
     ORANGE = "\033[38;5;208m"
@@ -183,6 +398,18 @@ def render_ascii(palacio: Palacio, agent_pos: Pos, visitado: list, reveal: bool
     GRAY = "\033[90m"
     ROSE = '\033[95m'
 
+    if not isinstance(visitado, (set, frozenset)):
+        visitado = set(visitado)
+    color = {"F": RED, "D": ROSE, "P": BLUE}
+    extra = ("\033[36m", "\033[38;5;130m", "\033[38;5;99m", "\033[38;5;64m")
+    trampas_en: Dict[Pos, List[str]] = {}
+    for k, (t, ps) in enumerate(palacio.trampas_de.items()):
+        color.setdefault(t, extra[k % len(extra)])
+        for p in ps:
+            if t not in trampas_en.setdefault(p, []):
+                trampas_en[p].append(t)
+    soldados = palacio.soldados_en_pie()
+
     def cell_symbol(pos: Pos) -> str:
         if pos == agent_pos:
             return f"{ORANGE}CW{RESET}"
@@ -192,21 +419,16 @@ def render_ascii(palacio: Palacio, agent_pos: Pos, visitado: list, reveal: bool
                 return f"{GRAY} .{RESET}"
             return f"{GRAY}??{RESET}"
 
-        hay_trampas = []
-        for t in ("F", "P", "D"):
-            if palacio.trampas[t] == pos:
-                hay_trampas.append(t)
-
+        hay_trampas = trampas_en.get(pos)
         if hay_trampas:
-            color = {"F": RED, "D": ROSE, "P": BLUE}
-            text = "".join(f"{color[t]}{t}{RESET}" for t in hay_trampas)
+            text = "".join(f"{color[t]}{t}{RESET}" for t in hay_trampas[:2])
 
-            if len(hay_trampas) == 1:
+            if len(hay_trampas) == 1 and len(hay_trampas[0]) == 1:
                 return " " + text
             return text
 
 
-        if palacio.soldado_vivo and pos == palacio.soldado:
+        if pos in soldados:
             return f"{YELLOW} M{RESET}"
         if (not kurtz_rescatado) and pos == palacio.kurtz:
             return f"{MAGENTA}CK{RESET}"
@@ -214,15 +436,20 @@ def render_ascii(palacio: Palacio, agent_pos: Pos, visitado: list, reveal: bool
             return f"{GREEN} S{RESET}"
         return f"{GRAY} .{RESET}"
 
-    ancho_terminal = shutil.get_terminal_size((80, 20)).columns
-    ancho_mapa = palacio.n * 3 + (palacio.n - 1)
-    margen = max(0, (ancho_terminal - ancho_mapa) // 2)
-    prefijo = " " * margen
-
-    for fila in range(1, palacio.n + 1):
-        row = [cell_symbol((fila, col)) for col in range(1, palacio.n + 1)]
-        print(prefijo + " ".join(row))
-    print()
+    if pantalla is not None and tam_ventana is None:
+        tam_ventana = ventana_terminal(reservadas=len(cabecera) + len(pie) + 2)
+    f0, c0, f1, c1 = ventana(palacio.n, palacio.n, agent_pos, tam_ventana)
+    celdas = [[cell_symbol((fila, col)) for col in range(c0, c1 + 1)] for fila in range(f0, f1 + 1)]
+    margen = margen_centrado(c1 - c0 + 1)
+
+    if pantalla is not None:
+        pantalla.dibujar(celdas, cabecera, pie, margen)
+        return
+    for linea in cabecera:
+        print(linea)
+    imprimir(celdas, margen)
+    for linea in pie:
+        print(linea)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,116 @@
+"""
+Revision de trazas binarias de episodios (comun.trazas) sin volver a simular.
+
+    python repeticion.py palacio.trz                              # resumen
+    python repeticion.py palacio.trz --lista --resultado muerte   # episodios
+    python repeticion.py palacio.trz --episodio 12 --turno 30     # un turno
+    python repeticion.py palacio.trz --episodio 12 --turno -1 --heatmap t.png
+    python repeticion.py palacio.trz --episodio 12 --desde 25     # reproduce
+
+El mundo de cada episodio se reconstruye desde la traza y cualquier turno se
+lee directamente del fichero mapeado en memoria.
+"""
+from __future__ import annotations
+from collections import Counter
+from typing import Optional
+import argparse
+import os
+import sys
+import time
+
+if __name__ == "__main__":
+    # Ejecutado como script: la raiz del repo (paquete comun) no esta en sys.path.
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from palacio_world import render_ascii
+from comun.terminal import Pantalla
+from comun.trazas import Episodio, LectorTraza
+from trazas_episodio import (ESTADO_GRANADA, ESTADO_KURTZ, ESTADO_SOLDADO_VIVO, PalacioTraza, creencias_belief,
+                             nombre_accion, rio_desde_mundo)
+
+
+def dibujar_turno(ep: Episodio, t: int, k: int, pantalla: Optional[Pantalla] = None) -> None:
+    """
+    Pinta el tablero del turno t del episodio k con su cabecera y percepto.
+    """
+    t = t + ep.turnos if t < 0 else t
+    pos, accion, percepto, estado = ep.paso(t)
+    cabecera = [f"Episodio {k} | seed {ep.seed} | {ep.escenario} | Turno {t + 1}/{ep.turnos} | Pos: {pos}"]
+    pie = [f"Accion: {nombre_accion(ep.escenario, accion)}"]
+    if t == ep.turnos - 1:
+        pie.append(f"Resultado: {ep.resultado.upper()}")
+
+    if ep.escenario == "rio":
+        rio = rio_desde_mundo(ep.filas, ep.cols, ep.mundo, ep.seed)
+        rio.render_ascii(pos, show_strength=True, pantalla=pantalla, cabecera=cabecera, pie=pie)
+        return
+
+    palacio = PalacioTraza.desde_mundo(ep.filas, ep.mundo)
+    palacio.soldado_vivo = bool(estado & ESTADO_SOLDADO_VIVO)
+    visitado = {ep.paso(i)[0] for i in range(t + 1)}
+    cabecera[0] += f" | Granada: {bool(estado & ESTADO_GRANADA)} | Kurtz: {bool(estado & ESTADO_KURTZ)}"
+    pie.insert(0, f"Percepto: {palacio.spec.decodificar(percepto)}")
+    render_ascii(palacio, pos, visitado, reveal=True, kurtz_rescatado=bool(estado & ESTADO_KURTZ),
+                 pantalla=pantalla, cabecera=cabecera, pie=pie)
+
+
+def guardar_heatmap(ep: Episodio, t: int, ruta: str) -> None:
+    matrices = ep.creencias(t)
+    if matrices is None:
+        raise SystemExit("El episodio no tiene creencias grabadas (usa --traza-creencias).")
+    from heatmaps import VistaCreencias
+
+    palacio = PalacioTraza.desde_mundo(ep.filas, ep.mundo)
+    vista = VistaCreencias(ep.filas)
+    vista.actualizar(creencias_belief(matrices, ep.filas, palacio.inicio, palacio.tipos_trampa), ep.paso(t)[0])
+    vista.guardar(ruta)
+
+
+def resumen(lector: LectorTraza) -> None:
+    total = len(lector)
+    cuenta = Counter((c["escenario"], c["resultado"]) for c in map(lector.cabecera, range(total)))
+    print(f"{lector.ruta}: {total} episodios, {os.path.getsize(lector.ruta) / 1e6:.1f} MB")
+    for (escenario, resultado), num in sorted(cuenta.items()):
+        print(f"  {escenario:<8} {resultado:<9} {num:>8} ({num / total:.1%})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Revision de trazas de episodios.")
+    parser.add_argument("traza")
+    parser.add_argument("--lista", action="store_true", help="Lista los episodios (con los filtros dados).")
+    parser.add_argument("--resultado", default=None)
+    parser.add_argument("--escenario", default=None)
+    parser.add_argument("--limite", type=int, default=50)
+    parser.add_argument("--episodio", type=int, default=None)
+    parser.add_argument("--turno", type=int, default=None, help="Muestra solo ese turno (admite negativos: -1 es el ultimo).")
+    parser.add_argument("--desde", type=int, default=0, help="Turno desde el que reproducir.")
+    parser.add_argument("--pausa", type=float, default=0.3)
+    parser.add_argument("--heatmap", default=None, help="PNG con las creencias del turno (requiere --turno).")
+    args = parser.parse_args()
+
+    with LectorTraza(args.traza) as lector:
+        if args.lista:
+            for k in lector.buscar(resultado=args.resultado, escenario=args.escenario)[:args.limite]:
+                c = lector.cabecera(k)
+                print(f"{k:>7}  seed={c['seed']}  {c['escenario']:<8} {c['resultado']:<9} turnos={c['turnos']}")
+            return
+        if args.episodio is None:
+            resumen(lector)
+            return
+
+        ep = lector[args.episodio]
+        if args.turno is not None:
+            dibujar_turno(ep, args.turno, args.episodio)
+            if args.heatmap:
+                guardar_heatmap(ep, args.turno, args.heatmap)
+            return
+
+        pantalla = Pantalla()
+        for t in range(args.desde, ep.turnos):
+            dibujar_turno(ep, t, args.episodio, pantalla)
+            time.sleep(args.pausa)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
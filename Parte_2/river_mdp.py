@@ -1,52 +1,20 @@
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 import random
 import os
-import time
+import sys
 
-Pos = Tuple[int, int]
-
-ACTIONS = ("UP", "DOWN", "LEFT", "RIGHT", "STAY")
-
-def move(pos: Pos, accion: str) -> Pos:
-    """
-    Funcion que recibe una posicion y una accion y devuelve la posicion
-    obtenida tras realizar la accion
-    """
-    fila, col = pos
-    if accion == "UP":
-        return (fila - 1, col)
-    if accion == "DOWN":
-        return (fila + 1, col)
-    if accion == "LEFT":
-        return (fila, col - 1)
-    if accion == "RIGHT":
-        return (fila, col + 1)
-    return pos
-
-
-def in_bounds(pos: Pos, filas: int, cols: int) -> bool:
-    """
-    Funcion que recibe una posicion, el numero de filas y el numero
-    de columnas y devuelve si la posicion esta dentro de los limites
-    """
-
-    fila, col = pos
-    return 1 <= fila <= filas and 1 <= col <= cols
-
-
-def neighbors_4(pos: Pos, filas: int, cols: int) -> List[Pos]:
-    """
-    Funcino que recibe una pociscion, el numero de filas y el numero
-    de columnas y devuelve una lista con todas las celdas vecinas (ortogonalmente)
-    que esten dentro de los limites del tablero.
-    """
+if __name__ == "__main__":
+    # Ejecutado como script: la raiz del repo (paquete comun) no esta en sys.path.
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-    fila, col = pos
-    candidatos = [(fila - 1, col), (fila + 1, col), (fila, col - 1), (fila, col + 1)]
-    return [p for p in candidatos if in_bounds(p, filas, cols)]
+from comun import nucleos, perfil
+from comun.grid import ACTIONS, Pos, in_bounds, move, rejilla
+from comun.fotogramas import NULO, ConsumidorHilo, ConsumidorNulo
+from comun.terminal import Pantalla, imprimir, ventana, ventana_terminal
 
 
 def bfs_path_exists(inicio: Pos, meta: Pos, bloqueados: set[Pos], filas: int, cols: int) -> bool:
@@ -58,17 +26,22 @@ def bfs_path_exists(inicio: Pos, meta: Pos, bloqueados: set[Pos], filas: int, co
 
     if inicio in bloqueados or meta in bloqueados:
         return False
-    q = [inicio]
-    visitados = {inicio}
+    r = rejilla(filas, cols)
+    visto = bytearray(r.size)
+    for p in bloqueados:
+        if r.in_bounds(p):
+            visto[r.idx(p)] = 1
+    s, m = r.idx(inicio), r.idx(meta)
+    visto[s] = 1
+    q = deque([s])
     while q:
-        cur = q.pop(0)
-        if cur == meta:
+        cur = q.popleft()
+        if cur == m:
             return True
-        for vec in neighbors_4(cur, filas, cols):
-            if vec in bloqueados or vec in visitados:
-                continue
-            visitados.add(vec)
-            q.append(vec)
+        for vec in r.vecinos[cur]:
+            if not visto[vec]:
+                visto[vec] = 1
+                q.append(vec)
     return False
 
 
@@ -208,11 +181,14 @@ class RiverWorld:
             return -100.0
         return -1.0
 
-    def render_ascii(self, agent_pos: Pos, show_strength: bool = True) -> None:
+    @perfil.medido("render.rio")
+    def render_ascii(self, agent_pos: Pos, show_strength: bool = True, pantalla: Optional[Pantalla] = None, cabecera: Sequence[str] = (), pie: Sequence[str] = (), tam_ventana: Optional[Tuple[int, int]] = None) -> None:
         """
         Representacion visual del rio en formato ASCII.
         
-        Muestra la posicion del agente, de las islas y de la salida.
+        Muestra la posicion del agente, de las islas y de la salida. Con pantalla
+        se dibuja de forma incremental en una ventana centrada en el agente; sin
+        ella se imprime el rio completo (o la ventana tam_ventana).
         """
         
         RESET = "\033[0m"
@@ -222,16 +198,23 @@ class RiverWorld:
         RED = "\033[31m"
         GRAY = "\033[90m"
 
+        if pantalla is not None and tam_ventana is None:
+            alto, ancho = ventana_terminal(reservadas=len(cabecera) + len(pie) + 4)
+            tam_ventana = (alto, max(1, ancho - 2))
+        f0, c0, f1, c1 = ventana(self.filas, self.cols, agent_pos, tam_ventana)
+
+        lineas = list(cabecera)
         if show_strength:
             header = []
-            for c in range(1, self.cols + 1):
+            for c in range(c0, c1 + 1):
                 header.append(f"{self.strengths[c]:>3}")
-            print("     " + " ".join(header))
-            print("     " + " ".join(["---"] * self.cols))
+            lineas.append("     " + " ".join(header))
+            lineas.append("     " + " ".join(["---"] * (c1 - c0 + 1)))
 
-        for r in range(1, self.filas + 1):
-            row_cells = []
-            for c in range(1, self.cols + 1):
+        celdas = []
+        for r in range(f0, f1 + 1):
+            row_cells = [f"{GRAY} |{RESET}"]
+            for c in range(c0, c1 + 1):
                 p = (r, c)
                 if p == agent_pos:
                     sym = f"{ORANGE}CW{RESET}"
@@ -242,12 +225,46 @@ class RiverWorld:
                 else:
                     sym = f"{BLUE} R{RESET}"
                 row_cells.append(sym)
+            row_cells.append(f"{GRAY}| {RESET}")
+            celdas.append(row_cells)
 
-            print(f"{GRAY}|{RESET} " + " ".join(row_cells) + f" {GRAY}|{RESET}")
-        print()
+        if pantalla is not None:
+            pantalla.dibujar(celdas, lineas, pie)
+            return
+        for linea in lineas:
+            print(linea)
+        imprimir(celdas)
+        for linea in pie:
+            print(linea)
 
 
-def value_iteration(rio: RiverWorld, gamma: float = 0.95, theta: float = 1e-6, max_iter: int = 50_000) -> Tuple[Dict[Pos, float], Dict[Pos, str]]:
+def tabla_transiciones(rio: RiverWorld) -> Tuple[List[int], List[float], List[float], List[int], int]:
+    """
+    El MDP del rio en listas planas para comun.nucleos: destinos, probs,
+    recompensas, terminales y ramas (sucesores como maximo por (s, a)).
+    Cada (s, a) conserva los sucesores de transitions() en su orden y se
+    rellena hasta ramas con destino -1.
+    """
+    r = rejilla(rio.filas, rio.cols)
+    todas = [rio.transitions(s, a) for s in r.celdas for a in ACTIONS]
+    ramas = max(len(trans) for trans in todas)
+    destinos: List[int] = []
+    probs: List[float] = []
+    for trans in todas:
+        for sprima, p in trans.items():
+            destinos.append(r.idx(sprima))
+            probs.append(p)
+        relleno = ramas - len(trans)
+        destinos.extend([-1] * relleno)
+        probs.extend([0.0] * relleno)
+    recompensas = [rio.reward(s) for s in r.celdas]
+    terminales = [int(rio.is_terminal(s)) for s in r.celdas]
+    return destinos, probs, recompensas, terminales, ramas
+
+
+@perfil.medido("value_iteration")
+def value_iteration(rio: RiverWorld, gamma: float = 0.95, theta: float = 1e-6, max_iter: int = 50_000,
+                    backend: str = nucleos.PYTHON) -> Tuple[Dict[Pos, float], Dict[Pos, str]]:
     """
     Implementa el algoritmo de Value Iteration para resolver el MDP del entorno del rio.
     
@@ -261,43 +278,104 @@ def value_iteration(rio: RiverWorld, gamma: float = 0.95, theta: float = 1e-6, m
     - theta: umbral de convergencia; el algoritmo se detiene cuando el cambio
       máximo en V(s) es menor que este valor.
     - max_iter: número máximo de iteraciones permitidas.
+    - backend: backend de comun.nucleos ("python" o "numba", que requiere el
+      paquete numba y compila en la primera llamada). Ambos dan el mismo resultado.
+
+    Las transiciones se tabulan una vez (tabla_transiciones) y los barridos
+    se hacen sobre esa tabla, en el sitio y en el orden de las celdas.
 
     Devuelve:
     - V: diccionario que asigna a cada estado s su valor óptimo V(s).
     - pi: diccionario que asigna a cada estado s la acción óptima π(s).
     """
-    states = [(fila, col) for fila in range(1, rio.filas + 1) for col in range(1, rio.cols + 1)]
-    V: Dict[Pos, float] = {s: 0.0 for s in states}
-    pi: Dict[Pos, str] = {s: "STAY" for s in states}
-
-    for _ in range(max_iter):
-        delta = 0.0
-        for s in states:
-            if rio.is_terminal(s):
-                pi[s] = "STAY"
-                continue
-
-            best_a = None
-            best_q = float("-inf")
+    states = rejilla(rio.filas, rio.cols).celdas
+    destinos, probs, recompensas, terminales, ramas = tabla_transiciones(rio)
+    valores, acciones, barridos = nucleos.resolver(destinos, probs, recompensas, terminales, len(ACTIONS), ramas,
+                                                   gamma, theta, max_iter, ACTIONS.index("STAY"), backend)
+    perfil.contar("value_iteration.barridos", barridos)
+
+    V: Dict[Pos, float] = dict(zip(states, valores))
+    pi: Dict[Pos, str] = {s: ACTIONS[a] for s, a in zip(states, acciones)}
+    return V, pi
 
-            for a in ACTIONS:
-                trans = rio.transitions(s, a)
-                q = 0.0
-                for sprima, p in trans.items():
-                    q += p * (rio.reward(sprima) + gamma * V[sprima])
-                if q > best_q:
-                    best_q = q
-                    best_a = a
 
-            old = V[s]
-            V[s] = best_q
-            pi[s] = best_a if best_a is not None else "STAY"
-            delta = max(delta, abs(old - V[s]))
+@perfil.medido("value_iteration_lote")
+def value_iteration_lote(rios: Sequence[RiverWorld], gamma: float = 0.95, theta: float = 1e-6,
+                         max_iter: int = 50_000) -> List[Tuple[Dict[Pos, float], Dict[Pos, str]]]:
+    """
+    Resuelve K rios del mismo tamano (con distintas corrientes e islas) como
+    un unico problema de tensores K x S x A, con numpy.
 
-        if delta < theta:
-            break
+    Los barridos son los de value_iteration (en el sitio, en el orden de las
+    celdas), pero cada paso se aplica a la vez a los K rios. Cada rio deja de
+    actualizarse en cuanto converge (mascara de activos), de modo que su
+    resultado es exactamente el de resolverlo por separado.
 
-    return V, pi
+    Devuelve una pareja (V, pi) por rio, en el orden recibido.
+    """
+    import numpy as np
+
+    if not rios:
+        return []
+    filas, cols = rios[0].filas, rios[0].cols
+    if any((r.filas, r.cols) != (filas, cols) for r in rios):
+        raise ValueError("Todos los rios del lote deben tener el mismo tamano")
+
+    states = rejilla(filas, cols).celdas
+    S, A = len(states), len(ACTIONS)
+    tablas = [tabla_transiciones(rio) for rio in rios]
+    ramas = max(t[4] for t in tablas)
+    K = len(rios)
+    # Los huecos apuntan a la celda 0 con probabilidad 0: suman 0.0 a q.
+    destinos = np.zeros((K, S * A, ramas), dtype=np.int64)
+    probs = np.zeros((K, S * A, ramas))
+    for k, t in enumerate(tablas):
+        destinos[k, :, :t[4]] = np.maximum(np.array(t[0], dtype=np.int64), 0).reshape(S * A, t[4])
+        probs[k, :, :t[4]] = np.array(t[1], dtype=np.float64).reshape(S * A, t[4])
+    destinos = destinos.reshape(K, S, A * ramas)
+    probs = probs.reshape(K, S, A, ramas)
+    recompensas = np.array([t[2] for t in tablas], dtype=np.float64)
+    terminales = np.array([t[3] for t in tablas], dtype=bool)
+
+    V = np.zeros((K, S))
+    pi = np.full((K, S), ACTIONS.index("STAY"), dtype=np.int64)
+    activos = np.arange(K)
+    barridos = 0
+
+    while activos.size and barridos < max_iter:
+        barridos += 1
+        k_act = activos.size
+        Va = V[activos]
+        pa = pi[activos]
+        Ra = recompensas[activos]
+        # W = r + gamma * V por celda, aplanado para indexar con take; se
+        # mantiene al dia celda a celda como V en el barrido en el sitio.
+        W = Ra + gamma * Va
+        Wf = W.reshape(-1)
+        d_act = destinos[activos] + (np.arange(k_act) * S)[:, None, None]
+        p_act = probs[activos]
+        vivas = ~terminales[activos]
+        filas_k = np.arange(k_act)
+        delta = np.zeros(k_act)
+        for s in range(S):
+            t = p_act[:, s] * Wf.take(d_act[:, s]).reshape(k_act, A, ramas)
+            q = t[..., 0]
+            for k in range(1, ramas):
+                q = q + t[..., k]
+            best_a = q.argmax(axis=1)
+            best_q = q[filas_k, best_a]
+            viva = vivas[:, s]
+            cambio = np.where(viva, np.abs(Va[:, s] - best_q), 0.0)
+            Va[:, s] = np.where(viva, best_q, Va[:, s])
+            pa[:, s] = np.where(viva, best_a, pa[:, s])
+            W[:, s] = Ra[:, s] + gamma * Va[:, s]
+            np.maximum(delta, cambio, out=delta)
+        V[activos] = Va
+        pi[activos] = pa
+        activos = activos[delta >= theta]
+    perfil.contar("value_iteration.barridos", barridos)
+
+    return [(dict(zip(states, V[k].tolist())), {s: ACTIONS[a] for s, a in zip(states, pi[k].tolist())}) for k in range(K)]
 
 
 def sample_next(rng: random.Random, dist: Dict[Pos, float]) -> Pos:
@@ -312,7 +390,7 @@ def sample_next(rng: random.Random, dist: Dict[Pos, float]) -> Pos:
     return last
 
 
-def simulate_episode( rio: RiverWorld, pi: Dict[Pos, str], seed: Optional[int] = 0, max_steps: int = 200, render: bool = True) -> Tuple[bool, float, List[Pos]]:
+def simulate_episode( rio: RiverWorld, pi: Dict[Pos, str], seed: Optional[int] = 0, max_steps: int = 200, render: bool = True, pausa: float = 0.2, consumidor: Optional[ConsumidorNulo] = None) -> Tuple[bool, float, List[Pos]]:
     """
     Simula el episodio completo del entorno del rio siguiendo la politica dada.
     Permite realizar la simulacion sin necesidad de renderizarla por pantalla.
@@ -323,47 +401,57 @@ def simulate_episode( rio: RiverWorld, pi: Dict[Pos, str], seed: Optional[int] =
     - seed: semilla para el generador de números aleatorios.
     - max_steps: número máximo de pasos del episodio.
     - render: indica si se muestra la evolución del episodio en formato ASCII.
+    - pausa: segundos entre fotogramas cuando se renderiza (0: sin limite); la
+      simulacion no espera: se descartan los que no de tiempo a pintar.
+    - consumidor: destino de los fotogramas; por defecto se pintan en un hilo aparte
+      si render y se ignoran si no. Un consumidor recibido no se cierra aqui.
 
     Devuelve:
     - success: True si el episodio termina en la salida, False si termina en una isla.
     - total: recompensa total acumulada durante el episodio.
     - path: lista de estados visitados durante la simulación."""
     
+    propio = None
+    if consumidor is None:
+        consumidor = NULO
+        if render:
+            pantalla = Pantalla()
+            consumidor = propio = ConsumidorHilo(lambda f: rio.render_ascii(f[0], show_strength=True, pantalla=pantalla, cabecera=[f[1]]),
+                                                 fps=1.0 / pausa if pausa > 0 else None)
+
     rng = random.Random(seed)
     s = rio.inicio
     total = 0.0
     path = [s]
 
-    for step in range(1, max_steps + 1):
-        if render:
-            os.system("cls")
-            print(f"Paso: {step} | Pos: {s} | Acción π(s): {pi.get(s,'STAY')}")
-            rio.render_ascii(s, show_strength=True)
-
-        if rio.is_terminal(s):
-            break
+    try:
+        for step in range(1, max_steps + 1):
+            if consumidor.activo:
+                consumidor.enviar((s, f"Paso: {step} | Pos: {s} | Acción π(s): {pi.get(s,'STAY')}"))
 
-        a = pi.get(s, "STAY")
-        dist = rio.transitions(s, a)
-        sprima = sample_next(rng, dist)
-        total += rio.reward(sprima)
-        s = sprima
-        path.append(s)
+            if rio.is_terminal(s):
+                break
 
-        if render:
-            time.sleep(0.2)
+            a = pi.get(s, "STAY")
+            dist = rio.transitions(s, a)
+            sprima = sample_next(rng, dist)
+            total += rio.reward(sprima)
+            s = sprima
+            path.append(s)
 
-        if rio.is_terminal(s):
-            if render:
-                os.system("cls")
-                print(f"FINAL | Pos: {s} | Recompensa total: {total}")
-                rio.render_ascii(s, show_strength=True)
-            break
+            if rio.is_terminal(s):
+                if consumidor.activo:
+                    consumidor.enviar((s, f"FINAL | Pos: {s} | Recompensa total: {total}"))
+                break
+    finally:
+        if propio is not None:
+            propio.cerrar()
 
     success = (s == rio.exit)
     return success, total, path
 
 
+@perfil.medido("render.politica")
 def render_policy(rio: RiverWorld, pi: Dict[Pos, str]) -> None:
     """
     Representa visualmente la politica optima del rio.
@@ -397,8 +485,8 @@ def render_policy(rio: RiverWorld, pi: Dict[Pos, str]) -> None:
     print()
 
 
-def main() -> None:
-    rio = RiverWorld(filas=7, cols=6, nislas=2, seed=0)
+def main(seed: Optional[int] = 0, filas: int = 7, cols: int = 6, nislas: int = 2, simular: Optional[bool] = None) -> None:
+    rio = RiverWorld(filas=filas, cols=cols, nislas=nislas, seed=seed)
     rio.reset()
 
     print("=== Río generado ===")
@@ -410,8 +498,9 @@ def main() -> None:
     print("\n=== Política óptima (flechas) ===")
     render_policy(rio, pi)
 
-    mode = input("Simular episodio? [s/n]: ").strip().lower()
-    if mode == "s":
+    if simular is None:
+        simular = input("Simular episodio? [s/n]: ").strip().lower() == "s"
+    if simular:
         simulate_episode(rio, pi, seed=1, render=True)
     else:
         print("Fin.")
@@ -0,0 +1,187 @@
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+import struct
+
+from palacio_world import ESPECIFICACION_BASE, EspecificacionPalacio, Palacio, Pos
+from bayes import BeliefState
+from river_mdp import RiverWorld
+from comun import trazas
+from comun.grid import ACTION_IDX, ACTIONS
+
+# Acciones del palacio en la traza: 0-3 mover, 4-7 granada en esa direccion.
+GRANADA = 4
+ESTADO_GRANADA = 1
+ESTADO_KURTZ = 2
+ESTADO_SOLDADO_VIVO = 4
+
+_MUNDO_PALACIO = struct.Struct("<7H")
+_MUNDO_GENERAL = struct.Struct("<5H")
+
+
+def _idx(pos: Pos, cols: int) -> int:
+    return (pos[0] - 1) * cols + (pos[1] - 1)
+
+
+def _pos(i: int, cols: int) -> Pos:
+    fila, col = divmod(i, cols)
+    return (fila + 1, col + 1)
+
+
+def nombre_accion(escenario: str, codigo: int) -> str:
+    if codigo == trazas.SIN_ACCION:
+        return "-"
+    if escenario == "palacio" and codigo >= GRANADA:
+        return "GRANADA_" + ACTIONS[codigo - GRANADA]
+    return ACTIONS[codigo]
+
+
+def mundo_palacio(palacio: Palacio) -> bytes:
+    """
+    Disposicion del palacio (indices de celda). El palacio base se guarda como
+    inicio, F, P, D, soldado, salida y Kurtz; con otra especificacion, como
+    inicio, salida, Kurtz, numero de tipos y de soldados, cada tipo (nombre y
+    sus celdas) y los soldados.
+    """
+    n = palacio.n
+    if palacio.spec == ESPECIFICACION_BASE:
+        celdas = (palacio.inicio, palacio.trampas["F"], palacio.trampas["P"], palacio.trampas["D"],
+                  palacio.soldado, palacio.salida, palacio.kurtz)
+        return _MUNDO_PALACIO.pack(*(_idx(p, n) for p in celdas))
+
+    partes = [_MUNDO_GENERAL.pack(_idx(palacio.inicio, n), _idx(palacio.salida, n), _idx(palacio.kurtz, n),
+                                  len(palacio.trampas_de), len(palacio.soldados))]
+    for tipo, ps in palacio.trampas_de.items():
+        nombre = tipo.encode("utf-8")
+        partes.append(struct.pack(f"<B{len(nombre)}sH{len(ps)}H", len(nombre), nombre, len(ps), *(_idx(p, n) for p in ps)))
+    partes.append(struct.pack(f"<{len(palacio.soldados)}H", *(_idx(p, n) for p in palacio.soldados)))
+    return b"".join(partes)
+
+
+@dataclass
+class PalacioTraza:
+    """
+    Palacio reconstruido desde una traza, con lo necesario para render_ascii.
+    La traza solo guarda si queda algun soldado vivo (soldado_vivo).
+    """
+
+    n: int
+    inicio: Pos
+    trampas_de: Dict[str, Tuple[Pos, ...]]
+    soldados: Tuple[Pos, ...]
+    salida: Pos
+    kurtz: Pos
+    soldado_vivo: bool = True
+
+    @property
+    def tipos_trampa(self) -> Tuple[str, ...]:
+        return tuple(self.trampas_de)
+
+    @property
+    def spec(self) -> EspecificacionPalacio:
+        """
+        Especificacion con la que se genero el palacio (para decodificar perceptos).
+        """
+        return EspecificacionPalacio(n=self.n, trampas=tuple((t, len(ps)) for t, ps in self.trampas_de.items()),
+                                     soldados=len(self.soldados))
+
+    def soldados_en_pie(self) -> frozenset:
+        return frozenset(self.soldados) if self.soldado_vivo else frozenset()
+
+    @classmethod
+    def desde_mundo(cls, n: int, mundo: bytes) -> "PalacioTraza":
+        if len(mundo) == _MUNDO_PALACIO.size:
+            inicio, f, p, d, m, s, k = (_pos(i, n) for i in _MUNDO_PALACIO.unpack(mundo))
+            return cls(n=n, inicio=inicio, trampas_de={"F": (f,), "P": (p,), "D": (d,)}, soldados=(m,), salida=s, kurtz=k)
+
+        inicio, s, k, ntipos, nsoldados = _MUNDO_GENERAL.unpack_from(mundo)
+        off = _MUNDO_GENERAL.size
+        trampas_de = {}
+        for _ in range(ntipos):
+            largo = mundo[off]
+            tipo = mundo[off + 1:off + 1 + largo].decode("utf-8")
+            off += 1 + largo
+            (cantidad,) = struct.unpack_from("<H", mundo, off)
+            trampas_de[tipo] = tuple(_pos(i, n) for i in struct.unpack_from(f"<{cantidad}H", mundo, off + 2))
+            off += 2 + 2 * cantidad
+        soldados = tuple(_pos(i, n) for i in struct.unpack_from(f"<{nsoldados}H", mundo, off))
+        return cls(n=n, inicio=_pos(inicio, n), trampas_de=trampas_de, soldados=soldados, salida=_pos(s, n), kurtz=_pos(k, n))
+
+
+def creencias_belief(matrices: List[List[List[float]]], n: int, inicio: Pos, tipos_trampa: Sequence[str] = ("F", "P", "D")) -> BeliefState:
+    """
+    BeliefState a partir de las matrices de creencias de un turno de la traza.
+    """
+    b = BeliefState(n=n, inicio=inicio, taus=tuple(tipos_trampa) + ("M", "S", "CK"), tipos_trampa=tuple(tipos_trampa))
+    b.belief = {tau: {(f + 1, c + 1): v for f, fila in enumerate(mat) for c, v in enumerate(fila)}
+                for tau, mat in zip(b.taus, matrices)}
+    return b
+
+
+@dataclass
+class RegistroPalacio:
+    """
+    Acumula los turnos de una partida del palacio y la codifica como episodio
+    de comun.trazas. Con creencias se guarda una copia float32 por turno.
+    """
+
+    palacio: Palacio
+    creencias: bool = False
+    pasos: List[list] = field(default_factory=list)
+    _creencias: array = field(default_factory=lambda: array("f"))
+    _canales: int = 0
+
+    def turno(self, pos: Pos, obs: int, granada: bool, kurtz: bool, belief: Optional[BeliefState] = None) -> None:
+        estado = (ESTADO_GRANADA if granada else 0) | (ESTADO_KURTZ if kurtz else 0) | (ESTADO_SOLDADO_VIVO if self.palacio.soldado_vivo else 0)
+        self.pasos.append([_idx(pos, self.palacio.n), trazas.SIN_ACCION, int(obs), estado])
+        if self.creencias and belief is not None:
+            self._canales = len(belief.taus)
+            belief.volcar(self._creencias)
+
+    def mover(self, accion: str) -> None:
+        self.pasos[-1][1] = ACTION_IDX[accion]
+
+    def granada(self, direccion: str) -> None:
+        self.pasos[-1][1] = GRANADA + ACTION_IDX[direccion]
+
+    def codificar(self, resultado: str) -> bytes:
+        n = self.palacio.n
+        creencias = self._creencias if self._canales and len(self._creencias) == len(self.pasos) * self._canales * n * n else None
+        return trazas.codificar("palacio", self.palacio.seed, n, n, resultado, mundo_palacio(self.palacio),
+                                [tuple(p) for p in self.pasos], creencias, self._canales)
+
+
+def mundo_rio(rio: RiverWorld) -> bytes:
+    """
+    Disposicion del rio: inicio, salida, islas y fuerza de la corriente por
+    columna en decimas (la generacion las redondea a 0.1).
+    """
+    islas = sorted(_idx(p, rio.cols) for p in rio.islas)
+    fuerzas = [round(10 * rio.strengths[c]) for c in range(1, rio.cols + 1)]
+    return struct.pack(f"<3H{len(islas)}H{len(fuerzas)}B", _idx(rio.inicio, rio.cols), _idx(rio.exit, rio.cols), len(islas), *islas, *fuerzas)
+
+
+def rio_desde_mundo(filas: int, cols: int, mundo: bytes, seed: Optional[int] = None) -> RiverWorld:
+    """
+    RiverWorld con la disposicion de la traza, sin volver a generarlo.
+    """
+    inicio, salida, nislas = struct.unpack_from("<3H", mundo)
+    resto = struct.unpack_from(f"<{nislas}H{cols}B", mundo, 6)
+    rio = RiverWorld(filas=filas, cols=cols, nislas=nislas, seed=seed)
+    rio.inicio = _pos(inicio, cols)
+    rio.exit = _pos(salida, cols)
+    rio.islas = {_pos(i, cols) for i in resto[:nislas]}
+    rio.strengths = {c + 1: f / 10 for c, f in enumerate(resto[nislas:])}
+    return rio
+
+
+def traza_rio(rio: RiverWorld, pi: Dict[Pos, str], path: List[Pos], resultado: str) -> bytes:
+    """
+    Episodio del rio: un paso por estado del camino con la accion de la politica.
+    """
+    pasos = []
+    for s in path:
+        accion = trazas.SIN_ACCION if rio.is_terminal(s) else ACTION_IDX[pi.get(s, "STAY")]
+        pasos.append((_idx(s, rio.cols), accion, 0, 0))
+    return trazas.codificar("rio", rio.seed, rio.filas, rio.cols, resultado, mundo_rio(rio), pasos)
@@ -0,0 +1,69 @@
+"""
+Benchmark de busqueda de la Parte 1: bfs_path frente a astar_path y campos de
+distancias reutilizables (construccion, consultas y actualizacion incremental).
+
+Uso: python benchmarks/bench_busqueda.py [--tamanos 6 50 200 1000 2000]
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Parte_1"))
+
+from search_agent import CampoDistancias, astar_path, bfs_path  # noqa: E402
+
+
+def _grid(n: int, densidad: float, seed: int) -> set:
+    rng = random.Random(seed)
+    bloqueado = {(f, c) for f in range(1, n + 1) for c in range(1, n + 1) if rng.random() < densidad}
+    bloqueado.discard((1, 1))
+    bloqueado.discard((n, n))
+    return bloqueado
+
+
+def _medir(fn, repeticiones: int = 1) -> tuple:
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        out = fn()
+    return (time.perf_counter() - t0) / repeticiones, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[6, 50, 200, 1000, 2000])
+    parser.add_argument("--densidad", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'n':>6} {'bfs_path':>10} {'astar':>10} {'campo':>10} {'consulta':>10} {'bloquear':>10} {'desbloq':>10}")
+    for n in args.tamanos:
+        bloqueado = _grid(n, args.densidad, args.seed)
+        rep = max(1, 20000 // (n * n))
+
+        t_bfs, p1 = _medir(lambda: bfs_path(n, (1, 1), (n, n), bloqueado), rep)
+        t_astar, p2 = _medir(lambda: astar_path(n, (1, 1), (n, n), bloqueado), rep)
+        assert (p1 is None) == (p2 is None) and (p1 is None or len(p1) == len(p2))
+
+        t_campo, campo = _medir(lambda: CampoDistancias(n, [(n, n)], bloqueado), rep)
+
+        rng = random.Random(args.seed)
+        consultas = [(rng.randint(1, n), rng.randint(1, n)) for _ in range(1000)]
+        t0 = time.perf_counter()
+        for q in consultas:
+            campo.distancia(q)
+        t_consulta = (time.perf_counter() - t0) / len(consultas)
+
+        celda = p2[len(p2) // 2] if p2 else (n // 2 + 1, n // 2 + 1)
+        t_bloq, _ = _medir(lambda: campo.bloquear(celda))
+        t_desb, _ = _medir(lambda: campo.desbloquear(celda))
+
+        print(f"{n:>6} {t_bfs * 1e3:>9.2f}ms {t_astar * 1e3:>9.2f}ms {t_campo * 1e3:>9.2f}ms "
+              f"{t_consulta * 1e6:>8.2f}us {t_bloq * 1e3:>9.2f}ms {t_desb * 1e3:>9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
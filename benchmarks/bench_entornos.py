@@ -0,0 +1,57 @@
+"""
+Benchmark de los entornos reset/step: pasos de entorno por segundo con
+acciones aleatorias, para un entorno suelto y para la variante vectorial.
+
+Uso: python benchmarks/bench_entornos.py [--num 1 16 64] [--pasos 100000]
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import sys
+import time
+
+_AQUI = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_AQUI, ".."))
+sys.path.insert(0, os.path.join(_AQUI, "..", "Parte_1"))
+sys.path.insert(0, os.path.join(_AQUI, "..", "Parte_2"))
+
+from entorno_kurtz import EntornoKurtz  # noqa: E402
+from entornos import EntornoPalacio, EntornoRio  # noqa: E402
+from comun.entorno import EntornoVectorial  # noqa: E402
+
+
+def pasos_por_segundo(fabrica, num: int, pasos: int, seed: int) -> float:
+    rng = random.Random(seed)
+    venv = EntornoVectorial(fabrica, num)
+    venv.reset(seed)
+    n_acc = venv.n_acciones
+    llamadas = max(1, pasos // num)
+    acciones = [[rng.randrange(n_acc) for _ in range(num)] for _ in range(min(llamadas, 1024))]
+    t0 = time.perf_counter()
+    for k in range(llamadas):
+        venv.step(acciones[k % len(acciones)])
+    return llamadas * num / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=6)
+    parser.add_argument("--num", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--pasos", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    entornos = {
+        "kurtz": lambda: EntornoKurtz(n=args.n),
+        "palacio": lambda: EntornoPalacio(n=args.n),
+        "rio": lambda: EntornoRio(filas=args.n + 1, cols=args.n),
+    }
+    print(f"{'entorno':<10} {'num':>5} {'pasos/s':>12}")
+    for nombre, fabrica in entornos.items():
+        for num in args.num:
+            print(f"{nombre:<10} {num:>5} {pasos_por_segundo(fabrica, num, args.pasos, args.seed):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark del palacio generado con EspecificacionPalacio en tableros grandes
+con muchas trampas: coste de generar el palacio, de actualizar las creencias
+por turno y de decidir la accion.
+
+La actualizacion se compara con la anterior (recorrer todas las celdas
+llamando a la verosimilitud), comprobando que da exactamente las mismas
+creencias en el palacio base; la decision, con calcular risk_death() entero.
+
+Uso: python benchmarks/bench_especificacion.py [--tamanos 6 30 100] [--turnos 50]
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Parte_2"))
+
+from palacio_world import EspecificacionPalacio, Palacio  # noqa: E402
+from bayes import BeliefState  # noqa: E402
+from palacio import choose_action_greedy  # noqa: E402
+
+
+def especificacion(n: int) -> EspecificacionPalacio:
+    """
+    Densidad de trampas parecida a la del palacio base (3 en 36 celdas) y
+    repartida entre cinco tipos.
+    """
+    if n <= 6:
+        return EspecificacionPalacio(n=n)
+    total = max(5, n * n // 12)
+    tipos = ("F", "P", "D", "X", "Y")
+    return EspecificacionPalacio(n=n, trampas=tuple((t, max(1, total // len(tipos))) for t in tipos), soldados=max(1, n // 10))
+
+
+def update_anterior(belief: BeliefState, agent_pos, bits: int) -> None:
+    """
+    Actualizacion de referencia: posterior de cada celda via _likelihood.
+    """
+    for tau, b in belief.bits.items():
+        visto = bool(bits & b)
+        prior = belief.belief[tau]
+        belief.belief[tau] = {pos: p * belief._likelihood(pos, agent_pos, visto) for pos, p in prior.items()}
+        belief._normalize(tau)
+
+
+def _recorrido(palacio: Palacio, turnos: int) -> list:
+    pos = palacio.inicio
+    out = []
+    for k in range(turnos):
+        out.append((pos, palacio.get_percepts_bits(pos)))
+        sig = palacio.step_move(pos, ("RIGHT", "DOWN")[k % 2])
+        pos = pos if palacio.is_lethal(sig) else sig
+    return out
+
+
+def _decidir_anterior(palacio: Palacio, belief: BeliefState, pos) -> None:
+    risk = belief.risk_death()
+    for a in ("UP", "DOWN", "LEFT", "RIGHT"):
+        risk[palacio.step_move(pos, a)]
+
+
+def medir(n: int, turnos: int) -> None:
+    spec = especificacion(n)
+    reps = max(3, 3000 // (n * n))
+    t0 = time.perf_counter()
+    for s in range(reps):
+        palacio = Palacio(seed=s, spec=spec)
+    t_gen = (time.perf_counter() - t0) / reps
+    recorrido = _recorrido(palacio, turnos)
+
+    tiempos = {}
+    finales = []
+    for nombre, fn in (("antes", update_anterior), ("ahora", BeliefState.update)):
+        belief = BeliefState.desde_especificacion(spec, palacio.inicio)
+        t0 = time.perf_counter()
+        for pos, bits in recorrido:
+            fn(belief, pos, bits)
+        tiempos[nombre] = (time.perf_counter() - t0) / len(recorrido)
+        finales.append(belief.belief)
+    if spec == EspecificacionPalacio():
+        assert finales[0] == finales[1], "la actualizacion no coincide con la de referencia"
+
+    pos = recorrido[-1][0]
+    t0 = time.perf_counter()
+    for _ in range(20):
+        _decidir_anterior(palacio, belief, pos)
+    t_riesgo = (time.perf_counter() - t0) / 20
+    t0 = time.perf_counter()
+    for _ in range(20):
+        choose_action_greedy(palacio, belief, pos, (), False)
+    t_decision = (time.perf_counter() - t0) / 20
+
+    peligros = sum(c for _, c in spec.trampas) + spec.soldados
+    print(f"n={n:<4} peligros={peligros:<5} tipos={len(spec.tipos_trampa)} | generar {1e3 * t_gen:8.3f} ms"
+          f" | update {1e3 * tiempos['antes']:8.3f} -> {1e3 * tiempos['ahora']:7.3f} ms ({tiempos['antes'] / tiempos['ahora']:.1f}x)"
+          f" | decision {1e3 * t_riesgo:8.3f} -> {1e3 * t_decision:6.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[6, 30, 100])
+    parser.add_argument("--turnos", type=int, default=50)
+    args = parser.parse_args()
+    for n in args.tamanos:
+        medir(n, args.turnos)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark de generacion de palacios de la Parte 1: configuraciones por segundo
+con y sin la garantia de que sean solucionables.
+
+Uso: python benchmarks/bench_generacion.py [--tamanos 6 10 25 50] [--segundos 1.0]
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Parte_1"))
+
+from world import Palacio  # noqa: E402
+
+
+def generados_por_segundo(n: int, n_precipicios: int, solucionable: bool, segundos: float) -> float:
+    palacio = Palacio(n=n, seed=0, n_precipicios=n_precipicios, solucionable=solucionable)
+    total = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < segundos:
+        palacio.reset()
+        total += 1
+    return total / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[6, 10, 25, 50])
+    parser.add_argument("--densidad", type=float, default=0.1, help="Fraccion de celdas con precipicio (minimo 3).")
+    parser.add_argument("--segundos", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{'n':>5} {'precip':>7} {'libre/s':>10} {'solucionable/s':>15}")
+    for n in args.tamanos:
+        k = max(3, int(args.densidad * n * n))
+        libre = generados_por_segundo(n, k, False, args.segundos)
+        sol = generados_por_segundo(n, k, True, args.segundos)
+        print(f"{n:>5} {k:>7} {libre:>10.0f} {sol:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark de los mapas de calor de creencias (backend Agg): coste por
+fotograma de show_heatmaps, que crea la figura en cada turno, frente a
+VistaCreencias, que la construye una vez y solo actualiza datos y textos.
+
+Uso: python benchmarks/bench_heatmaps.py [--tamanos 6 10 20] [--fotogramas 30]
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Parte_2"))
+
+from palacio_world import Palacio  # noqa: E402
+from bayes import BeliefState  # noqa: E402
+from palacio import show_heatmaps  # noqa: E402
+from heatmaps import VistaCreencias  # noqa: E402
+
+
+def _creencias(n: int, fotogramas: int) -> list:
+    palacio = Palacio(n=n, seed=0)
+    belief = BeliefState(n=n, inicio=palacio.inicio)
+    belief.init_uniform()
+    out = []
+    pos = palacio.inicio
+    for k in range(fotogramas):
+        belief.update(pos, palacio.get_percepts_bits(pos))
+        out.append((belief.copy(), pos))
+        pos = palacio.step_move(pos, ("RIGHT", "DOWN")[k % 2])
+    return out
+
+
+def por_figura(estados: list) -> float:
+    t0 = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for belief, pos in estados:
+            show_heatmaps(belief, pos)
+            fig = plt.gcf()
+            fig.canvas.draw()
+            plt.close(fig)
+    return (time.perf_counter() - t0) / len(estados)
+
+
+def incremental(n: int, estados: list) -> float:
+    vista = VistaCreencias(n)
+    vista.actualizar(*estados[0])
+    vista.dibujar()
+    t0 = time.perf_counter()
+    for belief, pos in estados:
+        vista.actualizar(belief, pos)
+        vista.dibujar()
+    return (time.perf_counter() - t0) / len(estados)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[6, 10, 20])
+    parser.add_argument("--fotogramas", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'n':>4} {'figura nueva ms':>16} {'incremental ms':>15} {'x':>6}")
+    for n in args.tamanos:
+        estados = _creencias(n, args.fotogramas)
+        a = por_figura(estados)
+        b = incremental(n, estados)
+        print(f"{n:>4} {1e3 * a:>16.1f} {1e3 * b:>15.1f} {a / b:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark del historial de creencias mapeado en memoria: coste de grabarlo
+durante las partidas y, sobre un historial de --turnos turnos (formado
+repitiendo los episodios grabados), apertura, lectura de un turno cualquiera,
+serie de una celda a lo largo de un episodio y recorrido de un canal completo.
+
+Uso: python benchmarks/bench_historial.py [--partidas 100] [--turnos 1000000]
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Parte_2"))
+
+from evaluacion import run_episode  # noqa: E402
+from historial_creencias import HistorialCreencias, RegistroCreencias  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--partidas", type=int, default=100)
+    parser.add_argument("--turnos", type=int, default=1_000_000)
+    parser.add_argument("--n", type=int, default=6)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    for s in range(args.partidas):
+        run_episode(s, n=args.n)
+    base = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    episodios = [(s, run_episode(s, n=args.n, historial=True)["creencias"]) for s in range(args.partidas)]
+    con = time.perf_counter() - t0
+    print(f"grabacion ({args.partidas} partidas): sin historial {base:.2f}s | con historial {con:.2f}s (+{100 * (con / base - 1):.1f}%)")
+
+    with tempfile.TemporaryDirectory() as d:
+        t0 = time.perf_counter()
+        with RegistroCreencias(d, args.n) as registro:
+            k = 0
+            while registro.filas < args.turnos:
+                seed, datos = episodios[k % len(episodios)]
+                registro.agregar_episodio(seed, datos)
+                k += 1
+            filas, tam_fila = registro.filas, registro.tam_fila
+        escritura = time.perf_counter() - t0
+        tam = os.path.getsize(os.path.join(d, "creencias.f32"))
+        print(f"{filas} turnos en {k} episodios: {tam / 1e6:.0f} MB ({4 * tam_fila} B/turno), escritura {escritura:.2f}s")
+
+        t0 = time.perf_counter()
+        h = HistorialCreencias(d)
+        apertura = time.perf_counter() - t0
+
+        rng = random.Random(0)
+        accesos = 10_000
+        t0 = time.perf_counter()
+        for _ in range(accesos):
+            e = rng.randrange(len(h))
+            h.turno(e, rng.randrange(h.episodio(e)[2]))
+        turno = (time.perf_counter() - t0) / accesos
+
+        t0 = time.perf_counter()
+        for e in range(1000):
+            h.serie(e, "M", (2, 2))
+        serie = (time.perf_counter() - t0) / 1000
+
+        # P(soldado) maxima por turno recorriendo todo el historial bloque a bloque.
+        t0 = time.perf_counter()
+        canal = h.taus.index("M") * args.n * args.n
+        celdas = args.n * args.n
+        maximos = 0.0
+        paso = 1 << 14
+        for f0 in range(0, h.filas, paso):
+            bloque = h.bloque(f0, f0 + paso)
+            for f in range(len(bloque) // h.tam_fila):
+                i = f * h.tam_fila + canal
+                maximos += max(bloque[i:i + celdas].tolist())
+            bloque.release()
+        recorrido = time.perf_counter() - t0
+        h.cerrar()
+
+    print(f"apertura {1e3 * apertura:.1f} ms | turno aleatorio {1e6 * turno:.1f} us | serie de una celda {1e6 * serie:.0f} us/episodio "
+          f"| max P(M) de todos los turnos {recorrido:.2f}s")
+    grabados = sum(len(datos) for _, datos in episodios) // (4 * tam_fila)
+    print(f"re-simular {filas} turnos costaria ~{base / grabados * filas:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark del arranque en frio: tiempo de importacion de cada punto de
+entrada medido con python -X importtime en un proceso nuevo, tiempo total del
+proceso y si arrastra matplotlib. Tambien mide el arranque de un proceso
+trabajador (spawn) hasta que tiene importado el modulo de las partidas.
+
+Uso: python benchmarks/bench_importacion.py [--repeticiones 5] [--sin-workers]
+"""
+from __future__ import annotations
+from typing import Dict, List, Tuple
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+PARTES = [os.path.join(RAIZ, "Parte_1"), os.path.join(RAIZ, "Parte_2")]
+
+PUNTOS_ENTRADA: List[Tuple[str, str]] = [
+    ("Parte_1", "kurtz"),
+    ("Parte_1", "agente_auto"),
+    ("Parte_1", "entorno_kurtz"),
+    ("Parte_2", "palacio"),
+    ("Parte_2", "evaluacion"),
+    ("Parte_2", "river_mdp"),
+    ("Parte_2", "entornos"),
+    ("Parte_2", "heatmaps"),
+    ("", "simular"),
+]
+
+# Modulos cuya presencia tras importar un punto de entrada indica una dependencia cara.
+PESADOS = ("matplotlib", "concurrent.futures.process")
+
+
+def _entorno(parte: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    rutas = [os.path.join(RAIZ, parte), RAIZ] if parte else [RAIZ]
+    env["PYTHONPATH"] = os.pathsep.join(rutas)
+    env.pop("MPLBACKEND", None)
+    return env
+
+
+def importtime(parte: str, modulo: str) -> Tuple[float, float, List[str]]:
+    """
+    (ms de importacion segun -X importtime, ms del proceso completo, pesados cargados).
+    """
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        env=_entorno(parte), cwd=RAIZ, capture_output=True, text=True, check=True,
+    )
+    proceso = 1e3 * (time.perf_counter() - t0)
+
+    total_us = 0
+    cargados = set()
+    for linea in proc.stderr.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        if not acumulado.strip().isdigit():
+            continue  # cabecera
+        nombre_limpio = nombre.strip()
+        if nombre_limpio == modulo:
+            total_us = int(acumulado)
+        for pesado in PESADOS:
+            if nombre_limpio == pesado:
+                cargados.add(pesado)
+    return total_us / 1e3, proceso, sorted(cargados)
+
+
+def _importar_en_worker(modulo: str) -> Tuple[float, bool]:
+    t0 = time.perf_counter()
+    __import__(modulo)
+    return 1e3 * (time.perf_counter() - t0), "matplotlib" in sys.modules
+
+
+def arranque_worker(modulo: str) -> Tuple[float, float, bool]:
+    """
+    (ms hasta el primer resultado de un pool spawn, ms de importacion dentro del worker, matplotlib cargado).
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        ms_import, mpl = pool.submit(_importar_en_worker, modulo).result()
+        primero = 1e3 * (time.perf_counter() - t0)
+    return primero, ms_import, mpl
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticiones", type=int, default=5, help="Se toma el minimo de cada medida.")
+    parser.add_argument("--sin-workers", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'punto de entrada':<26} {'import ms':>10} {'proceso ms':>11}  pesados")
+    for parte, modulo in PUNTOS_ENTRADA:
+        medidas = [importtime(parte, modulo) for _ in range(args.repeticiones)]
+        imp = min(m[0] for m in medidas)
+        proc = min(m[1] for m in medidas)
+        nombre = f"{parte}/{modulo}" if parte else modulo
+        print(f"{nombre:<26} {imp:>10.1f} {proc:>11.1f}  {', '.join(medidas[0][2]) or '-'}")
+
+    if args.sin_workers:
+        return
+    for ruta in PARTES + [RAIZ]:
+        if ruta not in sys.path:
+            sys.path.append(ruta)
+    os.environ["PYTHONPATH"] = os.pathsep.join(PARTES + [RAIZ])
+    print()
+    print(f"{'worker (spawn)':<26} {'primero ms':>10} {'import ms':>11}  matplotlib")
+    for modulo in ("evaluacion", "agente_auto", "simular"):
+        medidas = [arranque_worker(modulo) for _ in range(args.repeticiones)]
+        primero = min(m[0] for m in medidas)
+        imp = min(m[1] for m in medidas)
+        print(f"{modulo:<26} {primero:>10.1f} {imp:>11.1f}  {'si' if medidas[0][2] else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark de value_iteration_lote: rios resueltos por segundo al resolver K
+rios del mismo tamano (distintas corrientes e islas) como un solo problema
+K x S x A, frente a K llamadas a value_iteration con cada backend de
+comun.nucleos. Comprueba que V y pi coinciden exactamente con los de
+resolver cada rio por separado.
+
+Uso: python benchmarks/bench_lote_rio.py [--tamanos 7x6 15x12] [--lotes 10 100 1000]
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Parte_2"))
+
+from river_mdp import RiverWorld, value_iteration, value_iteration_lote  # noqa: E402
+from comun import nucleos  # noqa: E402
+
+
+def _rios(filas: int, cols: int, k: int) -> list:
+    out = []
+    for seed in range(k):
+        rio = RiverWorld(filas=filas, cols=cols, nislas=2 + seed % max(1, filas * cols // 15), seed=seed)
+        rio.reset()
+        out.append(rio)
+    return out
+
+
+def medir(filas: int, cols: int, k: int) -> None:
+    rios = _rios(filas, cols, k)
+    if nucleos.NUMBA in nucleos.disponibles():
+        value_iteration(rios[0], backend=nucleos.NUMBA)  # compilacion fuera de la medida
+
+    tasas = {}
+    referencia = None
+    for backend in nucleos.disponibles():
+        t0 = time.perf_counter()
+        separados = [value_iteration(rio, backend=backend) for rio in rios]
+        tasas[f"separados/{backend}"] = k / (time.perf_counter() - t0)
+        referencia = referencia or separados
+
+    t0 = time.perf_counter()
+    lote = value_iteration_lote(rios)
+    tasas["lote"] = k / (time.perf_counter() - t0)
+    assert lote == referencia, "el lote no coincide con las soluciones por separado"
+
+    base = tasas[f"separados/{nucleos.PYTHON}"]
+    print(f"{filas}x{cols:<3} K={k:<5} " + " | ".join(f"{nombre} {t:8.1f} rios/s ({t / base:4.1f}x)" for nombre, t in tasas.items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", nargs="+", default=["7x6", "15x12"])
+    parser.add_argument("--lotes", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+    for t in args.tamanos:
+        filas, cols = map(int, t.split("x"))
+        for k in args.lotes:
+            medir(filas, cols, k)
+
+
+if __name__ == "__main__":
+    main()
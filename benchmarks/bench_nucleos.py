@@ -0,0 +1,99 @@
+"""
+Benchmark de value_iteration del rio con cada backend de comun.nucleos
+frente a la version anterior (que llamaba a transitions() y reward() en cada
+barrido), comprobando que todos dan exactamente los mismos V y pi.
+
+El backend numba solo se mide si esta instalado; su tiempo de compilacion
+(la primera llamada) se muestra aparte.
+
+Uso: python benchmarks/bench_nucleos.py [--tamanos 7x6 15x12 30x30] [--semillas 5]
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Parte_2"))
+
+from river_mdp import RiverWorld, value_iteration  # noqa: E402
+from comun import nucleos  # noqa: E402
+from comun.grid import ACTIONS, rejilla  # noqa: E402
+
+
+def value_iteration_anterior(rio: RiverWorld, gamma: float = 0.95, theta: float = 1e-6, max_iter: int = 50_000):
+    states = rejilla(rio.filas, rio.cols).celdas
+    V = {s: 0.0 for s in states}
+    pi = {s: "STAY" for s in states}
+    for _ in range(max_iter):
+        delta = 0.0
+        for s in states:
+            if rio.is_terminal(s):
+                pi[s] = "STAY"
+                continue
+            best_a = None
+            best_q = float("-inf")
+            for a in ACTIONS:
+                q = 0.0
+                for sprima, p in rio.transitions(s, a).items():
+                    q += p * (rio.reward(sprima) + gamma * V[sprima])
+                if q > best_q:
+                    best_q = q
+                    best_a = a
+            old = V[s]
+            V[s] = best_q
+            pi[s] = best_a
+            delta = max(delta, abs(old - V[s]))
+        if delta < theta:
+            break
+    return V, pi
+
+
+def _rios(filas: int, cols: int, semillas: int) -> list:
+    out = []
+    for seed in range(semillas):
+        rio = RiverWorld(filas=filas, cols=cols, nislas=max(2, filas * cols // 20), seed=seed)
+        rio.reset()
+        out.append(rio)
+    return out
+
+
+def medir(filas: int, cols: int, semillas: int) -> None:
+    rios = _rios(filas, cols, semillas)
+    tiempos = {}
+
+    t0 = time.perf_counter()
+    referencia = [value_iteration_anterior(rio) for rio in rios]
+    tiempos["anterior"] = (time.perf_counter() - t0) / len(rios)
+
+    compilacion = None
+    for backend in nucleos.disponibles():
+        if backend == nucleos.NUMBA:
+            t0 = time.perf_counter()
+            value_iteration(rios[0], backend=backend)
+            compilacion = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        resultados = [value_iteration(rio, backend=backend) for rio in rios]
+        tiempos[backend] = (time.perf_counter() - t0) / len(rios)
+        assert resultados == referencia, f"{backend} no coincide con la version anterior"
+
+    linea = f"{filas}x{cols:<4} " + " | ".join(f"{b} {1e3 * t:9.2f} ms ({tiempos['anterior'] / t:5.1f}x)" for b, t in tiempos.items())
+    if compilacion is not None:
+        linea += f" | compilacion numba {compilacion:.2f}s"
+    print(linea)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", nargs="+", default=["7x6", "15x12", "30x30"])
+    parser.add_argument("--semillas", type=int, default=5)
+    args = parser.parse_args()
+    print(f"backends disponibles: {', '.join(nucleos.disponibles())} (se comprueba que V y pi coinciden exactamente)")
+    for t in args.tamanos:
+        filas, cols = map(int, t.split("x"))
+        medir(filas, cols, args.semillas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark del renderizado ASCII de la Parte 1: coste por fotograma del volcado
+completo frente a la Pantalla incremental con ventana, segun el tamano del
+tablero. La salida se escribe en memoria.
+
+Uso: python benchmarks/bench_render.py [--tamanos 6 50 200 1000] [--fotogramas 200]
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Parte_1"))
+
+from world import Palacio, render_ascii  # noqa: E402
+from comun.terminal import Pantalla  # noqa: E402
+
+
+def _paseo(palacio: Palacio, pasos: int, seed: int) -> list:
+    rng = random.Random(seed)
+    pos = (1, 1)
+    out = []
+    for _ in range(pasos):
+        pos = palacio.step_move(pos, rng.choice(("UP", "DOWN", "LEFT", "RIGHT")))
+        out.append(pos)
+    return out
+
+
+def medir(palacio: Palacio, posiciones: list, incremental: bool, ventana: tuple) -> tuple:
+    buf = io.StringIO()
+    pantalla = Pantalla(salida=buf)
+    visitado = set()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(buf):
+        for pos in posiciones:
+            visitado.add(pos)
+            if incremental:
+                render_ascii(palacio, pos, visitado, reveal=False, pantalla=pantalla, pie=[f"pos = {pos}"], tam_ventana=ventana)
+            else:
+                render_ascii(palacio, pos, visitado, reveal=False, pie=[f"pos = {pos}"])
+    dt = time.perf_counter() - t0
+    return dt / len(posiciones), buf.tell() / len(posiciones)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[6, 50, 200, 1000])
+    parser.add_argument("--fotogramas", type=int, default=200)
+    parser.add_argument("--ventana", type=int, nargs=2, default=[20, 26], metavar=("ALTO", "ANCHO"))
+    parser.add_argument("--max-completo", type=int, default=200, help="Tamano maximo para medir el volcado completo.")
+    args = parser.parse_args()
+
+    print(f"{'n':>5} {'completo ms':>12} {'chars':>10} {'incremental ms':>15} {'chars':>8}")
+    for n in args.tamanos:
+        palacio = Palacio(n=n, seed=0)
+        posiciones = _paseo(palacio, args.fotogramas, seed=n)
+        if n <= args.max_completo:
+            t_c, c_c = medir(palacio, posiciones, False, None)
+            completo = f"{1e3 * t_c:>12.3f} {c_c:>10.0f}"
+        else:
+            completo = f"{'-':>12} {'-':>10}"
+        t_i, c_i = medir(palacio, posiciones, True, tuple(args.ventana))
+        print(f"{n:>5} {completo} {1e3 * t_i:>15.3f} {c_i:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
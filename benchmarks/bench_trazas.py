@@ -0,0 +1,82 @@
+"""
+Benchmark de las trazas binarias de episodios: coste de grabar durante las
+partidas, tamano por episodio y, sobre una traza de --episodios episodios
+(formada repitiendo los grabados), tiempo de apertura, de filtrado por
+resultado y de acceso a un turno cualquiera.
+
+Uso: python benchmarks/bench_trazas.py [--partidas 200] [--episodios 100000]
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Parte_2"))
+
+from evaluacion import run_episode  # noqa: E402
+from comun.trazas import EscritorTraza, LectorTraza  # noqa: E402
+
+
+def grabar(partidas: int, **kw) -> tuple:
+    t0 = time.perf_counter()
+    registros = [run_episode(s, **kw).get("traza") for s in range(partidas)]
+    return time.perf_counter() - t0, registros
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--partidas", type=int, default=200)
+    parser.add_argument("--episodios", type=int, default=100_000)
+    args = parser.parse_args()
+
+    base, _ = grabar(args.partidas)
+    con, registros = grabar(args.partidas, trazar=True)
+    creencias, con_creencias = grabar(args.partidas, trazar=True, trazar_creencias=True)
+    tam = sum(map(len, registros)) / len(registros)
+    tam_c = sum(map(len, con_creencias)) / len(con_creencias)
+    print(f"grabacion ({args.partidas} partidas): sin traza {base:.2f}s | traza {con:.2f}s (+{100 * (con / base - 1):.1f}%) "
+          f"| con creencias {creencias:.2f}s (+{100 * (creencias / base - 1):.1f}%)")
+    print(f"bytes por episodio: {tam:.0f} | con creencias {tam_c:.0f}")
+
+    with tempfile.TemporaryDirectory() as d:
+        ruta = os.path.join(d, "bench.trz")
+        t0 = time.perf_counter()
+        with EscritorTraza(ruta) as escritor:
+            for k in range(args.episodios):
+                escritor.escribir(registros[k % len(registros)])
+        escritura = time.perf_counter() - t0
+        print(f"{args.episodios} episodios: {os.path.getsize(ruta) / 1e6:.1f} MB (+{os.path.getsize(ruta + '.idx') / 1e6:.1f} MB indice), "
+              f"escritura {escritura:.2f}s")
+
+        t0 = time.perf_counter()
+        lector = LectorTraza(ruta)
+        apertura = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        muertes = lector.buscar(resultado="muerte")
+        filtro = time.perf_counter() - t0
+
+        rng = random.Random(0)
+        accesos = 10_000
+        t0 = time.perf_counter()
+        for _ in range(accesos):
+            ep = lector[rng.randrange(len(lector))]
+            ep.paso(rng.randrange(ep.turnos))
+        turno = (time.perf_counter() - t0) / accesos
+        lector.cerrar()
+
+        os.remove(ruta + ".idx")
+        t0 = time.perf_counter()
+        with LectorTraza(ruta):
+            sin_indice = time.perf_counter() - t0
+
+    print(f"apertura {1e3 * apertura:.2f} ms (sin indice {1e3 * sin_indice:.0f} ms) | filtrar muertes ({len(muertes)}) {1e3 * filtro:.1f} ms "
+          f"| turno aleatorio {1e6 * turno:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Cliente de carga para servidor.py: abre varias conexiones con muchas sesiones
+cada una y mide pasos por segundo y latencia por peticion (p50/p99/p99.9).
+
+- modo pipeline: cada conexion mantiene --profundidad peticiones en vuelo.
+- modo lote: en cada ronda se envia un step por sesion en una sola escritura
+  (como un entorno vectorial remoto) y se esperan todas las respuestas.
+
+Sin --puerto ni --unix lanza un servidor propio en un puerto libre.
+
+Uso: python benchmarks/carga_servidor.py [--conexiones 4] [--sesiones 2000] [--profundidad 32] [--segundos 5] [--modo pipeline|lote]
+"""
+from __future__ import annotations
+from typing import List, Optional
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, RAIZ)
+
+from comun.protocolo import Cliente, CREAR, ESCENARIOS, RESET, STEP, SIN_SEMILLA  # noqa: E402
+
+ACCIONES = {"palacio": 5, "rio": 5, "kurtz": 5}  # acciones 0-4 (sin granadas)
+
+
+class Medidas:
+    def __init__(self) -> None:
+        self.latencias: List[float] = []
+        self.episodios = 0
+
+
+async def _sesiones(cliente: Cliente, escenario: str, num: int, seed0: int) -> List[int]:
+    ids = [r.obs for r in await asyncio.gather(*cliente.enviar_lote([(CREAR, 0, ESCENARIOS.index(escenario))] * num))]
+    await asyncio.gather(*cliente.enviar_lote([(RESET, s, seed0 + k) for k, s in enumerate(ids)]))
+    return ids
+
+
+async def _grupo(cliente: Cliente, sesiones: List[int], n_acciones: int, fin: float, medidas: Medidas, rng: random.Random) -> None:
+    k = 0
+    while time.perf_counter() < fin:
+        s = sesiones[k % len(sesiones)]
+        k += 1
+        t0 = time.perf_counter()
+        r = await cliente.enviar(STEP, s, rng.randrange(n_acciones))
+        medidas.latencias.append(time.perf_counter() - t0)
+        if r.terminado or r.truncado:
+            medidas.episodios += 1
+            await cliente.enviar(RESET, s, SIN_SEMILLA)
+
+
+async def conexion(args: argparse.Namespace, indice: int, fin_preparacion: asyncio.Event, medidas: Medidas, listas: List[int]) -> None:
+    cliente = await Cliente.conectar(args.host, args.puerto, args.unix)
+    por_conexion = args.sesiones // args.conexiones
+    sesiones = await _sesiones(cliente, args.escenario, por_conexion, indice * por_conexion)
+    listas.append(indice)
+    await fin_preparacion.wait()
+    fin = time.perf_counter() + args.segundos
+    rng = random.Random(indice)
+    n_acciones = ACCIONES[args.escenario]
+
+    if args.modo == "lote":
+        while time.perf_counter() < fin:
+            t0 = time.perf_counter()
+            respuestas = await asyncio.gather(*cliente.enviar_lote([(STEP, s, rng.randrange(n_acciones)) for s in sesiones]))
+            dt = time.perf_counter() - t0
+            medidas.latencias.extend([dt] * len(respuestas))
+            reinicios = [(RESET, s, SIN_SEMILLA) for s, r in zip(sesiones, respuestas) if r.terminado or r.truncado]
+            medidas.episodios += len(reinicios)
+            if reinicios:
+                await asyncio.gather(*cliente.enviar_lote(reinicios))
+    else:
+        grupos = [sesiones[g::args.profundidad] for g in range(min(args.profundidad, len(sesiones)))]
+        await asyncio.gather(*(_grupo(cliente, g, n_acciones, fin, medidas, rng) for g in grupos))
+    await cliente.cerrar()
+
+
+async def carga(args: argparse.Namespace) -> Medidas:
+    medidas = Medidas()
+    listas: List[int] = []
+    evento = asyncio.Event()
+    tareas = [asyncio.ensure_future(conexion(args, i, evento, medidas, listas)) for i in range(args.conexiones)]
+    while len(listas) < args.conexiones:
+        await asyncio.sleep(0.01)
+        for t in tareas:
+            if t.done() and t.exception():
+                raise t.exception()
+    t0 = time.perf_counter()
+    evento.set()
+    await asyncio.gather(*tareas)
+    medidas.segundos = time.perf_counter() - t0
+    return medidas
+
+
+def _lanzar_servidor() -> tuple:
+    proc = subprocess.Popen([sys.executable, os.path.join(RAIZ, "servidor.py"), "--puerto", "0"], stdout=subprocess.PIPE, text=True)
+    linea = proc.stdout.readline().strip()
+    return proc, int(linea.rsplit(":", 1)[1])
+
+
+def _percentil(valores: List[float], q: float) -> float:
+    return valores[min(len(valores) - 1, int(q / 100.0 * len(valores)))]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=None)
+    parser.add_argument("--unix", default=None)
+    parser.add_argument("--escenario", choices=tuple(ACCIONES), default="palacio")
+    parser.add_argument("--conexiones", type=int, default=4)
+    parser.add_argument("--sesiones", type=int, default=2000, help="Total de sesiones (repartidas entre conexiones).")
+    parser.add_argument("--profundidad", type=int, default=32, help="Peticiones en vuelo por conexion (modo pipeline).")
+    parser.add_argument("--modo", choices=("pipeline", "lote"), default="pipeline")
+    parser.add_argument("--segundos", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    proc = None
+    if args.puerto is None and args.unix is None:
+        proc, args.puerto = _lanzar_servidor()
+    try:
+        m = asyncio.run(carga(args))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    lat = sorted(m.latencias)
+    print(f"{args.escenario} | {args.modo} | {args.conexiones} conexiones x {args.sesiones // args.conexiones} sesiones"
+          + (f" | profundidad {args.profundidad}" if args.modo == "pipeline" else ""))
+    print(f"pasos: {len(lat)} en {m.segundos:.2f}s -> {len(lat) / m.segundos:,.0f} pasos/s | episodios terminados: {m.episodios}")
+    print(f"latencia ms: p50={1e3 * _percentil(lat, 50):.3f} p90={1e3 * _percentil(lat, 90):.3f} "
+          f"p99={1e3 * _percentil(lat, 99):.3f} p99.9={1e3 * _percentil(lat, 99.9):.3f} max={1e3 * lat[-1]:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Suite de benchmarks de los caminos calientes de ambas partes, parametrizada por
+tamano de tablero. Guarda los resultados en JSON para comparar entre commits.
+
+Uso:
+    python benchmarks/suite.py [--tamanos 6 10 20] [--salida res.json]
+    python benchmarks/suite.py --comparar base.json [--tolerancia 0.10]
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+_AQUI = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_AQUI, ".."))
+sys.path.insert(0, os.path.join(_AQUI, "..", "Parte_1"))
+sys.path.insert(0, os.path.join(_AQUI, "..", "Parte_2"))
+
+from search_agent import bfs_path  # noqa: E402
+from world import Palacio as Palacio1  # noqa: E402
+from palacio_world import Palacio as Palacio2  # noqa: E402
+from bayes import BeliefState  # noqa: E402
+from palacio import choose_action_greedy  # noqa: E402
+from river_mdp import RiverWorld, bfs_path_exists, simulate_episode, value_iteration  # noqa: E402
+
+
+def medir(fn: Callable[[], object], presupuesto: float, repeticiones: int) -> Dict[str, float]:
+    """
+    Calibra el numero de llamadas por muestra para llenar el presupuesto (s) y
+    devuelve el mejor y la mediana del tiempo por llamada (s) sobre las muestras.
+    """
+    fn()
+    numero = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(numero):
+            fn()
+        dt = time.perf_counter() - t0
+        if dt * repeticiones >= presupuesto or numero >= 1 << 20:
+            break
+        numero *= 2
+
+    muestras = [dt / numero]
+    for _ in range(repeticiones - 1):
+        t0 = time.perf_counter()
+        for _ in range(numero):
+            fn()
+        muestras.append((time.perf_counter() - t0) / numero)
+    muestras.sort()
+    return {"mejor": muestras[0], "mediana": muestras[len(muestras) // 2], "llamadas": numero * repeticiones}
+
+
+def _rio(n: int, seed: int) -> RiverWorld:
+    rio = RiverWorld(filas=n, cols=n, nislas=max(2, n * n // 20), seed=seed)
+    rio.reset()
+    return rio
+
+
+def casos(n: int, seed: int) -> Dict[str, Callable[[], object]]:
+    """
+    Funciones a medir para un tablero nxn. Los datos se preparan fuera de la medida.
+    """
+    rng = random.Random(seed)
+    celdas = [(f, c) for f in range(1, n + 1) for c in range(1, n + 1)]
+    bloqueados = {p for p in celdas if rng.random() < 0.1} - {(1, 1), (n, n)}
+
+    rio = _rio(n, seed)
+    _, pi = value_iteration(rio)
+    rio_reset = RiverWorld(filas=n, cols=n, nislas=max(2, n * n // 20), seed=seed)
+
+    p1 = Palacio1(n=n, seed=seed)
+    p2 = Palacio2(n=n, seed=seed)
+
+    belief = BeliefState(n=n, inicio=p2.inicio)
+    belief.init_uniform()
+    obs = [(pos, p2.get_percepts_bits(pos)) for pos in celdas[: min(len(celdas), 8)]]
+    for pos, o in obs:
+        belief.update(pos, o)
+    visitado = [pos for pos, _ in obs]
+    pos_agente = obs[-1][0]
+
+    def belief_update() -> None:
+        b = BeliefState(n=n, inicio=p2.inicio)
+        b.init_uniform()
+        for pos, o in obs:
+            b.update(pos, o)
+
+    def transitions() -> None:
+        for s in celdas:
+            rio.transitions(s, "RIGHT")
+
+    def percepts_1() -> None:
+        for pos in celdas:
+            p1.get_percepts(pos)
+
+    def percepts_2() -> None:
+        for pos in celdas:
+            p2.get_percepts(pos)
+
+    return {
+        "bfs_path": lambda: bfs_path(n, (1, 1), (n, n), bloqueados),
+        "bfs_path_exists": lambda: bfs_path_exists((1, 1), (n, n), bloqueados, n, n),
+        "river.reset": rio_reset.reset,
+        "river.transitions": transitions,
+        "value_iteration": lambda: value_iteration(rio),
+        "simulate_episode": lambda: simulate_episode(rio, pi, seed=seed, render=False),
+        "belief.update": belief_update,
+        "belief.risk_death": belief.risk_death,
+        "parte1.get_percepts": percepts_1,
+        "parte2.get_percepts": percepts_2,
+        "choose_action_greedy": lambda: choose_action_greedy(p2, belief, pos_agente, visitado, False),
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=_AQUI, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def ejecutar(tamanos: List[int], seed: int, presupuesto: float, repeticiones: int, filtro: Optional[str]) -> Dict:
+    resultados: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for n in tamanos:
+        for nombre, fn in casos(n, seed).items():
+            if filtro and filtro not in nombre:
+                continue
+            r = medir(fn, presupuesto, repeticiones)
+            resultados.setdefault(nombre, {})[str(n)] = r
+            print(f"{nombre:<22} n={n:<4} mejor={1e3 * r['mejor']:>10.4f} ms  mediana={1e3 * r['mediana']:>10.4f} ms")
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "seed": seed,
+        "resultados": resultados,
+    }
+
+
+def comparar(base: Dict, actual: Dict, tolerancia: float) -> int:
+    """
+    Compara el tiempo mejor por caso y tamano. Devuelve el numero de regresiones
+    (casos mas lentos que la base en mas de la tolerancia relativa).
+    """
+    regresiones = 0
+    print(f"\n{'caso':<22} {'n':>5} {'base ms':>10} {'actual ms':>10} {'ratio':>7}")
+    for nombre, por_n in actual["resultados"].items():
+        for n, r in por_n.items():
+            b = base.get("resultados", {}).get(nombre, {}).get(n)
+            if b is None:
+                continue
+            ratio = r["mejor"] / b["mejor"] if b["mejor"] > 0 else float("inf")
+            marca = ""
+            if ratio > 1.0 + tolerancia:
+                regresiones += 1
+                marca = "  REGRESION"
+            print(f"{nombre:<22} {n:>5} {1e3 * b['mejor']:>10.4f} {1e3 * r['mejor']:>10.4f} {ratio:>7.2f}{marca}")
+    return regresiones
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Suite de benchmarks de los caminos calientes.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[6, 10, 20])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--presupuesto", type=float, default=0.2, help="Segundos aproximados por caso y tamano.")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--filtro", default=None, help="Solo los casos cuyo nombre contenga este texto.")
+    parser.add_argument("--salida", default=None, help="Fichero JSON donde guardar los resultados.")
+    parser.add_argument("--comparar", default=None, help="JSON de una ejecucion anterior contra el que comparar.")
+    parser.add_argument("--tolerancia", type=float, default=0.10)
+    args = parser.parse_args()
+
+    res = ejecutar(args.tamanos, args.seed, args.presupuesto, args.repeticiones, args.filtro)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2, sort_keys=True)
+        print(f"\nResultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(base, res, args.tolerancia)
+        print(f"\n{regresiones} regresiones (tolerancia {args.tolerancia:.0%})")
+        sys.exit(1 if regresiones else 0)
+
+
+if __name__ == "__main__":
+    main()
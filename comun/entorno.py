@@ -0,0 +1,79 @@
+"""
+Interfaz comun de entornos al estilo gym: reset(seed) -> (obs, info) y
+step(accion) -> (obs, recompensa, terminado, truncado, info), con
+observaciones y acciones codificadas como enteros.
+"""
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+Paso = Tuple[int, float, bool, bool, Dict]
+
+
+class Entorno(ABC):
+    """
+    Clase base. Las subclases definen ACCIONES (nombre de cada accion entera)
+    e implementan reset y step; step rechaza con ValueError las acciones
+    fuera de range(n_acciones) (ver comprobar_accion).
+    """
+
+    ACCIONES: Tuple[str, ...] = ()
+
+    @property
+    def n_acciones(self) -> int:
+        return len(self.ACCIONES)
+
+    def comprobar_accion(self, accion: int) -> None:
+        if not 0 <= accion < len(self.ACCIONES):
+            raise ValueError(f"Accion desconocida: {accion} (validas: 0-{len(self.ACCIONES) - 1})")
+
+    @abstractmethod
+    def reset(self, seed: Optional[int] = None) -> Tuple[int, Dict]:
+        ...
+
+    @abstractmethod
+    def step(self, accion: int) -> Paso:
+        ...
+
+
+class EntornoVectorial:
+    """
+    Avanza num copias de un entorno en cada llamada. Las copias que terminan se
+    reinician solas; la observacion final queda en info["obs_final"] y la
+    devuelta es ya la del nuevo episodio.
+    """
+
+    def __init__(self, fabrica: Callable[[], Entorno], num: int) -> None:
+        self.entornos: List[Entorno] = [fabrica() for _ in range(num)]
+        self.num = num
+        self.n_acciones = self.entornos[0].n_acciones
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[List[int], List[Dict]]:
+        """
+        Reinicia todas las copias. Con seed, la copia i usa la semilla seed + i.
+        """
+        obs: List[int] = []
+        infos: List[Dict] = []
+        for i, env in enumerate(self.entornos):
+            o, info = env.reset(None if seed is None else seed + i)
+            obs.append(o)
+            infos.append(info)
+        return obs, infos
+
+    def step(self, acciones: Sequence[int]) -> Tuple[List[int], List[float], List[bool], List[bool], List[Dict]]:
+        obs: List[int] = []
+        recompensas: List[float] = []
+        terminados: List[bool] = []
+        truncados: List[bool] = []
+        infos: List[Dict] = []
+        for env, a in zip(self.entornos, acciones):
+            o, r, term, trunc, info = env.step(a)
+            if term or trunc:
+                info = dict(info, obs_final=o)
+                o, _ = env.reset()
+            obs.append(o)
+            recompensas.append(r)
+            terminados.append(term)
+            truncados.append(trunc)
+            infos.append(info)
+        return obs, recompensas, terminados, truncados, infos
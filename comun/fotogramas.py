@@ -0,0 +1,139 @@
+"""
+Tuberia de fotogramas entre la simulacion y el renderizado.
+
+El bucle de simulacion envia instantaneas ligeras (posiciones, copias de las
+creencias...) a un consumidor, que las pinta con la funcion que se le da:
+
+- ConsumidorNulo: no hace nada (ejecuciones sin pantalla). Su atributo activo
+  es False para que el bucle ni siquiera construya la instantanea.
+- ConsumidorSincrono: pinta en el mismo hilo, como mucho a fps fotogramas por
+  segundo; los que llegan antes se descartan. Para modos interactivos y para
+  matplotlib, que debe usarse desde el hilo principal.
+- ConsumidorHilo: pinta desde un hilo aparte a partir de una cola acotada. Si
+  la cola esta llena se descarta el fotograma mas antiguo (descartar=True) o
+  el productor espera (descartar=False, para ver todos los turnos).
+
+Cada fotograma puede pedir que se mantenga en pantalla un tiempo minimo
+(espera), p. ej. para leer un mensaje, sin que la simulacion tenga que dormir.
+"""
+from __future__ import annotations
+from collections import deque
+from typing import Any, Callable, Deque, Optional, Tuple
+import threading
+import time
+
+Pintor = Callable[[Any], None]
+
+
+class ConsumidorNulo:
+    activo = False
+
+    def __init__(self) -> None:
+        self.enviados = 0
+        self.pintados = 0
+        self.descartados = 0
+
+    def enviar(self, fotograma: Any, espera: float = 0.0) -> None:
+        pass
+
+    def cerrar(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+
+NULO = ConsumidorNulo()
+
+
+class ConsumidorSincrono(ConsumidorNulo):
+    activo = True
+
+    def __init__(self, pintar: Pintor, fps: Optional[float] = None) -> None:
+        super().__init__()
+        self.pintar = pintar
+        self.periodo = 1.0 / fps if fps else 0.0
+        self._siguiente = 0.0
+
+    def enviar(self, fotograma: Any, espera: float = 0.0) -> None:
+        self.enviados += 1
+        ahora = time.perf_counter()
+        if espera <= 0 and ahora < self._siguiente:
+            self.descartados += 1
+            return
+        self.pintar(fotograma)
+        self.pintados += 1
+        if espera > 0:
+            time.sleep(espera)
+        self._siguiente = time.perf_counter() + self.periodo
+
+
+class ConsumidorHilo(ConsumidorNulo):
+    activo = True
+
+    def __init__(self, pintar: Pintor, fps: Optional[float] = None, capacidad: int = 2, descartar: bool = True) -> None:
+        super().__init__()
+        self.pintar = pintar
+        self.periodo = 1.0 / fps if fps else 0.0
+        self.capacidad = capacidad
+        self.descartar = descartar
+        self._cola: Deque[Tuple[Any, float]] = deque()
+        self._cond = threading.Condition()
+        self._cerrado = False
+        self.error: Optional[BaseException] = None
+        self._hilo = threading.Thread(target=self._bucle, name="renderizado", daemon=True)
+        self._hilo.start()
+
+    def enviar(self, fotograma: Any, espera: float = 0.0) -> None:
+        with self._cond:
+            if self.error is not None:
+                raise self.error
+            self.enviados += 1
+            while len(self._cola) >= self.capacidad:
+                if self.descartar:
+                    self._cola.popleft()
+                    self.descartados += 1
+                else:
+                    self._cond.wait()
+            self._cola.append((fotograma, espera))
+            self._cond.notify_all()
+
+    def _bucle(self) -> None:
+        siguiente = 0.0
+        while True:
+            with self._cond:
+                while not self._cola and not self._cerrado:
+                    self._cond.wait()
+                if not self._cola:
+                    return
+                fotograma, espera = self._cola.popleft()
+                self._cond.notify_all()
+
+            retraso = siguiente - time.perf_counter()
+            if retraso > 0:
+                time.sleep(retraso)
+            try:
+                self.pintar(fotograma)
+            except BaseException as e:  # se relanza en cerrar()
+                self.error = e
+                with self._cond:
+                    self._cerrado = True
+                    self._cola.clear()
+                    self._cond.notify_all()
+                return
+            self.pintados += 1
+            siguiente = time.perf_counter() + max(self.periodo, espera)
+
+    def cerrar(self) -> None:
+        """
+        Pinta los fotogramas pendientes y espera al hilo de renderizado.
+        """
+        with self._cond:
+            self._cerrado = True
+            self._cond.notify_all()
+        self._hilo.join()
+        if self.error is not None:
+            raise self.error
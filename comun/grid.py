@@ -0,0 +1,240 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+Pos = Tuple[int, int]
+
+ACTIONS = ("UP", "DOWN", "LEFT", "RIGHT", "STAY")
+ACTION_IDX = {a: i for i, a in enumerate(ACTIONS)}
+
+DIRS = {
+    "UP": (-1, 0),
+    "DOWN": (1, 0),
+    "LEFT": (0, -1),
+    "RIGHT": (0, 1),
+}
+
+
+def move(pos: Pos, accion: str) -> Pos:
+    """
+    Funcion que recibe una posicion y una accion y devuelve la posicion
+    obtenida tras realizar la accion (sin comprobar limites).
+    """
+    d = DIRS.get(accion)
+    if d is None:
+        return pos
+    return (pos[0] + d[0], pos[1] + d[1])
+
+
+def in_bounds(pos: Pos, filas: int, cols: int) -> bool:
+    """
+    Indica si una posicion (1-indexada) esta dentro de un tablero filas x cols.
+    """
+    return 1 <= pos[0] <= filas and 1 <= pos[1] <= cols
+
+
+def indices_mascara(m: int) -> List[int]:
+    """
+    Indices de los bits activos de una mascara (de menor a mayor).
+    """
+    out = []
+    while m:
+        low = m & -m
+        out.append(low.bit_length() - 1)
+        m ^= low
+    return out
+
+
+# Por encima de este numero de celdas los vecinos no se tabulan: se calculan
+# en cada consulta (ver _VecinosCalculados), para que las busquedas en
+# tableros enormes no paguen tablas de todo el tablero.
+MAX_CELDAS_TABLA = 1 << 16
+
+
+class _VecinosCalculados:
+    """
+    Secuencia con la misma interfaz que Rejilla.vecinos (vec[i]) que calcula
+    los vecinos al vuelo en lugar de guardarlos.
+    """
+
+    __slots__ = ("filas", "cols", "size")
+
+    def __init__(self, filas: int, cols: int) -> None:
+        self.filas = filas
+        self.cols = cols
+        self.size = filas * cols
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        return (self[i] for i in range(self.size))
+
+    def __getitem__(self, i: int) -> Tuple[int, ...]:
+        cols = self.cols
+        fila, col = divmod(i, cols)
+        out = []
+        if fila > 0:
+            out.append(i - cols)
+        if fila < self.filas - 1:
+            out.append(i + cols)
+        if col > 0:
+            out.append(i - 1)
+        if col < cols - 1:
+            out.append(i + 1)
+        return tuple(out)
+
+
+class Rejilla:
+    """
+    Tablas de un tablero filas x cols, compartidas por todos los modulos
+    (mundos, busquedas, creencias y MDP). Cada tabla se construye en su
+    primer uso, asi que quien solo necesita indices planos no paga las de
+    posiciones.
+
+    Las celdas se numeran con un indice plano i = (fila-1)*cols + (col-1).
+    - vecinos[i]: indices de los vecinos ortogonales (orden UP, DOWN, LEFT, RIGHT);
+      en tableros de mas de MAX_CELDAS_TABLA celdas se calculan en cada consulta.
+    - mover[a][i]: celda destino al aplicar ACTIONS[a] desde i (si hay pared, i).
+    - vecinos_pos / entorno_pos: lo mismo en posiciones (tuplas), sin crear listas.
+
+    Las mascaras de bits sobre el tablero permiten operar con conjuntos de celdas
+    de una vez (expandir, contar, convertir).
+    """
+
+    __slots__ = ("filas", "cols", "size", "_celdas", "_vecinos", "_mover", "_vecinos_pos",
+                 "_full", "_no_col0", "_no_colN", "_entorno_pos")
+
+    def __init__(self, filas: int, cols: int) -> None:
+        self.filas = filas
+        self.cols = cols
+        self.size = filas * cols
+        self._celdas: Optional[Tuple[Pos, ...]] = None
+        self._vecinos = None
+        self._mover: Optional[Tuple[Tuple[int, ...], ...]] = None
+        self._vecinos_pos: Optional[Dict[Pos, Tuple[Pos, ...]]] = None
+        self._entorno_pos: Optional[Dict[Pos, FrozenSet[Pos]]] = None
+        self._full: Optional[int] = None
+
+    @property
+    def celdas(self) -> Tuple[Pos, ...]:
+        if self._celdas is None:
+            self._celdas = tuple((f, c) for f in range(1, self.filas + 1) for c in range(1, self.cols + 1))
+        return self._celdas
+
+    @property
+    def vecinos(self):
+        if self._vecinos is None:
+            calculados = _VecinosCalculados(self.filas, self.cols)
+            if self.size > MAX_CELDAS_TABLA:
+                self._vecinos = calculados
+            else:
+                self._vecinos = tuple(calculados[i] for i in range(self.size))
+        return self._vecinos
+
+    @property
+    def mover(self) -> Tuple[Tuple[int, ...], ...]:
+        if self._mover is None:
+            filas, cols = self.filas, self.cols
+            mover = [[0] * self.size for _ in ACTIONS]
+            for i in range(self.size):
+                fila, col = divmod(i, cols)
+                up = i - cols if fila > 0 else i
+                down = i + cols if fila < filas - 1 else i
+                left = i - 1 if col > 0 else i
+                right = i + 1 if col < cols - 1 else i
+                for a, dest in enumerate((up, down, left, right, i)):
+                    mover[a][i] = dest
+            self._mover = tuple(tuple(m) for m in mover)
+        return self._mover
+
+    @property
+    def vecinos_pos(self) -> Dict[Pos, Tuple[Pos, ...]]:
+        if self._vecinos_pos is None:
+            celdas = self.celdas
+            vecinos = self.vecinos
+            self._vecinos_pos = {celdas[i]: tuple(celdas[j] for j in vecinos[i]) for i in range(self.size)}
+        return self._vecinos_pos
+
+    @property
+    def full(self) -> int:
+        if self._full is None:
+            self._full = (1 << self.size) - 1
+            col0 = 0
+            colN = 0
+            for f in range(self.filas):
+                col0 |= 1 << (f * self.cols)
+                colN |= 1 << (f * self.cols + self.cols - 1)
+            self._no_col0 = self._full & ~col0
+            self._no_colN = self._full & ~colN
+        return self._full
+
+    def idx(self, pos: Pos) -> int:
+        return (pos[0] - 1) * self.cols + (pos[1] - 1)
+
+    def pos(self, i: int) -> Pos:
+        return self.celdas[i]
+
+    def in_bounds(self, pos: Pos) -> bool:
+        return 1 <= pos[0] <= self.filas and 1 <= pos[1] <= self.cols
+
+    def step(self, pos: Pos, accion: str) -> Pos:
+        """
+        Posicion tras la accion; si hay pared se queda en la misma celda.
+        """
+        return self.celdas[self.mover[ACTION_IDX[accion]][self.idx(pos)]]
+
+    @property
+    def entorno_pos(self) -> Dict[Pos, FrozenSet[Pos]]:
+        """
+        Celda + vecinos de cada posicion (se construye en el primer uso).
+        """
+        if self._entorno_pos is None:
+            self._entorno_pos = {p: frozenset(v + (p,)) for p, v in self.vecinos_pos.items()}
+        return self._entorno_pos
+
+    # --- Operaciones con mascaras de bits (todas las celdas a la vez) ---
+
+    def mascara(self, celdas: Iterable[Pos]) -> int:
+        m = 0
+        for p in celdas:
+            m |= 1 << self.idx(p)
+        return m
+
+    def expandir(self, m: int) -> int:
+        """
+        Mascara con los vecinos ortogonales de todas las celdas de m.
+        """
+        cols = self.cols
+        full = self.full
+        return ((m >> cols) | (m << cols) | ((m & self._no_col0) >> 1) | ((m & self._no_colN) << 1)) & full
+
+    def indices(self, m: int) -> List[int]:
+        return indices_mascara(m)
+
+    def posiciones(self, m: int) -> List[Pos]:
+        return [self.celdas[i] for i in self.indices(m)]
+
+
+@lru_cache(maxsize=8)
+def _rejilla(filas: int, cols: int) -> Rejilla:
+    return Rejilla(filas, cols)
+
+
+def rejilla(filas: int, cols: Optional[int] = None) -> Rejilla:
+    """
+    Rejilla cacheada por tamano (cuadrada si no se indica cols).
+    """
+    return _rejilla(filas, filas if cols is None else cols)
+
+
+def neighbors_4(pos: Pos, filas: int, cols: Optional[int] = None) -> Tuple[Pos, ...]:
+    """
+    Vecinos ortogonales dentro del tablero (tupla cacheada, no se copia).
+    """
+    r = rejilla(filas, cols)
+    v = r.vecinos_pos.get(pos)
+    if v is not None:
+        return v
+    cand = ((pos[0] - 1, pos[1]), (pos[0] + 1, pos[1]), (pos[0], pos[1] - 1), (pos[0], pos[1] + 1))
+    return tuple(p for p in cand if r.in_bounds(p))
@@ -0,0 +1,108 @@
+"""
+Nucleos de calculo sobre MDPs tabulares, con un backend opcional compilado.
+
+Un MDP se tabula en listas planas (ver river_mdp.tabla_transiciones):
+
+- destinos[(s * A + a) * R + k]: k-esimo sucesor de (s, a), -1 si no hay mas;
+- probs[...]: su probabilidad, en el mismo orden que transitions();
+- recompensas[s']: recompensa al llegar a s';
+- terminales[s]: 1 si s es terminal.
+
+El mismo codigo fuente se ejecuta en Python sobre listas o, si numba esta
+instalado, compilado sobre arrays de numpy. Las operaciones en coma flotante
+son las mismas y en el mismo orden, asi que ambos backends dan valores y
+politicas identicos. El backend por defecto es PYTHON aunque numba este
+instalado: NUMBA hay que pedirlo, y solo entonces se importa y se compila
+(la primera llamada paga la compilacion y deja la cache en __pycache__).
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Sequence, Tuple
+import importlib.util
+import math
+
+PYTHON = "python"
+NUMBA = "numba"
+
+_COMPILADOS: Dict[str, Callable] = {}
+
+
+def disponibles() -> Tuple[str, ...]:
+    """
+    Backends utilizables en este entorno.
+    """
+    if importlib.util.find_spec("numba") is not None:
+        return (PYTHON, NUMBA)
+    return (PYTHON,)
+
+
+def barridos_gauss_seidel(destinos, probs, recompensas, terminales, n_acciones: int, ramas: int,
+                          gamma: float, theta: float, max_iter: int, V, pi) -> int:
+    """
+    Value iteration en el sitio (cada estado usa los valores ya actualizados
+    del barrido en curso), como river_mdp.value_iteration. Actualiza V y pi
+    (indice de accion; los terminales no se tocan) y devuelve los barridos.
+    """
+    S = len(V)
+    for it in range(max_iter):
+        delta = 0.0
+        for s in range(S):
+            if terminales[s]:
+                continue
+            best_a = 0
+            best_q = -math.inf
+            for a in range(n_acciones):
+                base = (s * n_acciones + a) * ramas
+                q = 0.0
+                for k in range(ramas):
+                    d = destinos[base + k]
+                    if d < 0:
+                        break
+                    q += probs[base + k] * (recompensas[d] + gamma * V[d])
+                if q > best_q:
+                    best_q = q
+                    best_a = a
+            cambio = abs(V[s] - best_q)
+            V[s] = best_q
+            pi[s] = best_a
+            if cambio > delta:
+                delta = cambio
+        if delta < theta:
+            return it + 1
+    return max_iter
+
+
+def _compilado(nombre: str, fn: Callable) -> Callable:
+    jit = _COMPILADOS.get(nombre)
+    if jit is None:
+        import numba
+
+        jit = _COMPILADOS[nombre] = numba.njit(cache=True)(fn)
+    return jit
+
+
+def resolver(destinos: Sequence[int], probs: Sequence[float], recompensas: Sequence[float], terminales: Sequence[int],
+             n_acciones: int, ramas: int, gamma: float, theta: float, max_iter: int,
+             accion_terminal: int = 0, backend: str = PYTHON) -> Tuple[List[float], List[int], int]:
+    """
+    (V, pi, barridos) del MDP tabulado con el backend pedido. Los estados
+    terminales quedan con valor 0 y accion accion_terminal.
+    """
+    S = len(recompensas)
+    if backend == PYTHON:
+        V = [0.0] * S
+        pi = [accion_terminal] * S
+        barridos = barridos_gauss_seidel(destinos, probs, recompensas, terminales, n_acciones, ramas, gamma, theta, max_iter, V, pi)
+        return V, pi, barridos
+    if backend == NUMBA:
+        if NUMBA not in disponibles():
+            raise RuntimeError("El backend numba requiere el paquete numba.")
+        import numpy as np
+
+        V = np.zeros(S)
+        pi = np.full(S, accion_terminal, dtype=np.int64)
+        barridos = _compilado("gauss_seidel", barridos_gauss_seidel)(
+            np.asarray(destinos, dtype=np.int64), np.asarray(probs, dtype=np.float64),
+            np.asarray(recompensas, dtype=np.float64), np.asarray(terminales, dtype=np.uint8),
+            n_acciones, ramas, gamma, theta, max_iter, V, pi)
+        return V.tolist(), pi.tolist(), int(barridos)
+    raise ValueError(f"Backend desconocido: {backend} (disponibles: {', '.join(disponibles())})")
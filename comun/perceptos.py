@@ -0,0 +1,68 @@
+"""
+Perceptos codificados como enteros (un bit por percepto), compartidos por los
+mundos de las dos Partes. Cada mundo define su tabla (nombre, bit) y crea su
+clase con tipo_percepto.
+"""
+from __future__ import annotations
+from typing import Dict, Sequence, Tuple
+
+TablaBits = Sequence[Tuple[str, int]]
+
+
+def decodificar(tabla: TablaBits, bits: int) -> Dict[str, bool]:
+    """
+    Percepto en formato diccionario segun la tabla de bits.
+    """
+    return {k: bool(bits & b) for k, b in tabla}
+
+
+class PerceptoBase(int):
+    """
+    Percepto codificado como entero. Admite acceso por nombre (p.eM, p["eM"],
+    p.get("eM")) para ser compatible con el formato diccionario, y operaciones
+    de bits directas. Las subclases las crea tipo_percepto con su tabla.
+    """
+
+    __slots__ = ()
+    _BITS: Dict[str, int] = {}
+
+    def __getitem__(self, key: str) -> bool:
+        return bool(self & self._BITS[key])
+
+    def get(self, key: str, default: bool = False) -> bool:
+        b = self._BITS.get(key)
+        return default if b is None else bool(self & b)
+
+    def keys(self):
+        return self._BITS.keys()
+
+    def to_dict(self) -> dict:
+        return decodificar(self._BITS.items(), self)
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    @classmethod
+    def codificar(cls, obs) -> "PerceptoBase":
+        """
+        Convierte un percepto en formato diccionario (o ya codificado) a esta clase.
+        """
+        if isinstance(obs, int):
+            return obs if isinstance(obs, cls) else cls(obs)
+        bits = 0
+        for k, b in cls._BITS.items():
+            if obs.get(k, False):
+                bits |= b
+        return cls(bits)
+
+
+def tipo_percepto(nombre: str, tabla: TablaBits, modulo: str) -> type:
+    """
+    Subclase de PerceptoBase con los bits de tabla y un accesor por nombre
+    (p. ej. Percepto.brisa, Percepto.pared_up). modulo es el __name__ del
+    modulo que la define, para que las instancias se puedan serializar.
+    """
+    cls = type(nombre, (PerceptoBase,), {"__slots__": (), "_BITS": dict(tabla), "__module__": modulo})
+    for k, b in tabla:
+        setattr(cls, k, property(lambda self, _b=b: bool(self & _b)))
+    return cls
@@ -0,0 +1,170 @@
+"""
+Instrumentacion opcional: temporizadores, contadores y volcado de perfiles.
+
+Desactivada por defecto. Mientras lo esta, los decoradores solo anaden una
+comprobacion de un booleano por llamada y temporizador() devuelve un contexto
+nulo compartido, sin medir nada.
+
+    from comun import perfil
+
+    @perfil.medido("belief.update")
+    def update(...): ...
+
+    with perfil.temporizador("render"):
+        ...
+
+    perfil.activar()
+    ... partida ...
+    perfil.volcar_json("episodio.json", seed=0)
+"""
+from __future__ import annotations
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, TypeVar
+import cProfile
+import json
+import math
+import time
+
+F = TypeVar("F", bound=Callable)
+
+_activo = False
+_tiempos: Dict[str, List[float]] = {}
+_contadores: Dict[str, int] = {}
+_NULO = nullcontext()
+
+
+def activar() -> None:
+    global _activo
+    _activo = True
+
+
+def desactivar() -> None:
+    global _activo
+    _activo = False
+
+
+def activo() -> bool:
+    return _activo
+
+
+def reiniciar() -> None:
+    """
+    Borra los tiempos y contadores acumulados (p. ej. al empezar un episodio).
+    """
+    _tiempos.clear()
+    _contadores.clear()
+
+
+def _anotar(nombre: str, dt: float) -> None:
+    t = _tiempos.get(nombre)
+    if t is None:
+        _tiempos[nombre] = [1, dt, dt]
+    else:
+        t[0] += 1
+        t[1] += dt
+        if dt > t[2]:
+            t[2] = dt
+
+
+class _Temporizador:
+    __slots__ = ("nombre", "_t0")
+
+    def __init__(self, nombre: str) -> None:
+        self.nombre = nombre
+
+    def __enter__(self) -> "_Temporizador":
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _anotar(self.nombre, time.perf_counter() - self._t0)
+
+
+def temporizador(nombre: str):
+    """
+    Contexto que acumula el tiempo del bloque bajo nombre (nulo si esta desactivada).
+    """
+    return _Temporizador(nombre) if _activo else _NULO
+
+
+def medido(nombre: Optional[str] = None) -> Callable[[F], F]:
+    """
+    Decorador que acumula el tiempo de cada llamada a la funcion.
+    """
+    def decorador(fn: F) -> F:
+        clave = nombre or fn.__qualname__
+
+        @wraps(fn)
+        def envoltura(*args, **kwargs):
+            if not _activo:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _anotar(clave, time.perf_counter() - t0)
+
+        return envoltura  # type: ignore[return-value]
+
+    return decorador
+
+
+def contar(nombre: str, k: int = 1) -> None:
+    if _activo:
+        _contadores[nombre] = _contadores.get(nombre, 0) + k
+
+
+def percentile(valores: List[float], q: float) -> float:
+    """
+    Percentil q (0-100) por el metodo del rango mas cercano sobre una lista ordenada.
+    """
+    if not valores:
+        return 0.0
+    k = max(0, min(len(valores) - 1, math.ceil(q / 100.0 * len(valores)) - 1))
+    return valores[k]
+
+
+def informe() -> Dict:
+    """
+    Tiempos (llamadas, total, media y maximo en ms) y contadores acumulados.
+    """
+    tiempos = {
+        nombre: {
+            "llamadas": int(n),
+            "total_ms": 1000.0 * total,
+            "media_ms": 1000.0 * total / n,
+            "max_ms": 1000.0 * maximo,
+        }
+        for nombre, (n, total, maximo) in sorted(_tiempos.items(), key=lambda kv: -kv[1][1])
+    }
+    return {"tiempos": tiempos, "contadores": dict(sorted(_contadores.items()))}
+
+
+def volcar_json(ruta: str, **meta) -> Dict:
+    """
+    Escribe el informe en JSON junto con los metadatos dados (seed, resultado...).
+    """
+    datos = dict(meta)
+    datos.update(informe())
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2)
+    return datos
+
+
+@contextmanager
+def cprofile(ruta: Optional[str]) -> Iterator[Optional[cProfile.Profile]]:
+    """
+    Perfila el bloque con cProfile y guarda las estadisticas (formato pstats,
+    legible por snakeviz, gprof2dot o flameprof). Con ruta None no hace nada.
+    """
+    if ruta is None:
+        yield None
+        return
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield prof
+    finally:
+        prof.disable()
+        prof.dump_stats(ruta)
@@ -0,0 +1,154 @@
+"""
+Protocolo binario del servidor de simulacion (ver servidor.py) y cliente asyncio.
+
+Peticiones y respuestas son registros de tamano fijo, little-endian:
+
+- PETICION: op, id, sesion, argumento. El argumento es el escenario en CREAR,
+  la semilla en RESET (SIN_SEMILLA = sin semilla) y la accion en STEP.
+- RESPUESTA: id, estado, observacion, recompensa, banderas (TERMINADO,
+  TRUNCADO). En CREAR la observacion es el id de la sesion nueva; si estado no
+  es OK, la observacion queda a 0.
+
+Cada conexion solo puede usar las sesiones que ha creado ella; las demas se
+tratan como desconocidas. Si el entorno falla en RESET o STEP se responde
+ERROR_ENTORNO y la sesion necesita un RESET antes del siguiente STEP.
+
+El id lo elige el cliente y vuelve en la respuesta, de modo que se pueden
+encadenar peticiones sin esperar (pipelining). Las respuestas de una conexion
+llegan en el mismo orden que sus peticiones.
+"""
+from __future__ import annotations
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import asyncio
+import struct
+
+PETICION = struct.Struct("<BIIq")
+RESPUESTA = struct.Struct("<IBqdB")
+
+CREAR, RESET, STEP, CERRAR = 1, 2, 3, 4
+ESCENARIOS = ("palacio", "rio", "kurtz")
+SIN_SEMILLA = -(1 << 63)
+
+OK, SESION_DESCONOCIDA, OP_DESCONOCIDA, ACCION_INVALIDA, SIN_RESET, LIMITE_SESIONES, ERROR_ENTORNO = range(7)
+ERRORES = ("ok", "sesion desconocida", "operacion desconocida", "accion invalida", "step sin reset", "limite de sesiones",
+           "error del entorno")
+
+TERMINADO = 1
+TRUNCADO = 2
+
+
+class Respuesta(NamedTuple):
+    id: int
+    estado: int
+    obs: int
+    recompensa: float
+    banderas: int
+
+    @property
+    def terminado(self) -> bool:
+        return bool(self.banderas & TERMINADO)
+
+    @property
+    def truncado(self) -> bool:
+        return bool(self.banderas & TRUNCADO)
+
+
+class ErrorProtocolo(RuntimeError):
+    def __init__(self, estado: int) -> None:
+        super().__init__(ERRORES[estado] if 0 <= estado < len(ERRORES) else f"error {estado}")
+        self.estado = estado
+
+
+class Cliente:
+    """
+    Conexion asyncio con el servidor. enviar() escribe la peticion y devuelve
+    un futuro sin esperar a la respuesta; las corutinas crear/reset/step lo
+    esperan y lanzan ErrorProtocolo si el estado no es OK.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._pendientes: Dict[int, asyncio.Future] = {}
+        self._siguiente = 0
+        self._lector = asyncio.ensure_future(self._leer())
+
+    @classmethod
+    async def conectar(cls, host: str = "127.0.0.1", puerto: int = 7878, unix: Optional[str] = None) -> "Cliente":
+        if unix is not None:
+            reader, writer = await asyncio.open_unix_connection(unix)
+        else:
+            reader, writer = await asyncio.open_connection(host, puerto)
+        return cls(reader, writer)
+
+    async def _leer(self) -> None:
+        tam = RESPUESTA.size
+        pendiente = b""
+        try:
+            while True:
+                datos = await self._reader.read(1 << 16)
+                if not datos:
+                    break
+                pendiente += datos
+                fin = len(pendiente) - len(pendiente) % tam
+                for campos in RESPUESTA.iter_unpack(pendiente[:fin]):
+                    fut = self._pendientes.pop(campos[0], None)
+                    if fut is not None and not fut.done():
+                        fut.set_result(Respuesta(*campos))
+                pendiente = pendiente[fin:]
+        finally:
+            error = ConnectionError("conexion cerrada por el servidor")
+            for fut in self._pendientes.values():
+                if not fut.done():
+                    fut.set_exception(error)
+            self._pendientes.clear()
+
+    def enviar(self, op: int, sesion: int = 0, argumento: int = 0) -> asyncio.Future:
+        return self.enviar_lote([(op, sesion, argumento)])[0]
+
+    def enviar_lote(self, peticiones: Sequence[Tuple[int, int, int]]) -> List[asyncio.Future]:
+        """
+        Escribe varias peticiones de una vez y devuelve un futuro por peticion.
+        """
+        bucle = asyncio.get_running_loop()
+        futuros = []
+        partes = []
+        for op, sesion, argumento in peticiones:
+            pid = self._siguiente
+            self._siguiente = (pid + 1) & 0xFFFFFFFF
+            fut = bucle.create_future()
+            self._pendientes[pid] = fut
+            futuros.append(fut)
+            partes.append(PETICION.pack(op, pid, sesion, argumento))
+        self._writer.write(b"".join(partes))
+        return futuros
+
+    @staticmethod
+    async def _esperar(fut: asyncio.Future) -> Respuesta:
+        r = await fut
+        if r.estado != OK:
+            raise ErrorProtocolo(r.estado)
+        return r
+
+    async def crear(self, escenario: str) -> int:
+        return (await self._esperar(self.enviar(CREAR, 0, ESCENARIOS.index(escenario)))).obs
+
+    async def reset(self, sesion: int, seed: Optional[int] = None) -> Respuesta:
+        return await self._esperar(self.enviar(RESET, sesion, SIN_SEMILLA if seed is None else seed))
+
+    async def step(self, sesion: int, accion: int) -> Respuesta:
+        return await self._esperar(self.enviar(STEP, sesion, accion))
+
+    async def cerrar_sesion(self, sesion: int) -> None:
+        await self._esperar(self.enviar(CERRAR, sesion))
+
+    async def drain(self) -> None:
+        await self._writer.drain()
+
+    async def cerrar(self) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self._lector
@@ -0,0 +1,61 @@
+"""
+Registro de renderizadores que se cargan en el primer uso.
+
+Cada renderizador se registra por nombre con una referencia "modulo:atributo"
+(o directamente con el objeto). El modulo no se importa hasta que alguien
+pide el renderizador con obtener(), de modo que las ejecuciones sin pantalla
+no pagan el coste de matplotlib ni de los backends graficos.
+
+    from comun import renderizadores
+
+    renderizadores.registrar("heatmap", "heatmaps:VistaEnVivo")
+    ...
+    vista = renderizadores.crear("heatmap", n)
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Union
+import importlib
+
+_REGISTRO: Dict[str, Union[str, Any]] = {}
+_CARGADOS: Dict[str, Any] = {}
+
+
+def registrar(nombre: str, destino: Union[str, Any]) -> None:
+    """
+    Registra (o sustituye) un renderizador. destino es "modulo:atributo" o el
+    propio objeto.
+    """
+    _REGISTRO[nombre] = destino
+    _CARGADOS.pop(nombre, None)
+
+
+def obtener(nombre: str) -> Any:
+    """
+    Devuelve el renderizador, importando su modulo la primera vez.
+    """
+    if nombre in _CARGADOS:
+        return _CARGADOS[nombre]
+    try:
+        destino = _REGISTRO[nombre]
+    except KeyError:
+        raise KeyError(f"Renderizador desconocido: {nombre!r} (disponibles: {', '.join(disponibles())})") from None
+    if isinstance(destino, str):
+        modulo, _, atributo = destino.partition(":")
+        destino = getattr(importlib.import_module(modulo), atributo)
+    _CARGADOS[nombre] = destino
+    return destino
+
+
+def crear(nombre: str, *args, **kwargs) -> Any:
+    return obtener(nombre)(*args, **kwargs)
+
+
+def disponibles() -> List[str]:
+    return sorted(_REGISTRO)
+
+
+def cargados() -> List[str]:
+    return sorted(_CARGADOS)
+
+
+registrar("terminal", "comun.terminal:Pantalla")
@@ -0,0 +1,120 @@
+"""
+Renderizado incremental en terminal con secuencias ANSI.
+
+Pantalla guarda el ultimo fotograma dibujado y en cada llamada escribe solo
+las celdas y lineas que han cambiado, moviendo el cursor, en una unica
+escritura. Sustituye al os.system("cls") por turno.
+"""
+from __future__ import annotations
+from typing import List, Optional, Sequence, TextIO, Tuple
+import os
+import shutil
+import sys
+
+from comun.grid import Pos
+
+Rango = Tuple[int, int, int, int]
+
+
+def ventana(filas: int, cols: int, centro: Pos, tam: Optional[Tuple[int, int]] = None) -> Rango:
+    """
+    Rango (f0, c0, f1, c1), 1-indexado e inclusivo, de como mucho tam = (alto, ancho)
+    celdas centrado en centro y ajustado a los bordes. Sin tam, todo el tablero.
+    """
+    if tam is None:
+        return 1, 1, filas, cols
+    alto, ancho = min(tam[0], filas), min(tam[1], cols)
+    f0 = min(max(1, centro[0] - alto // 2), filas - alto + 1)
+    c0 = min(max(1, centro[1] - ancho // 2), cols - ancho + 1)
+    return f0, c0, f0 + alto - 1, c0 + ancho - 1
+
+
+def ventana_terminal(ancho_celda: int = 2, reservadas: int = 6) -> Tuple[int, int]:
+    """
+    Tamano (alto, ancho) en celdas que cabe en el terminal actual, dejando
+    reservadas lineas para cabecera y pie.
+    """
+    t = shutil.get_terminal_size((80, 24))
+    return max(1, t.lines - reservadas), max(1, (t.columns + 1) // (ancho_celda + 1))
+
+
+def margen_centrado(n_celdas: int, ancho_celda: int = 2) -> int:
+    ancho_mapa = n_celdas * (ancho_celda + 1) - 1
+    return max(0, (shutil.get_terminal_size((80, 20)).columns - ancho_mapa) // 2)
+
+
+def imprimir(rejilla: List[List[str]], margen: int = 0) -> None:
+    """
+    Volcado simple (sin control de cursor) de una rejilla de celdas.
+    """
+    prefijo = " " * margen
+    sys.stdout.write("".join(prefijo + " ".join(fila) + "\n" for fila in rejilla) + "\n")
+
+
+class Pantalla:
+    """
+    Dibuja fotogramas formados por lineas de cabecera, una rejilla de celdas
+    (texto con color de ancho visible ancho_celda) y lineas de pie.
+
+    El primer fotograma, o uno con distinta forma, se pinta entero tras borrar
+    la pantalla. Los siguientes solo reescriben lo que difiere del anterior.
+    Lo que se imprima despues del fotograma se borra al dibujar el siguiente.
+    """
+
+    def __init__(self, salida: Optional[TextIO] = None, ancho_celda: int = 2) -> None:
+        self.salida = salida if salida is not None else sys.stdout
+        if os.name == "nt":
+            # Activa el procesado de secuencias ANSI en la consola de Windows.
+            os.system("")
+        self.ancho_celda = ancho_celda
+        self._previo: Optional[List[tuple]] = None
+        self._margen = 0
+        self.escrito = 0
+
+    def invalidar(self) -> None:
+        """
+        Fuerza un repintado completo en el siguiente fotograma.
+        """
+        self._previo = None
+
+    def dibujar(self, rejilla: Sequence[Sequence[str]], cabecera: Sequence[str] = (), pie: Sequence[str] = (), margen: int = 0) -> int:
+        """
+        Dibuja el fotograma y devuelve el numero de caracteres escritos.
+        """
+        lineas: List[tuple] = [("t", t) for t in cabecera]
+        lineas.extend(("r",) + tuple(fila) for fila in rejilla)
+        if rejilla:
+            lineas.append(("t", ""))
+        lineas.extend(("t", t) for t in pie)
+
+        previo = self._previo
+        out: List[str] = []
+        if previo is None or len(previo) != len(lineas) or margen != self._margen:
+            out.append("\033[H\033[2J")
+            out.extend(self._linea(l, margen) + "\n" for l in lineas)
+        else:
+            paso = self.ancho_celda + 1
+            for i, (nueva, vieja) in enumerate(zip(lineas, previo)):
+                if nueva == vieja:
+                    continue
+                if nueva[0] == "t" or vieja[0] == "t" or len(nueva) != len(vieja):
+                    out.append(f"\033[{i + 1};1H{self._linea(nueva, margen)}\033[K")
+                    continue
+                for j in range(1, len(nueva)):
+                    if nueva[j] != vieja[j]:
+                        out.append(f"\033[{i + 1};{margen + (j - 1) * paso + 1}H{nueva[j]}")
+            out.append(f"\033[{len(lineas) + 1};1H\033[J")
+
+        texto = "".join(out)
+        self.salida.write(texto)
+        self.salida.flush()
+        self._previo = lineas
+        self._margen = margen
+        self.escrito = len(texto)
+        return self.escrito
+
+    @staticmethod
+    def _linea(linea: tuple, margen: int) -> str:
+        if linea[0] == "t":
+            return linea[1]
+        return " " * margen + " ".join(linea[1:])
@@ -0,0 +1,254 @@
+"""
+Trazas binarias de episodios: escritura solo por anexado y lectura con mmap.
+
+Un fichero .trz empieza por MAGIA y contiene episodios seguidos. Cada
+episodio es:
+
+- cabecera EPISODIO: escenario, resultado, filas, cols, semilla, turnos,
+  longitud del mundo y canales de creencias (0 = sin creencias);
+- mundo: bytes con la disposicion del tablero (los codifica cada escenario);
+- pasos: turnos registros PASO (celda, accion, percepto, estado), uno por turno;
+- creencias (opcional): turnos * canales * filas * cols float32.
+
+Junto al fichero se mantiene un indice ruta + ".idx" con el desplazamiento de
+cada episodio (uint64), de modo que abrir una traza de 100k episodios solo lee
+ese indice y cualquier turno se localiza con aritmetica, sin re-simular. Si el
+indice falta o se quedo corto (escritura interrumpida) se reconstruye
+recorriendo las cabeceras.
+"""
+from __future__ import annotations
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import mmap
+import os
+import struct
+
+from comun.grid import Pos
+
+MAGIA = b"TRZ\x01"
+EPISODIO = struct.Struct("<BBHHqIHH")
+PASO = struct.Struct("<HBHB")
+FLOAT = 4
+
+ESCENARIOS = ("palacio", "rio", "kurtz")
+RESULTADOS = ("victoria", "muerte", "limite", "atascado")
+SIN_ACCION = 255
+SIN_SEMILLA = -(1 << 63)
+
+Paso = Tuple[int, int, int, int]
+
+
+def codificar(escenario: str, seed: Optional[int], filas: int, cols: int, resultado: str, mundo: bytes,
+              pasos: Sequence[Paso], creencias: Optional[array] = None, canales: int = 0) -> bytes:
+    """
+    Registro binario de un episodio. pasos son tuplas (indice de celda, accion,
+    percepto, estado); creencias, si se dan, un array('f') con canales*filas*cols
+    valores por turno.
+    """
+    if creencias is None:
+        canales = 0
+    elif len(creencias) != len(pasos) * canales * filas * cols:
+        raise ValueError("creencias no cuadra con turnos * canales * filas * cols")
+    partes = [
+        EPISODIO.pack(ESCENARIOS.index(escenario), RESULTADOS.index(resultado), filas, cols,
+                      SIN_SEMILLA if seed is None else seed, len(pasos), len(mundo), canales),
+        mundo,
+    ]
+    partes.extend(PASO.pack(*p) for p in pasos)
+    if canales:
+        partes.append(creencias.tobytes())
+    return b"".join(partes)
+
+
+def _tam_episodio(cab: tuple) -> int:
+    _, _, filas, cols, _, turnos, len_mundo, canales = cab
+    return EPISODIO.size + len_mundo + turnos * (PASO.size + canales * filas * cols * FLOAT)
+
+
+class EscritorTraza:
+    """
+    Anade episodios ya codificados al final de la traza y de su indice.
+    """
+
+    def __init__(self, ruta: str) -> None:
+        self.ruta = ruta
+        nuevo = not os.path.exists(ruta) or os.path.getsize(ruta) == 0
+        if not nuevo:
+            indice, fin = _escanear(ruta)
+            if fin != os.path.getsize(ruta) or len(indice) != len(_leer_indice(ruta)):
+                # Escritura interrumpida: se descarta el episodio incompleto.
+                with open(ruta + ".idx", "wb") as f:
+                    indice.tofile(f)
+                with open(ruta, "r+b") as f:
+                    f.truncate(fin)
+        self._datos = open(ruta, "ab")
+        # Con una traza nueva se descarta cualquier indice que quedara de otra.
+        self._indice = open(ruta + ".idx", "wb" if nuevo else "ab")
+        if nuevo:
+            self._datos.write(MAGIA)
+        self._offset = self._datos.tell()
+
+    def escribir(self, registro: bytes) -> None:
+        self._datos.write(registro)
+        self._indice.write(array("Q", [self._offset]).tobytes())
+        self._offset += len(registro)
+
+    def cerrar(self) -> None:
+        self._datos.close()
+        self._indice.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+
+def _leer_indice(ruta: str) -> array:
+    indice = array("Q")
+    if os.path.exists(ruta + ".idx"):
+        with open(ruta + ".idx", "rb") as f:
+            datos = f.read()
+        indice.frombytes(datos[: len(datos) - len(datos) % indice.itemsize])
+    return indice
+
+
+def _escanear(ruta: str) -> Tuple[array, int]:
+    """
+    Completa el indice recorriendo las cabeceras que le falten. Devuelve el
+    indice y el final del ultimo episodio completo.
+    """
+    indice = _leer_indice(ruta)
+    if indice and indice[0] != len(MAGIA):
+        # Indice de otra traza: se reconstruye entero.
+        indice = array("Q")
+    tam = os.path.getsize(ruta)
+    with open(ruta, "rb") as f:
+        if f.read(len(MAGIA)) != MAGIA:
+            raise ValueError(f"{ruta} no es una traza de episodios")
+        pos = len(MAGIA)
+        while indice:
+            f.seek(indice[-1])
+            cab = f.read(EPISODIO.size)
+            if len(cab) == EPISODIO.size and indice[-1] + _tam_episodio(EPISODIO.unpack(cab)) <= tam:
+                pos = indice[-1] + _tam_episodio(EPISODIO.unpack(cab))
+                break
+            indice.pop()
+        while pos + EPISODIO.size <= tam:
+            f.seek(pos)
+            fin = pos + _tam_episodio(EPISODIO.unpack(f.read(EPISODIO.size)))
+            if fin > tam:
+                break
+            indice.append(pos)
+            pos = fin
+    return indice, pos
+
+
+class Episodio:
+    """
+    Vista de solo lectura de un episodio dentro del mmap de la traza.
+    """
+
+    def __init__(self, buf: memoryview, offset: int) -> None:
+        esc, res, self.filas, self.cols, seed, self.turnos, len_mundo, self.canales = EPISODIO.unpack_from(buf, offset)
+        self.escenario = ESCENARIOS[esc]
+        self.resultado = RESULTADOS[res]
+        self.seed = None if seed == SIN_SEMILLA else seed
+        inicio = offset + EPISODIO.size
+        self.mundo = bytes(buf[inicio:inicio + len_mundo])
+        self._buf = buf
+        self._pasos = inicio + len_mundo
+        self._creencias = self._pasos + self.turnos * PASO.size
+        self._tam_creencias = self.canales * self.filas * self.cols
+
+    def pos_de(self, i: int) -> Pos:
+        fila, col = divmod(i, self.cols)
+        return (fila + 1, col + 1)
+
+    def paso(self, t: int) -> Tuple[Pos, int, int, int]:
+        """
+        (posicion, accion, percepto, estado) del turno t (0-indexado, admite negativos).
+        """
+        t = self._turno(t)
+        i, accion, percepto, estado = PASO.unpack_from(self._buf, self._pasos + t * PASO.size)
+        return self.pos_de(i), accion, percepto, estado
+
+    def pasos(self) -> Iterator[Tuple[Pos, int, int, int]]:
+        for i, accion, percepto, estado in PASO.iter_unpack(self._buf[self._pasos:self._creencias]):
+            yield self.pos_de(i), accion, percepto, estado
+
+    def creencias(self, t: int) -> Optional[List[List[List[float]]]]:
+        """
+        Creencias del turno t como canales matrices filas x cols (None si no se grabaron).
+        """
+        if not self.canales:
+            return None
+        t = self._turno(t)
+        inicio = self._creencias + t * self._tam_creencias * FLOAT
+        valores = array("f")
+        valores.frombytes(self._buf[inicio:inicio + self._tam_creencias * FLOAT])
+        n = self.filas * self.cols
+        return [[valores[k * n + f * self.cols:k * n + (f + 1) * self.cols].tolist() for f in range(self.filas)]
+                for k in range(self.canales)]
+
+    def _turno(self, t: int) -> int:
+        if t < 0:
+            t += self.turnos
+        if not 0 <= t < self.turnos:
+            raise IndexError(t)
+        return t
+
+
+class LectorTraza:
+    """
+    Abre una traza con mmap. lector[k] devuelve el episodio k sin leer los demas.
+    Los episodios que el indice aun no recoge se localizan en memoria, sin
+    modificar los ficheros.
+    """
+
+    def __init__(self, ruta: str) -> None:
+        self.ruta = ruta
+        self._indice, _ = _escanear(ruta)
+        self._f = open(ruta, "rb")
+        self._mmap = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mmap)
+        if self._buf[:len(MAGIA)] != MAGIA:
+            raise ValueError(f"{ruta} no es una traza de episodios")
+
+    def __len__(self) -> int:
+        return len(self._indice)
+
+    def __getitem__(self, k: int) -> Episodio:
+        return Episodio(self._buf, self._indice[k])
+
+    def cabecera(self, k: int) -> Dict:
+        """
+        Solo los campos de la cabecera del episodio k (sin construir la vista).
+        """
+        esc, res, filas, cols, seed, turnos, _, canales = EPISODIO.unpack_from(self._buf, self._indice[k])
+        return {"escenario": ESCENARIOS[esc], "resultado": RESULTADOS[res], "filas": filas, "cols": cols,
+                "seed": None if seed == SIN_SEMILLA else seed, "turnos": turnos, "creencias": canales > 0}
+
+    def buscar(self, resultado: Optional[str] = None, escenario: Optional[str] = None) -> List[int]:
+        """
+        Indices de los episodios con ese resultado y/o escenario.
+        """
+        res = None if resultado is None else RESULTADOS.index(resultado)
+        esc = None if escenario is None else ESCENARIOS.index(escenario)
+        out = []
+        for k, offset in enumerate(self._indice):
+            e, r = self._buf[offset], self._buf[offset + 1]
+            if (res is None or r == res) and (esc is None or e == esc):
+                out.append(k)
+        return out
+
+    def cerrar(self) -> None:
+        self._buf.release()
+        self._mmap.close()
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
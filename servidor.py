@@ -0,0 +1,184 @@
+"""
+Servidor asyncio que aloja muchas partidas simultaneas de los entornos
+reset/step (palacio, rio y Kurtz) para agentes externos.
+
+    python servidor.py --puerto 7878
+    python servidor.py --unix /tmp/simulacion.sock --n 8 --max-sesiones 50000
+
+Una sola conexion puede abrir cualquier numero de sesiones y encadenar
+peticiones sin esperar respuesta; el servidor procesa cada bloque recibido
+de una vez y contesta con una unica escritura. Las sesiones de una conexion
+se cierran al desconectarse. El protocolo y un cliente estan en
+comun/protocolo.py; benchmarks/carga_servidor.py mide su rendimiento.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Set
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+
+_RAIZ = os.path.dirname(os.path.abspath(__file__))
+for _parte in ("Parte_1", "Parte_2"):
+    if os.path.join(_RAIZ, _parte) not in sys.path:
+        sys.path.append(os.path.join(_RAIZ, _parte))
+
+from comun.entorno import Entorno  # noqa: E402
+from comun.protocolo import (CERRAR, CREAR, ESCENARIOS, PETICION, RESET, RESPUESTA, SIN_SEMILLA, STEP,  # noqa: E402
+                             ACCION_INVALIDA, ERROR_ENTORNO, LIMITE_SESIONES, OK, OP_DESCONOCIDA, SESION_DESCONOCIDA,
+                             SIN_RESET, TERMINADO, TRUNCADO)
+
+ENTORNOS = {
+    "palacio": ("entornos", "EntornoPalacio"),
+    "rio": ("entornos", "EntornoRio"),
+    "kurtz": ("entorno_kurtz", "EntornoKurtz"),
+}
+
+
+class Servidor:
+    """
+    Sesiones indexadas por id; cada una es un Entorno creado con la fabrica
+    de su escenario. Los entornos se importan al crear la primera sesion.
+    """
+
+    def __init__(self, config: Dict[str, Dict], max_sesiones: int = 100_000) -> None:
+        self.config = config
+        self.max_sesiones = max_sesiones
+        self.sesiones: Dict[int, Entorno] = {}
+        self._listas: Set[int] = set()
+        self._fabricas: Dict[int, Callable[[], Entorno]] = {}
+        self._siguiente = 1
+        self.peticiones = 0
+        self.conexiones = 0
+
+    def _fabrica(self, escenario: int) -> Callable[[], Entorno]:
+        fabrica = self._fabricas.get(escenario)
+        if fabrica is None:
+            nombre = ESCENARIOS[escenario]
+            modulo, clase = ENTORNOS[nombre]
+            cls = getattr(importlib.import_module(modulo), clase)
+            kwargs = self.config.get(nombre, {})
+            fabrica = self._fabricas[escenario] = lambda: cls(**kwargs)
+        return fabrica
+
+    def procesar(self, op: int, sesion: int, argumento: int, propias: Set[int]) -> tuple:
+        """
+        (estado, obs, recompensa, banderas) de una peticion. propias son las
+        sesiones creadas por la conexion que la envia.
+        """
+        if op == STEP:
+            if sesion not in propias:
+                return SESION_DESCONOCIDA, 0, 0.0, 0
+            env = self.sesiones[sesion]
+            if sesion not in self._listas:
+                return SIN_RESET, 0, 0.0, 0
+            if not 0 <= argumento < env.n_acciones:
+                return ACCION_INVALIDA, 0, 0.0, 0
+            obs, r, terminado, truncado, _ = env.step(argumento)
+            if terminado or truncado:
+                self._listas.discard(sesion)
+            return OK, obs, r, (TERMINADO if terminado else 0) | (TRUNCADO if truncado else 0)
+        if op == RESET:
+            if sesion not in propias:
+                return SESION_DESCONOCIDA, 0, 0.0, 0
+            env = self.sesiones[sesion]
+            obs, _ = env.reset(None if argumento == SIN_SEMILLA else argumento)
+            self._listas.add(sesion)
+            return OK, obs, 0.0, 0
+        if op == CREAR:
+            if not 0 <= argumento < len(ESCENARIOS):
+                return OP_DESCONOCIDA, 0, 0.0, 0
+            if len(self.sesiones) >= self.max_sesiones:
+                return LIMITE_SESIONES, 0, 0.0, 0
+            sid = self._siguiente
+            self._siguiente += 1
+            self.sesiones[sid] = self._fabrica(argumento)()
+            propias.add(sid)
+            return OK, sid, 0.0, 0
+        if op == CERRAR:
+            if sesion not in propias:
+                return SESION_DESCONOCIDA, 0, 0.0, 0
+            self._cerrar(sesion, propias)
+            return OK, 0, 0.0, 0
+        return OP_DESCONOCIDA, 0, 0.0, 0
+
+    def _cerrar(self, sesion: int, propias: Set[int]) -> None:
+        propias.discard(sesion)
+        self._listas.discard(sesion)
+        self.sesiones.pop(sesion, None)
+
+    async def atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        tam = PETICION.size
+        propias: Set[int] = set()
+        pendiente = b""
+        self.conexiones += 1
+        try:
+            while True:
+                datos = await reader.read(1 << 16)
+                if not datos:
+                    break
+                pendiente += datos
+                fin = len(pendiente) - len(pendiente) % tam
+                if not fin:
+                    continue
+                out: List[bytes] = []
+                for op, pid, sesion, argumento in PETICION.iter_unpack(pendiente[:fin]):
+                    try:
+                        r = self.procesar(op, sesion, argumento, propias)
+                    except Exception:
+                        # Un entorno roto no debe tirar la conexion ni sus otras sesiones.
+                        self._listas.discard(sesion)
+                        r = ERROR_ENTORNO, 0, 0.0, 0
+                    out.append(RESPUESTA.pack(pid, *r))
+                self.peticiones += len(out)
+                pendiente = pendiente[fin:]
+                writer.write(b"".join(out))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for sesion in list(propias):
+                self._cerrar(sesion, propias)
+            self.conexiones -= 1
+            writer.close()
+
+
+async def servir(servidor: Servidor, host: str = "127.0.0.1", puerto: int = 7878, unix: Optional[str] = None) -> None:
+    if unix is not None:
+        srv = await asyncio.start_unix_server(servidor.atender, path=unix)
+    else:
+        srv = await asyncio.start_server(servidor.atender, host, puerto)
+    direccion = unix or f"{host}:{srv.sockets[0].getsockname()[1]}"
+    print(f"Escuchando en {direccion}", flush=True)
+    async with srv:
+        await srv.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Servidor de simulacion para agentes externos.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=7878)
+    parser.add_argument("--unix", default=None, help="Ruta de un socket Unix (en lugar de TCP).")
+    parser.add_argument("--max-sesiones", type=int, default=100_000)
+    parser.add_argument("--max-pasos", type=int, default=200)
+    parser.add_argument("--n", type=int, default=6, help="Lado del palacio (palacio y kurtz).")
+    parser.add_argument("--precipicios", type=int, default=3)
+    parser.add_argument("--filas", type=int, default=7)
+    parser.add_argument("--cols", type=int, default=6)
+    parser.add_argument("--islas", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    config = {
+        "palacio": dict(n=args.n, max_pasos=args.max_pasos),
+        "rio": dict(filas=args.filas, cols=args.cols, nislas=args.islas, max_pasos=args.max_pasos, regenerar=True),
+        "kurtz": dict(n=args.n, n_precipicios=args.precipicios, max_pasos=args.max_pasos),
+    }
+    try:
+        asyncio.run(servir(Servidor(config, args.max_sesiones), args.host, args.puerto, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Punto de entrada no interactivo para lanzar partidas por lotes.
+
+    python simular.py kurtz   --episodios 1000 --n 8 --precipicios 5 --solucionable
+    python simular.py palacio --episodios 500 --workers 4 --salida palacio.json
+    python simular.py palacio --n 30 --trampas "F:20,P:20,X:30" --soldados 5
+    python simular.py rio     --filas 9 --cols 8 --islas 4 --render --pausa 0
+    python simular.py palacio --config experimento.json
+    python simular.py palacio --episodios 100000 --workers 8 --traza palacio.trz
+
+Cada subcomando importa solo los modulos que necesita. --config carga un JSON
+con los mismos nombres que las opciones (con guiones bajos); las opciones
+dadas en la linea de comandos tienen prioridad. El resumen se imprime en JSON
+y con --salida se guarda tambien el detalle por episodio. Con --traza (palacio
+y rio) cada episodio se anade a una traza binaria (ver Parte_2/repeticion.py).
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+
+_RAIZ = os.path.dirname(os.path.abspath(__file__))
+for _parte in ("Parte_1", "Parte_2"):
+    if os.path.join(_RAIZ, _parte) not in sys.path:
+        sys.path.append(os.path.join(_RAIZ, _parte))
+
+from comun import perfil  # noqa: E402
+
+Tarea = Tuple[str, str, Dict]
+
+
+def _ejecutar(tarea: Tarea) -> Dict:
+    modulo, funcion, kwargs = tarea
+    return getattr(importlib.import_module(modulo), funcion)(**kwargs)
+
+
+def _mapear(tareas: List[Tarea], workers: int) -> List[Dict]:
+    if workers <= 1:
+        return [_ejecutar(t) for t in tareas]
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunk = max(1, len(tareas) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_ejecutar, tareas, chunksize=chunk))
+
+
+def episodio_aleatorio(escenario: str, seed: int, n: int, max_turnos: int, n_precipicios: int = 3, solucionable: bool = False, spec=None) -> Dict:
+    """
+    Partida con acciones uniformes sobre los entornos reset/step (linea base).
+    """
+    import random
+
+    if escenario == "kurtz":
+        from entorno_kurtz import EntornoKurtz
+        env = EntornoKurtz(n=n, n_precipicios=n_precipicios, solucionable=solucionable, max_pasos=max_turnos)
+    else:
+        from entornos import EntornoPalacio
+        env = EntornoPalacio(n=n, max_pasos=max_turnos, spec=spec)
+
+    rng = random.Random(seed)
+    env.reset(seed)
+    turnos = 0
+    while True:
+        _, r, terminado, truncado, _ = env.step(rng.randrange(env.n_acciones))
+        turnos += 1
+        if terminado or truncado:
+            break
+    resultado = "limite" if truncado else ("victoria" if r > 0 else "muerte")
+    return {"seed": seed, "resultado": resultado, "turnos": turnos}
+
+
+def episodio_rio(seed: int, filas: int, cols: int, nislas: int, gamma: float, max_turnos: int, render: bool = False, pausa: float = 0.0, trazar: bool = False,
+                 backend: str = "python") -> Dict:
+    """
+    Genera el rio de la semilla, resuelve la politica optima y simula un episodio.
+    """
+    from river_mdp import RiverWorld, simulate_episode, value_iteration
+
+    rio = RiverWorld(filas=filas, cols=cols, nislas=nislas, seed=seed)
+    rio.reset()
+    V, pi = value_iteration(rio, gamma=gamma, backend=backend)
+    exito, total, path = simulate_episode(rio, pi, seed=seed, max_steps=max_turnos, render=render, pausa=pausa)
+    resultado = "victoria" if exito else ("muerte" if rio.is_terminal(path[-1]) else "limite")
+    res = {"seed": seed, "resultado": resultado, "turnos": len(path) - 1, "recompensa": total, "valor_inicio": V[rio.inicio]}
+    if trazar:
+        from trazas_episodio import traza_rio
+        res["traza"] = traza_rio(rio, pi, path, resultado)
+    return res
+
+
+def _tareas_kurtz(a: argparse.Namespace) -> List[Tarea]:
+    if a.agente == "aleatorio":
+        return [("simular", "episodio_aleatorio", dict(escenario="kurtz", seed=s, n=a.n, max_turnos=a.max_turnos, n_precipicios=a.precipicios, solucionable=a.solucionable))
+                for s in _semillas(a)]
+    return [("agente_auto", "jugar_partida", dict(seed=s, n=a.n, n_precipicios=a.precipicios, solucionable=a.solucionable, max_turnos=a.max_turnos, render=a.render))
+            for s in _semillas(a)]
+
+
+def _tareas_palacio(a: argparse.Namespace) -> List[Tarea]:
+    spec = None
+    if a.trampas is not None or a.soldados != 1:
+        from palacio_world import EspecificacionPalacio
+        spec = EspecificacionPalacio.desde_texto(a.trampas or "F,P,D", n=a.n, soldados=a.soldados)
+    if a.agente == "aleatorio":
+        return [("simular", "episodio_aleatorio", dict(escenario="palacio", seed=s, n=a.n, max_turnos=a.max_turnos, spec=spec)) for s in _semillas(a)]
+    return [("evaluacion", "run_episode", dict(seed=s, n=a.n, p_lim=a.p_lim, max_turnos=a.max_turnos, render=a.render, trazar=a.traza is not None, spec=spec))
+            for s in _semillas(a)]
+
+
+def _tareas_rio(a: argparse.Namespace) -> List[Tarea]:
+    return [("simular", "episodio_rio", dict(seed=s, filas=a.filas, cols=a.cols, nislas=a.islas, gamma=a.gamma, max_turnos=a.max_turnos, render=a.render, pausa=a.pausa,
+                                              trazar=a.traza is not None, backend=a.backend))
+            for s in _semillas(a)]
+
+
+def _semillas(a: argparse.Namespace) -> range:
+    return range(a.seed0, a.seed0 + a.episodios)
+
+
+def resumir(resultados: List[Dict]) -> Dict:
+    total = len(resultados)
+    if total == 0:
+        return {"episodios": 0}
+    out: Dict = {"episodios": total}
+    for clave in ("victoria", "muerte", "limite", "atascado"):
+        out[clave] = sum(1 for r in resultados if r["resultado"] == clave) / total
+    out["turnos_medio"] = sum(r["turnos"] for r in resultados) / total
+    latencias = sorted(l for r in resultados for l in r.get("latencias", ()))
+    if latencias:
+        # Mismo percentil que evaluacion.summarize, para que ambas CLIs sean comparables.
+        out["latencia_ms_p50"] = 1000.0 * perfil.percentile(latencias, 50)
+        out["latencia_ms_p99"] = 1000.0 * perfil.percentile(latencias, 99)
+    return out
+
+
+def _parser() -> Tuple[argparse.ArgumentParser, Dict[str, argparse.ArgumentParser]]:
+    parser = argparse.ArgumentParser(description="Partidas por lotes sin interaccion.")
+    subs = parser.add_subparsers(dest="escenario", required=True)
+
+    comun = argparse.ArgumentParser(add_help=False)
+    comun.add_argument("--config", default=None, help="JSON con valores para las opciones.")
+    comun.add_argument("--episodios", type=int, default=100)
+    comun.add_argument("--seed0", type=int, default=0)
+    comun.add_argument("--workers", type=int, default=1)
+    comun.add_argument("--max-turnos", type=int, default=200)
+    comun.add_argument("--render", action="store_true", help="Imprime el tablero en cada turno.")
+    comun.add_argument("--salida", default=None, help="Fichero JSON con configuracion, resumen y episodios.")
+
+    kurtz = subs.add_parser("kurtz", parents=[comun], help="Palacio de la Parte 1.")
+    kurtz.add_argument("--n", type=int, default=6)
+    kurtz.add_argument("--precipicios", type=int, default=3)
+    kurtz.add_argument("--solucionable", action="store_true")
+    kurtz.add_argument("--agente", choices=("auto", "aleatorio"), default="auto")
+    kurtz.set_defaults(tareas=_tareas_kurtz)
+
+    palacio = subs.add_parser("palacio", parents=[comun], help="Palacio de la Parte 2 (agente bayesiano).")
+    palacio.add_argument("--n", type=int, default=6)
+    palacio.add_argument("--p-lim", type=float, default=0.2)
+    palacio.add_argument("--agente", choices=("greedy", "aleatorio"), default="greedy")
+    palacio.add_argument("--traza", default=None, help="Traza binaria donde anadir los episodios.")
+    palacio.add_argument("--trampas", default=None, help='Tipos de trampa y cantidades, p. ej. "F:3,P:2,D:2,X:10" (por defecto una F, una P y una D).')
+    palacio.add_argument("--soldados", type=int, default=1)
+    palacio.set_defaults(tareas=_tareas_palacio)
+
+    rio = subs.add_parser("rio", parents=[comun], help="MDP del rio (value iteration).")
+    rio.add_argument("--filas", type=int, default=7)
+    rio.add_argument("--cols", type=int, default=6)
+    rio.add_argument("--islas", type=int, default=2)
+    rio.add_argument("--gamma", type=float, default=0.95)
+    rio.add_argument("--pausa", type=float, default=0.0, help="Segundos entre pasos con --render.")
+    rio.add_argument("--traza", default=None, help="Traza binaria donde anadir los episodios.")
+    rio.add_argument("--backend", choices=("python", "numba"), default="python",
+                     help="Nucleo de value iteration (numba: compilado, requiere el paquete numba).")
+    rio.set_defaults(tareas=_tareas_rio)
+
+    return parser, {"kurtz": kurtz, "palacio": palacio, "rio": rio}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser, subs = _parser()
+    args = parser.parse_args(argv)
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            config = json.load(f)
+        if not isinstance(config, dict):
+            parser.error(f"--config: {args.config} debe contener un objeto JSON")
+        sub = subs[args.escenario]
+        validas = {a.dest for a in sub._actions if a.dest not in ("help", "config")}
+        desconocidas = sorted(set(config) - validas)
+        if desconocidas:
+            parser.error(f"--config: opciones desconocidas para {args.escenario}: {', '.join(desconocidas)}"
+                         f" (validas: {', '.join(sorted(validas))})")
+        sub.set_defaults(**config)
+        args = parser.parse_args(argv)
+
+    if args.render and args.workers > 1:
+        parser.error("--render solo es compatible con --workers 1")
+    if getattr(args, "backend", "python") == "numba":
+        from comun import nucleos
+        if nucleos.NUMBA not in nucleos.disponibles():
+            parser.error("--backend numba requiere el paquete numba")
+    traza = getattr(args, "traza", None)
+    if traza and getattr(args, "agente", None) == "aleatorio":
+        parser.error("--traza no esta disponible con --agente aleatorio")
+
+    tareas: Callable[[argparse.Namespace], List[Tarea]] = args.tareas
+    t0 = time.perf_counter()
+    resultados = _mapear(tareas(args), args.workers)
+    if traza:
+        from comun.trazas import EscritorTraza
+        with EscritorTraza(traza) as escritor:
+            for r in resultados:
+                escritor.escribir(r.pop("traza"))
+    dt = time.perf_counter() - t0
+
+    resumen = resumir(resultados)
+    resumen["segundos"] = dt
+    print(json.dumps(resumen, indent=2))
+
+    if args.salida:
+        config = {k: v for k, v in vars(args).items() if k != "tareas"}
+        for r in resultados:
+            r.pop("latencias", None)
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "resumen": resumen, "episodios": resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
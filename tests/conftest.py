@@ -0,0 +1,7 @@
+import os
+import sys
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _ruta in (_RAIZ, os.path.join(_RAIZ, "Parte_1"), os.path.join(_RAIZ, "Parte_2")):
+    if _ruta not in sys.path:
+        sys.path.insert(0, _ruta)
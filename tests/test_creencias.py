@@ -0,0 +1,75 @@
+"""
+BeliefState.update sobre Distribucion frente a la actualizacion densa de
+referencia (posterior de cada celda via _likelihood y normalizacion).
+"""
+import random
+
+import pytest
+
+from bayes import BeliefState, Distribucion
+from palacio_world import EspecificacionPalacio, Palacio
+
+
+def update_referencia(belief, agent_pos, bits):
+    for tau, b in belief.bits.items():
+        visto = bool(bits & b)
+        prior = dict(belief.belief[tau])
+        post = {pos: p * belief._likelihood(pos, agent_pos, visto) for pos, p in prior.items()}
+        suma = sum(post.values())
+        belief.belief[tau] = {pos: v / suma for pos, v in post.items()} if suma > 0 else post
+
+
+@pytest.mark.parametrize("n", [6, 20])
+def test_update_igual_que_referencia(n):
+    spec = EspecificacionPalacio(n=n)
+    for seed in range(3):
+        palacio = Palacio(seed=seed, spec=spec)
+        rapida = BeliefState.desde_especificacion(spec, palacio.inicio)
+        densa = BeliefState.desde_especificacion(spec, palacio.inicio)
+        rnd = random.Random(seed)
+        pos = palacio.inicio
+        for _ in range(50):
+            bits = palacio.get_percepts_bits(pos)
+            rapida.update(pos, bits)
+            update_referencia(densa, pos, bits)
+            for tau in spec.taus:
+                assert sum(rapida.belief[tau].values()) == pytest.approx(1.0)
+                for celda, v in densa.belief[tau].items():
+                    assert rapida.belief[tau][celda] == pytest.approx(v, abs=1e-12)
+            sig = palacio.step_move(pos, rnd.choice(("UP", "DOWN", "LEFT", "RIGHT")))
+            pos = pos if palacio.is_lethal(sig) else sig
+
+
+def test_percepto_incompatible_reinicia():
+    b = BeliefState.desde_especificacion(EspecificacionPalacio(), (1, 1))
+    b.update((3, 3), 0)
+    b.update((3, 3), b.bits["F"])
+    f = b.belief["F"]
+    entorno = {(3, 3), (2, 3), (4, 3), (3, 2), (3, 4)}
+    assert all(f[p] == pytest.approx(0.2) for p in entorno)
+    assert sum(f.values()) == pytest.approx(1.0)
+
+
+def test_varios_conserva_cantidad():
+    spec = EspecificacionPalacio(n=10, trampas=(("F", 3), ("P", 1)), soldados=2)
+    palacio = Palacio(seed=3, spec=spec)
+    b = BeliefState.desde_especificacion(spec, palacio.inicio)
+    pos = palacio.inicio
+    for k in range(60):
+        b.update(pos, palacio.get_percepts_bits(pos))
+        sig = palacio.step_move(pos, ("RIGHT", "DOWN")[k % 2])
+        pos = pos if palacio.is_lethal(sig) else sig
+    assert sum(b.belief["F"].values()) == pytest.approx(3.0)
+    assert sum(b.belief["M"].values()) == pytest.approx(2.0)
+
+
+def test_distribucion_como_dict():
+    d = Distribucion.desde(3, {(1, 1): 0.5, (2, 2): 0.5})
+    assert list(d) == [(f, c) for f in range(1, 4) for c in range(1, 4)]
+    assert d[(3, 3)] == 0.0 and d.get((9, 9), -1.0) == -1.0
+    d[(3, 3)] = 1.0
+    assert d.normalizar()
+    assert dict(d) == {**dict.fromkeys(d, 0.0), (1, 1): 0.25, (2, 2): 0.25, (3, 3): 0.5}
+    copia = d.copy()
+    d.anular([(3, 3)])
+    assert copia[(3, 3)] == 0.5
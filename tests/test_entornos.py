@@ -0,0 +1,35 @@
+"""
+Contrato comun de los entornos reset/step: acciones fuera de rango.
+"""
+import pytest
+
+from comun.entorno import Entorno
+from entorno_kurtz import EntornoKurtz
+from entornos import EntornoPalacio, EntornoRio
+
+FABRICAS = [EntornoKurtz, EntornoPalacio, EntornoRio]
+
+
+@pytest.mark.parametrize("fabrica", FABRICAS)
+def test_accion_fuera_de_rango(fabrica):
+    env = fabrica()
+    env.reset(0)
+    for accion in (-1, -env.n_acciones, env.n_acciones, 99):
+        with pytest.raises(ValueError):
+            env.step(accion)
+    assert env.pasos == 0
+
+
+@pytest.mark.parametrize("fabrica", FABRICAS)
+def test_acciones_validas(fabrica):
+    env = fabrica()
+    env.reset(0)
+    for accion in range(env.n_acciones):
+        _, _, terminado, truncado, _ = env.step(accion)
+        if terminado or truncado:
+            env.reset(0)
+
+
+def test_base_abstracta():
+    with pytest.raises(TypeError):
+        Entorno()
@@ -0,0 +1,101 @@
+"""
+Paridad de los backends de comun.nucleos con la value iteration original del
+rio (transitions() y reward() en cada barrido).
+"""
+import pytest
+
+from comun import nucleos
+from comun.grid import ACTIONS, rejilla
+from river_mdp import RiverWorld, tabla_transiciones, value_iteration
+
+CASOS = [(7, 6, 2, seed) for seed in range(8)] + [(12, 10, 8, seed) for seed in range(4)]
+
+
+def value_iteration_original(rio, gamma=0.95, theta=1e-6, max_iter=50_000):
+    states = rejilla(rio.filas, rio.cols).celdas
+    V = {s: 0.0 for s in states}
+    pi = {s: "STAY" for s in states}
+    for _ in range(max_iter):
+        delta = 0.0
+        for s in states:
+            if rio.is_terminal(s):
+                pi[s] = "STAY"
+                continue
+            best_a = None
+            best_q = float("-inf")
+            for a in ACTIONS:
+                q = 0.0
+                for sprima, p in rio.transitions(s, a).items():
+                    q += p * (rio.reward(sprima) + gamma * V[sprima])
+                if q > best_q:
+                    best_q = q
+                    best_a = a
+            old = V[s]
+            V[s] = best_q
+            pi[s] = best_a
+            delta = max(delta, abs(old - V[s]))
+        if delta < theta:
+            break
+    return V, pi
+
+
+def _rio(filas, cols, nislas, seed):
+    rio = RiverWorld(filas=filas, cols=cols, nislas=nislas, seed=seed)
+    rio.reset()
+    return rio
+
+
+def _resolver(rio, backend, gamma=0.95):
+    destinos, probs, recompensas, terminales, ramas = tabla_transiciones(rio)
+    V, pi, _ = nucleos.resolver(destinos, probs, recompensas, terminales, len(ACTIONS), ramas,
+                                gamma, 1e-6, 50_000, ACTIONS.index("STAY"), backend)
+    states = rejilla(rio.filas, rio.cols).celdas
+    return dict(zip(states, V)), {s: ACTIONS[a] for s, a in zip(states, pi)}
+
+
+@pytest.mark.parametrize("filas,cols,nislas,seed", CASOS)
+def test_python_igual_que_original(filas, cols, nislas, seed):
+    rio = _rio(filas, cols, nislas, seed)
+    esperado = value_iteration_original(rio)
+    assert _resolver(rio, nucleos.PYTHON) == esperado
+    assert value_iteration(rio, backend=nucleos.PYTHON) == esperado
+
+
+@pytest.mark.parametrize("filas,cols,nislas,seed", CASOS)
+def test_numba_igual_que_python(filas, cols, nislas, seed):
+    pytest.importorskip("numba")
+    rio = _rio(filas, cols, nislas, seed)
+    assert _resolver(rio, nucleos.NUMBA) == _resolver(rio, nucleos.PYTHON)
+    assert value_iteration(rio, backend=nucleos.NUMBA) == value_iteration_original(rio)
+
+
+def test_gamma_distinto():
+    rio = _rio(7, 6, 2, 3)
+    assert _resolver(rio, nucleos.PYTHON, gamma=0.5) == value_iteration_original(rio, gamma=0.5)
+
+
+def test_tabla_rellena_hasta_ramas():
+    rio = _rio(7, 6, 2, 0)
+    destinos, probs, _, _, ramas = tabla_transiciones(rio)
+    r = rejilla(rio.filas, rio.cols)
+    assert ramas == max(len(rio.transitions(s, a)) for s in r.celdas for a in ACTIONS)
+    assert len(destinos) == len(probs) == r.size * len(ACTIONS) * ramas
+    for base in range(0, len(destinos), ramas):
+        huecos = [k for k in range(ramas) if destinos[base + k] < 0]
+        assert all(probs[base + k] == 0.0 for k in huecos)
+        assert huecos == list(range(ramas - len(huecos), ramas))
+
+
+def test_python_por_defecto(monkeypatch):
+    def sin_compilar(nombre, fn):
+        raise AssertionError("el backend compilado solo debe usarse si se pide")
+
+    monkeypatch.setattr(nucleos, "_compilado", sin_compilar)
+    rio = _rio(7, 6, 2, 1)
+    assert value_iteration(rio) == value_iteration_original(rio)
+
+
+def test_backend_desconocido():
+    rio = _rio(7, 6, 2, 0)
+    with pytest.raises(ValueError):
+        _resolver(rio, "cuda")
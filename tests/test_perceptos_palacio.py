@@ -0,0 +1,61 @@
+"""
+El formato diccionario de los perceptos del palacio debe ser equivalente al
+codificado como entero para cualquier especificacion, no solo la base.
+"""
+import pytest
+
+from bayes import BeliefState
+from palacio_compacto import PalacioCompacto
+from palacio_world import EspecificacionPalacio, Palacio, encode_percepts
+
+SPECS = ["F:1,P:1,D:1", "X:2,F:1,P:1,D:1", "X:1,Y:1,D:2", "A:1,B:1,C:1,D:1,E:1"]
+
+
+def _palacios(texto):
+    spec = EspecificacionPalacio.desde_texto(texto, n=6)
+    return [Palacio(seed=seed, spec=spec) for seed in range(5)]
+
+
+@pytest.mark.parametrize("texto", SPECS)
+def test_diccionario_y_bits_coinciden(texto):
+    for palacio in _palacios(texto):
+        compacto = PalacioCompacto.desde_palacio(palacio)
+        for pos in palacio.rejilla.celdas:
+            bits = palacio.get_percepts_bits(pos)
+            obs = palacio.get_percepts(pos)
+            assert obs == palacio.spec.decodificar(bits)
+            assert palacio.spec.codificar(obs) == bits
+            assert encode_percepts(obs, palacio.spec.bits) == bits
+            assert compacto.get_percepts(compacto.to_idx(pos)) == obs
+
+
+@pytest.mark.parametrize("texto", SPECS)
+def test_claves_por_tipo_de_trampa(texto):
+    for palacio in _palacios(texto):
+        for pos in palacio.rejilla.celdas:
+            obs = palacio.get_percepts(pos)
+            entorno = palacio.rejilla.entorno_pos[pos]
+            for tipo, celdas in palacio.trampas_de.items():
+                assert obs[f"e{tipo}"] == any(c in entorno for c in celdas)
+
+
+def test_bits_con_nombre_fijos():
+    spec = EspecificacionPalacio.desde_texto("X:2,F:1,P:1,D:1")
+    base = EspecificacionPalacio()
+    for tipo in ("F", "P", "D"):
+        assert spec.bits[tipo] == base.bits[tipo]
+    assert len(set(spec.bits.values())) == len(spec.bits)
+
+
+@pytest.mark.parametrize("texto", SPECS)
+def test_update_con_diccionario_igual_que_con_bits(texto):
+    palacio = _palacios(texto)[0]
+    con_bits = BeliefState.desde_especificacion(palacio.spec, palacio.inicio)
+    con_dict = BeliefState.desde_especificacion(palacio.spec, palacio.inicio)
+    for pos in palacio.rejilla.celdas[:12]:
+        if palacio.is_lethal(pos):
+            continue
+        con_bits.update(pos, palacio.get_percepts_bits(pos))
+        con_dict.update(pos, palacio.get_percepts(pos))
+    for tau in palacio.spec.taus:
+        assert dict(con_bits.belief[tau]) == dict(con_dict.belief[tau])